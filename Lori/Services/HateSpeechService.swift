@@ -62,7 +62,7 @@ public class HateSpeechService {
         return (false, nil, nil)
     }
     
-    func checkHateSpeech(text: String) async throws -> HateSpeechResponse {
+    func checkHateSpeech(text: String, tier: String? = nil) async throws -> HateSpeechResponse {
         print("\n=== Nefret Söylemi Kontrolü ===")
         print("Kontrol edilen metin: \(text)")
         
@@ -118,7 +118,10 @@ public class HateSpeechService {
         request.setValue("application/json", forHTTPHeaderField: "Accept")
         request.timeoutInterval = 60
         
-        let body = ["text": text]
+        var body = ["text": text]
+        if let tier = tier {
+            body["tier"] = tier
+        }
         request.httpBody = try JSONSerialization.data(withJSONObject: body)
         
         print("\n=== API İsteği Detayları ===")
@@ -268,6 +271,7 @@ public class HateSpeechService {
     
     func debouncedCheck(text: String, delay: TimeInterval = 1.0) async throws -> HateSpeechResponse {
         try await Task.sleep(nanoseconds: UInt64(delay * 1_000_000_000))
-        return try await checkHateSpeech(text: text)
+        // Yazarken yapılan kontroller düşük gecikmeli (damıtılmış) modeli kullanır
+        return try await checkHateSpeech(text: text, tier: "fast")
     }
 }
@@ -0,0 +1,157 @@
+import math
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+import metrics
+
+PRIORITY_INTERACTIVE = "interactive"
+PRIORITY_BULK = "bulk"
+PRIORITIES = (PRIORITY_INTERACTIVE, PRIORITY_BULK)
+
+_WAIT_SECONDS = metrics.STAGE_SECONDS.labels("admission")
+
+
+class Rejected(Exception):
+    """İstek kabul edilmedi; HTTP durum kodu ve Retry-After süresi ile birlikte."""
+
+    def __init__(self, status: int, reason: str, message: str, retry_after: int):
+        super().__init__(message)
+        self.status = status
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """Model işine giren istekleri sınırlar: sınırlı bekleme kuyruğu, son tarih ve öncelik sınıfları.
+
+    At most `max_concurrent` requests run at a time; the rest wait in a queue where
+    interactive requests are always served before bulk ones. Requests are rejected up
+    front when the queue is full (429) or when the estimated wait already exceeds their
+    deadline (503), instead of waiting only to time out. Bulk requests may only use
+    `bulk_queue_size` of the queue, so they can never fill it for interactive traffic.
+    """
+
+    def __init__(self, max_concurrent: int, queue_size: int, bulk_queue_size: int):
+        self.max_concurrent = max(1, max_concurrent)
+        self.queue_size = max(0, queue_size)
+        self.bulk_queue_size = min(max(0, bulk_queue_size), self.queue_size)
+        self._condition = threading.Condition()
+        self._active = 0
+        self._waiting: Dict[str, deque] = {priority: deque() for priority in PRIORITIES}
+        # Moving averages of how long an admitted request holds its slot: over all requests for
+        # how soon a slot frees up, per priority for how long the request itself will take
+        self._slot_seconds: Optional[float] = None
+        self._service_seconds: Dict[str, Optional[float]] = {priority: None for priority in PRIORITIES}
+
+    @contextmanager
+    def admit(self, priority: str, deadline: Optional[float] = None) -> Iterator[None]:
+        admitted_at = self.acquire(priority, deadline)
+        try:
+            yield
+        finally:
+            self.release(priority, admitted_at)
+
+    def acquire(self, priority: str, deadline: Optional[float] = None) -> float:
+        """Sıra gelene kadar bekler ve kabul zamanını döndürür; kabul edilemezse Rejected fırlatır.
+
+        `deadline` is a time.monotonic() value; None waits as long as the queue takes.
+        The returned time must be passed to release() once the request is done.
+        """
+        enqueued_at = time.monotonic()
+        with self._condition:
+            # Also on the fast path: a request that already spent its deadline upstream (proxy,
+            # listen backlog) would only do work nobody waits for. Service time estimates are not
+            # applied here, a request that gets a slot right away is always given the chance to run
+            if deadline is not None and enqueued_at >= deadline:
+                raise self._reject(priority, 503, "expired", "İstek sunucuya ulaşmadan son tarihi geçti")
+            if self._active < self.max_concurrent and not self._ahead(priority):
+                self._active += 1
+                metrics.ADMISSION.labels(priority, "admitted").inc()
+                return enqueued_at
+
+            waiting = len(self._waiting[PRIORITY_INTERACTIVE]) + len(self._waiting[PRIORITY_BULK])
+            limit = self.bulk_queue_size if priority == PRIORITY_BULK else self.queue_size
+            queued = waiting if priority == PRIORITY_INTERACTIVE else len(self._waiting[PRIORITY_BULK])
+            if waiting >= self.queue_size or queued >= limit:
+                raise self._reject(priority, 429, "queue_full", "Sunucu yoğun, istek kuyruğu dolu")
+            if self._cannot_finish(enqueued_at + self._estimated_wait(self._ahead(priority)), deadline, priority):
+                raise self._reject(priority, 503, "deadline", "İstek son tarihinden önce tamamlanamaz")
+
+            ticket = object()
+            self._waiting[priority].append(ticket)
+            try:
+                while not (self._active < self.max_concurrent and self._is_next(priority, ticket)):
+                    timeout = None if deadline is None else deadline - time.monotonic()
+                    if timeout is not None and timeout <= 0:
+                        raise self._reject(priority, 503, "expired", "İstek kuyrukta beklerken son tarihi geçti")
+                    self._condition.wait(timeout)
+                # Its turn came too late to run to completion before the deadline
+                if self._cannot_finish(time.monotonic(), deadline, priority):
+                    raise self._reject(priority, 503, "expired", "İstek kuyrukta beklerken son tarihine yetişemez oldu")
+            finally:
+                self._waiting[priority].remove(ticket)
+                # Whoever is next now may be able to run (or this request left the queue)
+                self._condition.notify_all()
+            self._active += 1
+        metrics.ADMISSION.labels(priority, "queued").inc()
+        admitted_at = time.monotonic()
+        _WAIT_SECONDS.observe(admitted_at - enqueued_at)
+        return admitted_at
+
+    def release(self, priority: str, admitted_at: float):
+        held_seconds = time.monotonic() - admitted_at
+        with self._condition:
+            self._active -= 1
+            self._slot_seconds = _moving_average(self._slot_seconds, held_seconds)
+            self._service_seconds[priority] = _moving_average(self._service_seconds[priority], held_seconds)
+            self._condition.notify_all()
+
+    def _ahead(self, priority: str) -> int:
+        # Requests that will be served before a new one of this priority
+        if priority == PRIORITY_INTERACTIVE:
+            return len(self._waiting[PRIORITY_INTERACTIVE])
+        return len(self._waiting[PRIORITY_INTERACTIVE]) + len(self._waiting[PRIORITY_BULK])
+
+    def _is_next(self, priority: str, ticket: object) -> bool:
+        if priority == PRIORITY_BULK and self._waiting[PRIORITY_INTERACTIVE]:
+            return False
+        return self._waiting[priority][0] is ticket
+
+    def _cannot_finish(self, start: float, deadline: Optional[float], priority: str) -> bool:
+        # Whether a request of this priority starting its work at `start` would end past the deadline
+        return deadline is not None and start + (self._service_seconds[priority] or 0.0) > deadline
+
+    def _estimated_wait(self, ahead: int) -> float:
+        # Slots free up in waves of max_concurrent requests, each holding a slot for about one slot time
+        if self._slot_seconds is None:
+            return 0.0
+        return (ahead // self.max_concurrent + 1) * self._slot_seconds
+
+    def _reject(self, priority: str, status: int, reason: str, message: str) -> Rejected:
+        metrics.ADMISSION.labels(priority, reason).inc()
+        waiting = len(self._waiting[PRIORITY_INTERACTIVE]) + len(self._waiting[PRIORITY_BULK])
+        retry_after = max(1, math.ceil(self._estimated_wait(waiting)))
+        return Rejected(status, reason, message, retry_after)
+
+    def stats(self) -> Dict:
+        with self._condition:
+            return {
+                "active": self._active,
+                "max_concurrent": self.max_concurrent,
+                "waiting": {priority: len(queue) for priority, queue in self._waiting.items()},
+                "queue_size": self.queue_size,
+                "bulk_queue_size": self.bulk_queue_size,
+                "slot_ms": _milliseconds(self._slot_seconds),
+                "service_ms": {priority: _milliseconds(seconds) for priority, seconds in self._service_seconds.items()}
+            }
+
+
+def _moving_average(average: Optional[float], value: float) -> float:
+    return value if average is None else average + 0.1 * (value - average)
+
+
+def _milliseconds(seconds: Optional[float]) -> Optional[float]:
+    return round(seconds * 1000, 2) if seconds is not None else None
@@ -1,35 +1,191 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, g, request, jsonify
 from flask_cors import CORS
+import hashlib
+import hmac
+import json
 import logging
 from datetime import datetime
-import os
+import shutil
+import tempfile
+import threading
+import time
 import traceback
-from model_handler import ModelHandler
-
-# Loglama ayarları
-logging.basicConfig(
-    level=logging.DEBUG,  # DEBUG seviyesine çektik
-    format='[%(asctime)s] %(levelname)s: %(message)s',
-    handlers=[
-        logging.FileHandler('logs/api.log'),
-        logging.StreamHandler()  # Konsola da log çıktısı ekledik
-    ]
-)
+from batching import AnalysisError, BatcherUnavailable
+from admission import PRIORITIES, PRIORITY_BULK, PRIORITY_INTERACTIVE, AdmissionController, Rejected
+from model_handler import DETAIL_LEVELS
+from model_registry import ModelSlot, ModelUnavailable
+from logging_setup import setup_logging
+import metrics
+import settings
+
+# Loglama ayarları (LOG_* ortam değişkenleri, bkz. settings.py)
+setup_logging()
 
 logger = logging.getLogger(__name__)
+logger.info("Ayarlanmış yapılandırma %s", settings.TUNED_CONFIG_STATUS, extra={"tuned_config": settings.TUNED_CONFIG})
 
 app = Flask(__name__)
 CORS(app)
 
-# Model'i global olarak yükle
+# Analiz yanıtları orjson ile kodlanır (kuruluysa); aksi halde Flask'ın jsonify'ı kullanılır
+orjson = None
+if settings.JSON_ENCODER == "orjson":
+    try:
+        import orjson
+    except ImportError:
+        logger.warning("orjson kurulu değil, yanıtlar standart JSON kodlayıcıyla üretilecek")
+
+# Model'i global olarak yükle (MODEL_LOAD_IN_BACKGROUND ile port önce açılır).
+# Her katman bir ModelSlot: istekler etkin sürümü alır, yeni sürüm arka planda yüklenip atomik olarak değiştirilir.
 try:
-    model = ModelHandler()
-    logger.info("Model başarıyla yüklendi")
+    model_slot = ModelSlot("standard", settings.MODEL_PATH, load=not settings.MODEL_LOAD_IN_BACKGROUND)
+    if model_slot.handler.loaded:
+        logger.info("Model başarıyla yüklendi")
 except Exception as e:
     logger.error(f"Model yüklenirken hata oluştu: {str(e)}")
     logger.error(f"Stack trace: {traceback.format_exc()}")
     raise
 
+# Düşük gecikmeli katman: damıtılmış öğrenci model, istekte "tier": "fast" ile kullanılır
+fast_slot = None
+if settings.FAST_MODEL_PATH:
+    fast_slot = ModelSlot("fast", settings.FAST_MODEL_PATH, load=not settings.MODEL_LOAD_IN_BACKGROUND)
+    if fast_slot.handler.loaded:
+        logger.info("Hızlı model başarıyla yüklendi")
+
+TIERS = ("standard", "fast")
+slots = {"standard": model_slot}
+if fast_slot is not None:
+    slots["fast"] = fast_slot
+
+# Kabul kontrolü: aşırı yükte istekler kuyrukta birikmek yerine hemen 429/503 ile reddedilir
+admission = None
+if settings.ADMISSION_ENABLED:
+    admission = AdmissionController(
+        settings.ADMISSION_MAX_CONCURRENT, settings.ADMISSION_QUEUE_SIZE, settings.ADMISSION_BULK_QUEUE_SIZE
+    )
+
+# Prometheus metrikleri: istek/aşama süreleri ve kazıma anında okunan gauge'lar
+metrics.REGISTRY.configure(settings.METRICS_DIR, settings.METRICS_FLUSH_SECONDS)
+if admission is not None:
+    for _priority in PRIORITIES:
+        metrics.REGISTRY.callback(
+            f"hate_speech_admission_waiting_{_priority}", f"Kabul kuyruğunda bekleyen {_priority} istekler",
+            lambda _priority=_priority: admission.stats()["waiting"][_priority]
+        )
+_SERIALIZE_SECONDS = metrics.STAGE_SECONDS.labels("serialize")
+if model_slot.state.batcher is not None:
+    metrics.REGISTRY.callback(
+        "hate_speech_micro_batch_queue_depth", "Mikro-batch kuyruğunda bekleyen metinler",
+        lambda: model_slot.state.batcher.queue_depth()
+    )
+if model_slot.handler.result_cache is not None:
+    # Read through the slot: after a reload the values come from the new model's cache
+    for _name, _type in (("hits", "counter"), ("misses", "counter"), ("evictions", "counter"),
+                         ("entries", "gauge"), ("bytes", "gauge")):
+        metrics.REGISTRY.callback(
+            f"hate_speech_result_cache_{_name}{'_total' if _type == 'counter' else ''}",
+            f"Sonuç önbelleği: {_name}",
+            lambda _name=_name: model_slot.handler.result_cache.stats()[_name],
+            _type
+        )
+
+@app.before_request
+def start_timer():
+    g.request_start = time.perf_counter()
+    metrics.REGISTRY.ensure_flusher()
+    for slot in slots.values():
+        slot.ensure_watcher()
+
+@app.after_request
+def record_request(response):
+    # Route pattern rather than the raw path keeps label cardinality bounded
+    endpoint = request.url_rule.rule if request.url_rule is not None else "unmatched"
+    metrics.REQUESTS.labels(endpoint, response.status_code).inc()
+    if response.status_code >= 500:
+        metrics.REQUEST_ERRORS.labels(endpoint).inc()
+    start = g.get("request_start")
+    if start is not None:
+        metrics.REQUEST_SECONDS.labels(endpoint).observe(time.perf_counter() - start)
+    return response
+
+# Sağlık ve hazırlık kontrolleri dışındaki istekler model yüklenene kadar bekletilmez
+@app.before_request
+def require_model():
+    if request.path in ('/api/health', '/api/ready', '/api/metrics') or request.path.startswith('/api/admin/') or all(
+            slot.handler.loaded for slot in slots.values()):
+        return None
+    response = jsonify({
+        "status": "error",
+        "message": "Model henüz yüklenmedi",
+        "timestamp": datetime.now().isoformat()
+    })
+    response.status_code = 503
+    response.headers['Retry-After'] = '5'
+    return response
+
+# Kabul kontrolündeki uç noktalar ve varsayılan öncelikleri (X-Priority başlığı ile değiştirilebilir).
+# Akış uç noktası dahil değil: dakikalarca sürer ve kendi sınırlı prefetch kuyruğuyla zaten yavaşlar
+_ADMISSION_PRIORITIES = {"analyze_text": PRIORITY_INTERACTIVE, "analyze_batch": PRIORITY_BULK}
+
+@app.before_request
+def admit_request():
+    # Decided before the body is parsed, so a rejected request costs as little as possible
+    default_priority = _ADMISSION_PRIORITIES.get(request.endpoint)
+    if admission is None or default_priority is None or request.method != 'POST':
+        return None
+    priority = request.headers.get('X-Priority', default_priority)
+    if priority not in PRIORITIES:
+        return _bad_request(f"Geçersiz öncelik: {priority} (geçerli: {', '.join(PRIORITIES)})")
+    # X-Request-Deadline-Ms: isteğin sisteme girdiği andan (X-Request-Start, yoksa Flask'a ulaştığı an) kalan süre
+    deadline_ms = request.headers.get('X-Request-Deadline-Ms')
+    try:
+        deadline_ms = float(deadline_ms) if deadline_ms else settings.ADMISSION_DEFAULT_DEADLINE_MS
+    except ValueError:
+        return _bad_request(f"Geçersiz X-Request-Deadline-Ms: {deadline_ms}")
+    deadline = None
+    if deadline_ms > 0:
+        age = _request_age(request.headers.get('X-Request-Start'))
+        if age is None:
+            age = time.perf_counter() - g.request_start
+        deadline = time.monotonic() + deadline_ms / 1000 - age
+    g.request_deadline = deadline
+    try:
+        g.admitted = (priority, admission.acquire(priority, deadline))
+    except Rejected as e:
+        return _rejected(e)
+    return None
+
+def _request_age(value):
+    """X-Request-Start başlığından isteğin yaşı (sn); başlık yoksa veya okunamazsa None.
+
+    Set by the proxy (or load balancer, or client) when the request entered the system, so
+    time spent in the listen backlog and in gunicorn before Flask counts against the deadline.
+    Accepts "t=<epoch>" or a bare epoch, in seconds, milliseconds or microseconds.
+    """
+    value = (value or '').strip()
+    if value.startswith('t='):
+        value = value[2:]
+    if not value:
+        return None
+    try:
+        started = float(value)
+    except ValueError:
+        # Written by infrastructure, not by the client: fall back to our own clock instead of a 400
+        return None
+    if started > 1e14:
+        started /= 1e6
+    elif started > 1e11:
+        started /= 1e3
+    # Clocks of different hosts may disagree a little; never move the deadline past our own clock
+    return max(0.0, time.time() - started)
+
+@app.teardown_request
+def release_admission(exc):
+    admitted = g.pop('admitted', None)
+    if admitted is not None:
+        admission.release(*admitted)
+
 @app.route('/api/check-hate-speech', methods=['GET', 'POST'])
 def analyze_text():
     try:
@@ -48,28 +204,48 @@ def analyze_text():
                 "message": "Metin sağlanmadı",
                 "timestamp": datetime.now().isoformat()
             }), 400
+        if not isinstance(data['text'], str):
+            return _bad_request("Metin string olmalı")
 
-        logger.debug(f"Analiz edilecek metin: {data['text']}")
+        tier = data.get('tier', 'standard')
+        if tier not in TIERS:
+            return _invalid_tier(tier)
+        slot, tier = _select_tier(tier)
+        detail = data.get('detail', settings.DEFAULT_DETAIL_LEVEL)
+        if detail not in DETAIL_LEVELS:
+            return _invalid_detail(detail)
+        logger.debug("Analiz edilecek metin: %s", data['text'])
         
-        # Metin analizi
-        result = model.analyze_text(data['text'])
-        logger.debug(f"Analiz sonucu: {result}")
+        # Metin analizi: istek baştan sona aynı model sürümünde kalır
+        with slot.use() as state:
+            result = state.analyze_text(data['text'], detail, g.get('request_deadline'))
+            slot.offer_shadow([data['text']], state.handler)
+        logger.debug("Analiz sonucu: %s", result)
         
         # Yanıt formatı
         response = {
             "status": "success",
-            "data": {
-                "is_hate_speech": result["is_hate_speech"],
-                "confidence": result["confidence"],
-                "category": result["category"],
-                "details": result["details"]
-            },
+            "data": _result_data(result),
+            "tier": tier,
             "timestamp": datetime.now().isoformat()
         }
         
-        logger.info(f"Metin analizi başarılı: {response}")
-        return jsonify(response)
+        logger.info("Metin analizi başarılı", extra={
+            "tier": tier,
+            "detail": detail,
+            "category": result["category"],
+            "confidence": round(result["confidence"], 4),
+            "text_length": len(data['text'])
+        })
+        serialize_start = time.perf_counter()
+        json_response = _json_response(response)
+        _SERIALIZE_SECONDS.observe(time.perf_counter() - serialize_start)
+        return json_response
 
+    except (BatcherUnavailable, ModelUnavailable) as e:
+        return _unavailable(e)
+    except AnalysisError as e:
+        return _analysis_failed(e)
     except Exception as e:
         error_msg = f"Hata oluştu: {str(e)}\nStack trace: {traceback.format_exc()}"
         logger.error(error_msg)
@@ -80,6 +256,252 @@ def analyze_text():
         }
         return jsonify(error_response), 500
 
+@app.route('/api/check-hate-speech/batch', methods=['POST'])
+def analyze_batch():
+    try:
+        data = request.get_json()
+        texts = data.get('texts') if isinstance(data, dict) else None
+        if not isinstance(texts, list) or not texts:
+            logger.warning("Metin listesi eksik")
+            return jsonify({
+                "status": "error",
+                "message": "Metin listesi sağlanmadı",
+                "timestamp": datetime.now().isoformat()
+            }), 400
+
+        if len(texts) > settings.BATCH_MAX_TEXTS:
+            logger.warning("Metin listesi çok uzun: %d", len(texts))
+            return jsonify({
+                "status": "error",
+                "message": f"Tek istekte en fazla {settings.BATCH_MAX_TEXTS} metin gönderilebilir",
+                "timestamp": datetime.now().isoformat()
+            }), 413
+
+        tier = data.get('tier', 'standard')
+        if tier not in TIERS:
+            return _invalid_tier(tier)
+        slot, tier = _select_tier(tier)
+        detail = data.get('detail', settings.DEFAULT_DETAIL_LEVEL)
+        if detail not in DETAIL_LEVELS:
+            return _invalid_detail(detail)
+        logger.debug("Toplu analiz edilecek metin sayısı: %d", len(texts))
+        with slot.use() as state:
+            results = state.handler.analyze_batch(texts, detail)
+            slot.offer_shadow(texts, state.handler)
+
+        # Her metin için ayrı sonuç, giriş sırası korunur
+        items = []
+        for index, result in enumerate(results):
+            if "error" in result:
+                items.append({
+                    "index": index,
+                    "status": "error",
+                    "message": result["error"]
+                })
+            else:
+                items.append({
+                    "index": index,
+                    "status": "success",
+                    "data": _result_data(result)
+                })
+
+        logger.info("Toplu metin analizi tamamlandı", extra={"texts": len(items), "tier": tier})
+        serialize_start = time.perf_counter()
+        json_response = _json_response({
+            "status": "success",
+            "data": items,
+            "tier": tier,
+            "timestamp": datetime.now().isoformat()
+        })
+        _SERIALIZE_SECONDS.observe(time.perf_counter() - serialize_start)
+        return json_response
+
+    except ModelUnavailable as e:
+        return _unavailable(e)
+    except Exception as e:
+        error_msg = f"Hata oluştu: {str(e)}\nStack trace: {traceback.format_exc()}"
+        logger.error(error_msg)
+        return jsonify({
+            "status": "error",
+            "message": str(e),
+            "timestamp": datetime.now().isoformat()
+        }), 500
+
+def _select_tier(tier):
+    # Hızlı model yapılandırılmamışsa istek standart modelle yanıtlanır (yanıttaki "tier" bunu gösterir)
+    if tier == "fast" and fast_slot is not None:
+        return fast_slot, "fast"
+    return model_slot, "standard"
+
+def _invalid_tier(tier):
+    logger.warning("Geçersiz model katmanı: %s", tier)
+    return jsonify({
+        "status": "error",
+        "message": f"Geçersiz model katmanı: {tier} (geçerli: {', '.join(TIERS)})",
+        "timestamp": datetime.now().isoformat()
+    }), 400
+
+def _invalid_detail(detail):
+    logger.warning("Geçersiz ayrıntı düzeyi: %s", detail)
+    return jsonify({
+        "status": "error",
+        "message": f"Geçersiz ayrıntı düzeyi: {detail} (geçerli: {', '.join(DETAIL_LEVELS)})",
+        "timestamp": datetime.now().isoformat()
+    }), 400
+
+def _bad_request(message):
+    logger.warning(message)
+    return jsonify({
+        "status": "error",
+        "message": message,
+        "timestamp": datetime.now().isoformat()
+    }), 400
+
+def _rejected(e):
+    # Yük atma: istemci Retry-After kadar bekleyip tekrar denemeli. Reddedilenler metriklerde sayılır;
+    # aşırı yükte her biri için uyarı loglamak sunucuya ek iş olurdu
+    logger.debug("İstek reddedildi: %s", e.reason, extra={"status_code": e.status, "retry_after": e.retry_after})
+    response = jsonify({
+        "status": "error",
+        "message": str(e),
+        "reason": e.reason,
+        "timestamp": datetime.now().isoformat()
+    })
+    response.status_code = e.status
+    response.headers['Retry-After'] = str(e.retry_after)
+    return response
+
+def _unavailable(e):
+    # Model/zamanlayıcı kapanıyor (model değişimi, worker kapanışı) veya sonuç son tarihe yetişmedi: tekrar denenebilir
+    logger.warning("Analiz şu an yapılamıyor: %s", e)
+    response = jsonify({
+        "status": "error",
+        "message": str(e),
+        "reason": "unavailable",
+        "timestamp": datetime.now().isoformat()
+    })
+    response.status_code = 503
+    response.headers['Retry-After'] = '1'
+    return response
+
+def _analysis_failed(e):
+    # Model bu metni analiz edemedi; hata batch içinde yalnızca bu metne aittir
+    logger.error("Metin analiz edilemedi: %s", e)
+    return jsonify({
+        "status": "error",
+        "message": f"Metin analiz edilemedi: {e}",
+        "reason": "analysis_failed",
+        "timestamp": datetime.now().isoformat()
+    }), 500
+
+def _result_data(result):
+    # "details" yalnızca minimal düzeyde yoktur
+    data = {
+        "is_hate_speech": result["is_hate_speech"],
+        "confidence": result["confidence"],
+        "category": result["category"]
+    }
+    if "details" in result:
+        data["details"] = result["details"]
+    data["decided_by"] = result["decided_by"]
+    return data
+
+def _json_response(payload, status=200):
+    if orjson is None:
+        response = jsonify(payload)
+        response.status_code = status
+        return response
+    # UTF-8 without escaping and without key sorting: smaller and faster than jsonify's output
+    return Response(orjson.dumps(payload), status=status, mimetype='application/json')
+
+def _json_line(item):
+    # NDJSON akışında bir satır
+    if orjson is None:
+        return json.dumps(item, ensure_ascii=False) + "\n"
+    return orjson.dumps(item) + b"\n"
+
+@app.route('/api/check-hate-speech/stream', methods=['POST'])
+def analyze_stream():
+    # Girdi: satır başına bir {"id", "text"}; çıktı: batch'ler bittikçe satır başına bir sonuç.
+    # Gövde önce biriktirilir (belirli bir boyuttan sonra diske): yanıtı okumadan tüm gövdeyi
+    # gönderen istemciler, sunucu yazarken gövde okunmayı beklediğinde kilitlenmez.
+    spool = tempfile.SpooledTemporaryFile(max_size=settings.STREAM_SPOOL_MEMORY_BYTES)
+    try:
+        shutil.copyfileobj(request.stream, spool, 64 * 1024)
+    except Exception:
+        spool.close()
+        raise
+    spool.seek(0)
+    detail = request.args.get('detail', settings.DEFAULT_DETAIL_LEVEL)
+    if detail not in DETAIL_LEVELS:
+        spool.close()
+        return _invalid_detail(detail)
+    # The model version is held until the response is closed, not just until this function returns
+    try:
+        state = model_slot.acquire()
+    except ModelUnavailable as e:
+        spool.close()
+        return _unavailable(e)
+    results = state.handler.analyze_stream(
+        _read_stream_items(spool), batch_size=settings.STREAM_BATCH_SIZE or settings.MODEL_BATCH_SIZE, detail=detail
+    )
+
+    def generate():
+        processed = errors = 0
+        try:
+            for key, result in results:
+                message = key.get("error") or result.get("error")
+                if message:
+                    errors += 1
+                    item = {"id": key.get("id"), "line": key["line"], "status": "error", "message": message}
+                else:
+                    processed += 1
+                    item = {
+                        "id": key.get("id"),
+                        "status": "success",
+                        "data": _result_data(result)
+                    }
+                yield _json_line(item)
+            # Son satır: akışın kesilmeden bittiğini gösterir
+            yield _json_line({"status": "done", "processed": processed, "errors": errors})
+            logger.info("Akış analizi tamamlandı", extra={"texts": processed, "errors": errors})
+        except GeneratorExit:
+            logger.warning("İstemci akış bitmeden bağlantıyı kapattı (%d metin gönderildi)", processed + errors)
+            raise
+        finally:
+            results.close()
+            spool.close()
+
+    response = Response(generate(), mimetype='application/x-ndjson', headers={'X-Accel-Buffering': 'no'})
+    response.call_on_close(state.release)
+    return response
+
+def _read_stream_items(spool):
+    line_number = 0
+    while True:
+        line = spool.readline(settings.STREAM_MAX_LINE_BYTES + 1)
+        if not line:
+            return
+        line_number += 1
+        if len(line) > settings.STREAM_MAX_LINE_BYTES:
+            # Skip the rest of an oversized line without holding it in memory
+            while line and not line.endswith(b"\n"):
+                line = spool.readline(settings.STREAM_MAX_LINE_BYTES)
+            yield {"line": line_number, "error": "Satır çok uzun"}, None
+            continue
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            yield {"line": line_number, "error": "Geçersiz JSON"}, None
+            continue
+        if not isinstance(record, dict) or "text" not in record:
+            record_id = record.get("id") if isinstance(record, dict) else None
+            yield {"line": line_number, "id": record_id, "error": "Metin sağlanmadı"}, None
+            continue
+        yield {"line": line_number, "id": record.get("id")}, record["text"]
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
     return jsonify({
@@ -87,15 +509,128 @@ def health_check():
         "timestamp": datetime.now().isoformat()
     })
 
+@app.route('/api/ready', methods=['GET'])
+def readiness_check():
+    # /api/health süreç ayakta mı, /api/ready model yüklendi ve ısındı mı sorusunu yanıtlar
+    model = model_slot.handler
+    ready = all(slot.handler.ready for slot in slots.values())
+    return jsonify({
+        "status": "ready" if ready else "starting",
+        "model_version": model.model_version,
+        "model_release": model_slot.state.version,
+        "fast_model_version": fast_slot.handler.model_version if fast_slot is not None else None,
+        "backend": model.backend_name,
+        "startup_timings": model.startup_timings,
+        "timestamp": datetime.now().isoformat()
+    }), 200 if ready else 503
+
+@app.route('/api/cache/stats', methods=['GET'])
+def cache_stats():
+    stats = model_slot.handler.cache_stats()
+    if stats is None:
+        return jsonify({
+            "status": "error",
+            "message": "Sonuç önbelleği devre dışı",
+            "timestamp": datetime.now().isoformat()
+        }), 404
+    return jsonify({
+        "status": "success",
+        "data": stats,
+        "timestamp": datetime.now().isoformat()
+    })
+
+@app.route('/api/metrics', methods=['GET'])
+def prometheus_metrics():
+    return Response(metrics.REGISTRY.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+def _admin_slot():
+    # Yönetim uç noktaları ADMIN_TOKEN ile korunur; token tanımlı değilse kapalıdır
+    if not settings.ADMIN_TOKEN:
+        return None, (jsonify({"status": "error", "message": "Yönetim uç noktaları kapalı (ADMIN_TOKEN tanımlı değil)",
+                               "timestamp": datetime.now().isoformat()}), 404)
+    supplied = request.headers.get('Authorization', '')
+    supplied = supplied[7:] if supplied.startswith('Bearer ') else request.headers.get('X-Admin-Token', '')
+    if not hmac.compare_digest(supplied.encode('utf-8'), settings.ADMIN_TOKEN.encode('utf-8')):
+        logger.warning("Yetkisiz yönetim isteği: %s", request.path)
+        return None, (jsonify({"status": "error", "message": "Yetkisiz",
+                               "timestamp": datetime.now().isoformat()}), 401)
+    data = request.get_json(silent=True) or {}
+    tier = data.get('tier') or request.args.get('tier', 'standard')
+    if tier not in slots:
+        return None, (jsonify({"status": "error", "message": f"Model katmanı yapılandırılmamış: {tier}",
+                               "timestamp": datetime.now().isoformat()}), 400)
+    return (slots[tier], data), None
+
+@app.route('/api/admin/reload', methods=['POST'])
+def admin_reload():
+    # {"version": "v3"} sürümü etkinleştirir (tüm worker'lar CURRENT dosyasını izler); sürümsüz: diskten yeniden yükle
+    selected, error = _admin_slot()
+    if error:
+        return error
+    slot, data = selected
+    try:
+        status = slot.request_reload(data.get('version'), wait=bool(data.get('wait')))
+    except (ValueError, FileNotFoundError) as e:
+        return jsonify({"status": "error", "message": str(e), "timestamp": datetime.now().isoformat()}), 400
+    logger.info("Model yeniden yükleme istendi", extra={"tier": slot.name, "version": data.get('version')})
+    return jsonify({"status": "success", "data": status, "timestamp": datetime.now().isoformat()}), \
+        200 if data.get('wait') else 202
+
+@app.route('/api/admin/shadow', methods=['POST', 'DELETE'])
+def admin_shadow():
+    # {"version": "v4", "sample_rate": 0.05} aday sürümü gölge modda çalıştırır; DELETE durdurur
+    selected, error = _admin_slot()
+    if error:
+        return error
+    slot, data = selected
+    if request.method == 'DELETE':
+        return jsonify({"status": "success", "data": slot.stop_shadow(), "timestamp": datetime.now().isoformat()})
+    try:
+        sample_rate = float(data.get('sample_rate', 0.05))
+        status = slot.request_shadow(data.get('version'), sample_rate)
+    except (TypeError, ValueError, FileNotFoundError) as e:
+        return jsonify({"status": "error", "message": str(e), "timestamp": datetime.now().isoformat()}), 400
+    return jsonify({"status": "success", "data": status, "timestamp": datetime.now().isoformat()}), 202
+
+@app.route('/api/admin/status', methods=['GET'])
+def admin_status():
+    # Bu worker'ın görünümü; tüm worker'ların toplamları /api/metrics'te
+    selected, error = _admin_slot()
+    if error:
+        return error
+    return jsonify({
+        "status": "success",
+        "data": {name: slot.status() for name, slot in slots.items()},
+        "timestamp": datetime.now().isoformat()
+    })
+
+_categories_cache = (None, None, None)
+
+def _categories_payload():
+    # Encoded once per loaded model (a reload replaces the handler), not on every request
+    global _categories_cache
+    handler = model_slot.handler
+    cached_handler, data, etag = _categories_cache
+    if cached_handler is not handler:
+        data = json.dumps(handler.categories, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        etag = hashlib.sha1(json.dumps(handler.categories, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+        _categories_cache = (handler, data, etag)
+    return data, etag
+
 @app.route('/api/categories', methods=['GET'])
 def get_categories():
     try:
-        categories = model.categories
-        return jsonify({
-            "status": "success",
-            "data": categories,
-            "timestamp": datetime.now().isoformat()
-        })
+        data, etag = _categories_payload()
+        # Weak ETag over the categories only (the timestamp differs on every call); a match returns 304
+        if request.if_none_match.contains_weak(etag):
+            response = Response(status=304)
+        else:
+            # Only the timestamp is new per response; the encoded categories are reused
+            timestamp = json.dumps(datetime.now().isoformat()).encode("utf-8")
+            response = Response(b'{"status":"success","data":' + data + b',"timestamp":' + timestamp + b'}',
+                                content_type='application/json')
+        response.set_etag(etag, weak=True)
+        return response
     except Exception as e:
         error_msg = f"Kategoriler alınırken hata oluştu: {str(e)}\nStack trace: {traceback.format_exc()}"
         logger.error(error_msg)
@@ -106,6 +641,11 @@ def get_categories():
         }), 500
 
 if __name__ == '__main__':
-    # Logs klasörünü oluştur
-    os.makedirs('logs', exist_ok=True)
-    app.run(host='0.0.0.0', port=8000, debug=True)
\ No newline at end of file
+    for slot in slots.values():
+        if settings.MODEL_LOAD_IN_BACKGROUND:
+            threading.Thread(target=slot.handler.start, name="model-loader", daemon=True).start()
+        else:
+            slot.handler.warmup()
+    # Geliştirme sunucusu; üretimde gunicorn.conf.py ile çalıştırın.
+    # Reloader modeli ikinci bir süreçte tekrar yüklediği için kapalı.
+    app.run(host='0.0.0.0', port=settings.PORT, debug=settings.FLASK_DEBUG, use_reloader=False)
\ No newline at end of file
@@ -0,0 +1,155 @@
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Dict, List, Optional, Tuple
+
+import metrics
+import settings
+from model_handler import DETAIL_FULL
+
+logger = logging.getLogger(__name__)
+
+_QUEUE_WAIT_SECONDS = metrics.STAGE_SECONDS.labels("queue_wait")
+
+
+class BatcherUnavailable(Exception):
+    """Zamanlayıcı kapanıyor ya da sonuç süresi içinde gelmedi; istek tekrar denenebilir (503)."""
+
+
+class AnalysisError(Exception):
+    """Metin batch içinde analiz edilemedi; batch'teki diğer metinler etkilenmez (500)."""
+
+
+def _result_timeout(deadline: Optional[float]) -> float:
+    # `deadline` is the request's time.monotonic() deadline; the result wait never exceeds it
+    timeout = settings.MICRO_BATCH_RESULT_TIMEOUT_S
+    if deadline is not None:
+        timeout = min(timeout, max(0.0, deadline - time.monotonic()))
+    return timeout
+
+
+class MicroBatcher:
+    """Eşzamanlı tekil analiz isteklerini tek bir model forward pass'inde toplar."""
+
+    def __init__(self, handler, max_batch_size: int, max_wait_ms: float):
+        self.handler = handler
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self._queue: "queue.Queue[Tuple[str, str, Future, float]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self._closing = False
+        self._stopped = False
+
+    def submit(self, text: str, detail: str = DETAIL_FULL) -> Future:
+        self._ensure_started()
+        future: Future = Future()
+        # Checked under the lock close() takes, so nothing can be queued behind the stop sentinel
+        with self._lock:
+            if self._closing:
+                raise BatcherUnavailable("Mikro-batch zamanlayıcı kapanıyor")
+            self._queue.put((text, detail, future, time.perf_counter()))
+        return future
+
+    def analyze_text(self, text: str, detail: str = DETAIL_FULL, deadline: Optional[float] = None) -> Dict:
+        # Identical texts already waiting in the queue or running are not queued again. A caller
+        # that joins another request's call waits only until its own deadline, and if that call
+        # runs out of time (its deadline, not ours), this one submits the text itself
+        timeout = _result_timeout(deadline)
+        try:
+            return self.handler.coalesced(
+                text, lambda text: self._wait_for_result(text, detail, deadline), detail,
+                timeout=timeout, retry=lambda e: isinstance(e, BatcherUnavailable)
+            )
+        except FutureTimeoutError:
+            raise BatcherUnavailable(f"Mikro-batch sonucu {timeout:.2f} sn içinde gelmedi")
+
+    def _wait_for_result(self, text: str, detail: str, deadline: Optional[float]) -> Dict:
+        timeout = _result_timeout(deadline)
+        future = self.submit(text, detail)
+        try:
+            result = future.result(timeout)
+        except FutureTimeoutError:
+            # Still queued: cancel it so the worker skips it instead of running the model for nobody
+            future.cancel()
+            raise BatcherUnavailable(f"Mikro-batch sonucu {timeout:.2f} sn içinde gelmedi")
+        if "error" in result:
+            raise AnalysisError(result["error"])
+        return result
+
+    def _ensure_started(self):
+        # Threads do not survive fork, so restart the worker in each process
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is None or self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+                self._thread.start()
+                logger.info(
+                    "Mikro-batch zamanlayıcı başlatıldı (max_batch_size=%d, max_wait_ms=%.1f)",
+                    self.max_batch_size, self.max_wait * 1000
+                )
+
+    def close(self, timeout: float = 5.0):
+        # Finish queued requests, then stop the worker thread (graceful shutdown).
+        # Later submit() calls fail fast instead of queueing work that nobody will run.
+        with self._lock:
+            if self._closing:
+                return
+            self._closing = True
+            if self._thread is None or self._pid != os.getpid():
+                return
+            self._queue.put(None)
+        self._thread.join(timeout)
+
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    def _collect(self) -> List[Tuple[str, str, Future, float]]:
+        batch = []
+        item = self._queue.get()
+        deadline = time.monotonic() + self.max_wait
+        while item is not None:
+            batch.append(item)
+            if len(batch) >= self.max_batch_size:
+                break
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining <= 0:
+                    item = self._queue.get_nowait()
+                else:
+                    item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+        if item is None:
+            self._stopped = True
+        # Requests whose caller stopped waiting (timed out) are dropped here
+        return [item for item in batch if item[2].set_running_or_notify_cancel()]
+
+    def _run(self):
+        while not self._stopped:
+            batch = self._collect()
+            if not batch:
+                continue
+            dequeued_at = time.perf_counter()
+            for _, _, _, enqueued_at in batch:
+                _QUEUE_WAIT_SECONDS.observe(dequeued_at - enqueued_at)
+            # Requests with different detail levels share the forward pass
+            texts = [text for text, _, _, _ in batch]
+            levels = [detail for _, detail, _, _ in batch]
+            try:
+                results = self.handler.analyze_batch(texts, levels)
+            except Exception as e:
+                logger.error("Mikro-batch işlenirken hata oluştu: %s", e)
+                for _, _, future, _ in batch:
+                    future.set_exception(e)
+                continue
+
+            logger.debug("Mikro-batch işlendi: %d metin", len(batch))
+            for (_, _, future, _), result in zip(batch, results):
+                future.set_result(result)
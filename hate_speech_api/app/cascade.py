@@ -0,0 +1,105 @@
+import logging
+import os
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+import metrics
+from ngram_features import FEATURE_VERSION, hash_features
+
+logger = logging.getLogger(__name__)
+
+FAST_CLASSIFIER_FILE = "fast_classifier.npz"
+
+# Which stage produced the final answer
+STAGE_LEXICON = "lexicon"
+STAGE_FAST = "fast"
+STAGE_TRANSFORMER = "transformer"
+
+_DECISIONS = {
+    stage: metrics.CASCADE_DECISIONS.labels(stage) for stage in (STAGE_LEXICON, STAGE_FAST, STAGE_TRANSFORMER)
+}
+
+
+class FastClassifier:
+    """Hash'lenmiş n-gram özellikleri üzerinde doğrusal model (train_fast_classifier.py ile eğitilir)."""
+
+    def __init__(self, path: str):
+        with np.load(path) as data:
+            self.weights = data["weights"]
+            self.bias = data["bias"]
+            self.classes = [str(label) for label in data["classes"]]
+            self.n_features = int(data["n_features"])
+            feature_version = int(data["feature_version"])
+            # Trained with banned-word hits as features (older files predate the flag)
+            self.lexicon_features = bool(data["lexicon_features"]) if "lexicon_features" in data else False
+        if feature_version != FEATURE_VERSION:
+            raise ValueError(
+                f"Hızlı sınıflandırıcı farklı bir özellik sürümüyle eğitilmiş ({feature_version} != {FEATURE_VERSION})"
+            )
+
+    def predict_proba(self, text: str, lexicon_categories: Sequence[str] = ()) -> np.ndarray:
+        if not self.lexicon_features:
+            lexicon_categories = ()
+        indices, values = hash_features(text, self.n_features, lexicon_categories)
+        logits = self.bias + values @ self.weights[indices]
+        exp = np.exp(logits - logits.max())
+        return exp / exp.sum()
+
+
+class Cascade:
+    """Ucuz ilk aşama: sözlük eşleşmesi ve hızlı sınıflandırıcı; belirsiz metinler transformer'a gider.
+
+    The fast classifier's hate probability decides on its own outside the
+    [low, high] band. Inside the band the text is escalated to the transformer.
+    Banned-word hits (whole words from the curated list only) are a classifier
+    feature; with use_lexicon they also decide on their own, which is only worth it
+    when cascade_report.py shows a high lexicon precision.
+    """
+
+    def __init__(self, classifier: FastClassifier, sensitive_words, labels: List[str], low: float, high: float,
+                 use_lexicon: bool = False):
+        if list(classifier.classes) != list(labels):
+            raise ValueError(f"Hızlı sınıflandırıcı sınıfları modelle uyuşmuyor: {classifier.classes} != {labels}")
+        self.classifier = classifier
+        self.sensitive_words = sensitive_words
+        self.low = low
+        self.high = high
+        self.use_lexicon = use_lexicon
+        self.hate_index = hate_class_index(labels)
+        self.version = f"cascade:{low}:{high}:{int(use_lexicon)}"
+
+    @classmethod
+    def load(cls, model_path: str, sensitive_words, labels: List[str], low: float, high: float,
+             use_lexicon: bool = False, classifier_path: Optional[str] = None) -> Optional["Cascade"]:
+        path = classifier_path or os.path.join(model_path, FAST_CLASSIFIER_FILE)
+        if not os.path.exists(path):
+            logger.warning("Hızlı sınıflandırıcı bulunamadı, kaskad kapalı: %s", path)
+            return None
+        cascade = cls(FastClassifier(path), sensitive_words, labels, low, high, use_lexicon)
+        logger.info("Kaskad etkin: %s (belirsizlik aralığı %.2f-%.2f)", path, low, high)
+        return cascade
+
+    def decide(self, text: str) -> Tuple[Optional[np.ndarray], str]:
+        # Returns (probabilities, stage); probabilities is None when the text must be escalated
+        banned = self.sensitive_words.find_banned(text)
+        if self.use_lexicon and banned:
+            probabilities = np.zeros(len(self.classifier.classes), dtype=np.float32)
+            probabilities[self.hate_index] = 1.0
+            _DECISIONS[STAGE_LEXICON].inc()
+            return probabilities, STAGE_LEXICON
+        probabilities = self.classifier.predict_proba(text, banned)
+        hate_probability = probabilities[self.hate_index]
+        if hate_probability < self.low or hate_probability > self.high:
+            _DECISIONS[STAGE_FAST].inc()
+            return probabilities, STAGE_FAST
+        _DECISIONS[STAGE_TRANSFORMER].inc()
+        return None, STAGE_TRANSFORMER
+
+
+def hate_class_index(labels: List[str]) -> int:
+    # Named label maps use "nefret_söylemi"; numeric ones (the training data) use "1"
+    for name in ("nefret_söylemi", "1"):
+        if name in labels:
+            return labels.index(name)
+    return 1
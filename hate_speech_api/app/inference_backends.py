@@ -0,0 +1,97 @@
+import logging
+import os
+from typing import Dict
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class TorchBackend:
+    """Eager fp32 PyTorch çıkarımı."""
+
+    name = "torch"
+    tensor_type = "pt"
+
+    def __init__(self, model_path: str, num_threads: int = 0, low_cpu_mem_usage: bool = True):
+        # torch and transformers are imported here, not at module import time
+        import torch
+        from transformers import AutoModelForSequenceClassification
+
+        self._torch = torch
+        if num_threads > 0:
+            torch.set_num_threads(num_threads)
+        # low_cpu_mem_usage builds the model without random init and fills it
+        # from the memory-mapped safetensors file, so weights exist only once
+        self.model = AutoModelForSequenceClassification.from_pretrained(
+            model_path, local_files_only=True, low_cpu_mem_usage=low_cpu_mem_usage
+        )
+        self.model.eval()
+
+    def predict(self, inputs: Dict) -> np.ndarray:
+        torch = self._torch
+        with torch.no_grad():
+            outputs = self.model(**inputs)
+            return torch.softmax(outputs.logits, dim=1).numpy()
+
+
+class QuantizedTorchBackend(TorchBackend):
+    """Linear katmanları dinamik int8'e çevrilmiş PyTorch çıkarımı."""
+
+    name = "torch-int8"
+
+    def __init__(self, model_path: str, num_threads: int = 0, low_cpu_mem_usage: bool = True):
+        super().__init__(model_path, num_threads, low_cpu_mem_usage)
+        torch = self._torch
+        self.model = torch.quantization.quantize_dynamic(self.model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+class OnnxBackend:
+    """Dışa aktarılmış ONNX modelini ONNX Runtime ile çalıştırır."""
+
+    name = "onnx"
+    tensor_type = "np"
+
+    def __init__(self, model_path: str, num_threads: int = 0, model_file: str = "model.onnx"):
+        try:
+            import onnxruntime
+        except ImportError as e:
+            raise ImportError("onnx backend için onnxruntime kurulu olmalı (pip install onnxruntime)") from e
+
+        onnx_path = os.path.join(model_path, model_file)
+        if not os.path.exists(onnx_path):
+            raise FileNotFoundError(
+                f"ONNX modeli bulunamadı: {onnx_path} (stages/trainstage/export_onnx.py ile oluşturun)"
+            )
+
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads > 0:
+            options.intra_op_num_threads = num_threads
+        self.session = onnxruntime.InferenceSession(onnx_path, options, providers=["CPUExecutionProvider"])
+        self.input_names = [model_input.name for model_input in self.session.get_inputs()]
+
+    def predict(self, inputs: Dict) -> np.ndarray:
+        feed = {name: np.asarray(inputs[name], dtype=np.int64) for name in self.input_names}
+        logits = self.session.run(None, feed)[0]
+        # Softmax in float64 to stay close to the torch path
+        logits = logits.astype(np.float64)
+        exp = np.exp(logits - logits.max(axis=1, keepdims=True))
+        return (exp / exp.sum(axis=1, keepdims=True)).astype(np.float32)
+
+
+BACKENDS = {
+    TorchBackend.name: TorchBackend,
+    QuantizedTorchBackend.name: QuantizedTorchBackend,
+    OnnxBackend.name: OnnxBackend,
+}
+
+
+def create_backend(name: str, model_path: str, num_threads: int = 0, onnx_model_file: str = "model.onnx",
+                   low_cpu_mem_usage: bool = True):
+    if name not in BACKENDS:
+        raise ValueError(f"Bilinmeyen çıkarım backend'i: {name} (seçenekler: {', '.join(BACKENDS)})")
+    logger.info("Çıkarım backend'i yükleniyor: %s", name)
+    if name == OnnxBackend.name:
+        return OnnxBackend(model_path, num_threads, onnx_model_file)
+    return BACKENDS[name](model_path, num_threads, low_cpu_mem_usage)
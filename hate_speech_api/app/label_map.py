@@ -0,0 +1,49 @@
+import json
+import logging
+import os
+import sys
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+LABEL_MAP_FILE = "label_map.json"
+LABEL_ENCODER_FILE = "label_encoder.pkl"
+
+
+def load_labels(model_path: str) -> Optional[List[str]]:
+    # Plain JSON label map; the sklearn pickle is only a fallback because
+    # unpickling a LabelEncoder imports scikit-learn at startup
+    label_map_path = os.path.join(model_path, LABEL_MAP_FILE)
+    if os.path.exists(label_map_path):
+        with open(label_map_path, encoding="utf-8") as f:
+            return [str(label) for label in json.load(f)["classes"]]
+
+    label_encoder_path = os.path.join(model_path, LABEL_ENCODER_FILE)
+    if os.path.exists(label_encoder_path):
+        logger.warning(
+            "%s bulunamadı, %s okunuyor (scikit-learn yüklenecek). Dönüştürmek için: python app/label_map.py %s",
+            LABEL_MAP_FILE, LABEL_ENCODER_FILE, model_path
+        )
+        return read_label_encoder(label_encoder_path)
+    return None
+
+
+def read_label_encoder(label_encoder_path: str) -> List[str]:
+    import pickle
+    with open(label_encoder_path, "rb") as f:
+        label_encoder = pickle.load(f)
+    return [str(label) for label in label_encoder.classes_]
+
+
+def write_label_map(model_path: str, labels: List[str]) -> str:
+    label_map_path = os.path.join(model_path, LABEL_MAP_FILE)
+    with open(label_map_path, "w", encoding="utf-8") as f:
+        json.dump({"classes": [str(label) for label in labels]}, f, ensure_ascii=False, indent=2)
+    return label_map_path
+
+
+if __name__ == "__main__":
+    # label_encoder.pkl -> label_map.json
+    model_dir = sys.argv[1] if len(sys.argv) > 1 else "model"
+    labels = read_label_encoder(os.path.join(model_dir, LABEL_ENCODER_FILE))
+    print(f"Etiket haritası yazıldı: {write_label_map(model_dir, labels)} {labels}")
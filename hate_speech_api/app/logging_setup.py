@@ -0,0 +1,156 @@
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import threading
+from datetime import datetime, timezone
+from typing import Callable, Dict, List
+
+import settings
+
+# Standard LogRecord attributes; everything else passed via extra= is emitted as a field
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    """Her kaydı tek satırlık JSON olarak yazar."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+            "pid": record.process,
+            "thread": record.threadName
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """Seviye başına örnekleme oranı uygular (ör. DEBUG=0.01 kayıtların %1'ini geçirir)."""
+
+    def __init__(self, rates: Dict[int, float]):
+        super().__init__()
+        self.rates = rates
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        rate = self.rates.get(record.levelno, 1.0)
+        return rate >= 1.0 or random.random() < rate
+
+
+class AsyncQueueHandler(logging.handlers.QueueHandler):
+    """Kayıtları kuyruğa bırakır; biçimlendirme ve yazma arka plan iş parçacığında yapılır."""
+
+    def __init__(self, handler_factory: Callable[[bool], List[logging.Handler]], maxsize: int):
+        super().__init__(queue.Queue(maxsize))
+        self._handler_factory = handler_factory
+        self._maxsize = maxsize
+        self._lock = threading.Lock()
+        self._listener = None
+        self._pid = None
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Unlike the stdlib version, do not format the message here: %-style args
+        # are merged on the listener thread. Only tracebacks must be rendered now.
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        self._ensure_listener()
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            # Never block a request on logging
+            self.dropped += 1
+
+    def _ensure_listener(self):
+        # The listener thread does not survive fork (gunicorn workers), so each
+        # process starts its own queue, listener and file handle
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+        with self._lock:
+            if self._pid == pid:
+                return
+            forked = self._pid is not None
+            self.queue = queue.Queue(self._maxsize)
+            self._listener = logging.handlers.QueueListener(
+                self.queue, *self._handler_factory(forked), respect_handler_level=True
+            )
+            self._listener.start()
+            self._pid = pid
+
+    def close(self):
+        with self._lock:
+            if self._listener is not None and self._pid == os.getpid():
+                self._listener.stop()
+                for handler in self._listener.handlers:
+                    handler.close()
+                self._listener = None
+                self._pid = None
+        super().close()
+
+
+def _parse_sample_rates(value: str) -> Dict[int, float]:
+    rates = {}
+    for item in value.split(","):
+        if "=" in item:
+            level, rate = item.split("=", 1)
+            rates[logging.getLevelName(level.strip().upper())] = float(rate)
+    return rates
+
+
+def _make_formatter() -> logging.Formatter:
+    if settings.LOG_FORMAT == "json":
+        return JsonFormatter()
+    return logging.Formatter('[%(asctime)s] %(levelname)s: %(message)s')
+
+
+def _make_handlers(forked: bool) -> List[logging.Handler]:
+    formatter = _make_formatter()
+    handlers = []
+    if settings.LOG_FILE:
+        log_file = settings.LOG_FILE
+        if forked:
+            # One file per worker: several processes rotating one file would lose lines
+            root, ext = os.path.splitext(log_file)
+            log_file = f"{root}.{os.getpid()}{ext}"
+        os.makedirs(os.path.dirname(os.path.abspath(log_file)), exist_ok=True)
+        file_handler = logging.handlers.RotatingFileHandler(
+            log_file, maxBytes=settings.LOG_MAX_BYTES, backupCount=settings.LOG_BACKUP_COUNT, encoding="utf-8"
+        )
+        file_handler.setFormatter(formatter)
+        handlers.append(file_handler)
+    if settings.LOG_TO_STDOUT:
+        stream_handler = logging.StreamHandler()
+        stream_handler.setFormatter(formatter)
+        handlers.append(stream_handler)
+    return handlers
+
+
+def setup_logging():
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.setLevel(logging.getLevelName(settings.LOG_LEVEL.upper()))
+
+    if settings.LOG_ASYNC:
+        handlers = [AsyncQueueHandler(_make_handlers, settings.LOG_QUEUE_SIZE)]
+    else:
+        handlers = _make_handlers(False)
+
+    sampling = SamplingFilter(_parse_sample_rates(settings.LOG_SAMPLE_RATES))
+    for handler in handlers:
+        handler.addFilter(sampling)
+        root.addHandler(handler)
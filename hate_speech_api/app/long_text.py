@@ -0,0 +1,84 @@
+from typing import List
+
+import numpy as np
+
+MODE_TRUNCATE = "truncate"
+MODE_WINDOW = "window"
+AGGREGATE_MAX = "max"
+AGGREGATE_MEAN = "mean"
+
+
+class WindowedInputs:
+    """Kayan pencerelere bölünmüş bir batch: model girdileri ve her satırın ait olduğu metin.
+
+    `inputs` goes to the backend as is; the window-to-text mapping is kept outside it,
+    because the torch backend passes every key of the inputs to the model.
+    """
+
+    def __init__(self, inputs, text_rows: np.ndarray, num_texts: int, truncated: List[bool]):
+        self.inputs = inputs
+        self.text_rows = text_rows
+        self.num_texts = num_texts
+        self.truncated = truncated
+
+    def __getitem__(self, key):
+        return self.inputs[key]
+
+
+# Upper bound on characters per token; caps tokenizer work for huge inputs before the token budget applies
+MAX_CHARS_PER_TOKEN = 16
+
+
+def max_windows(token_budget: int, content: int, step: int) -> int:
+    # Windows needed to cover `token_budget` content tokens
+    if token_budget <= content:
+        return 1
+    return 1 + -(-(token_budget - content) // step)
+
+
+def tokenize_windows(tokenizer, texts: List[str], window: int, stride: int, token_budget: int,
+                     tensor_type: str) -> WindowedInputs:
+    """Metinleri bir kez tokenize eder ve eğitim uzunluğunda, örtüşen pencerelere böler.
+
+    Each text contributes at most `token_budget` tokens, which bounds the number of windows
+    (and therefore the cost of the forward pass) for any input length.
+    """
+    content = window - tokenizer.num_special_tokens_to_add(pair=False)
+    stride = min(stride, content - 1)
+    limit = max_windows(token_budget, content, content - stride)
+    encoded = tokenizer(
+        [text[:token_budget * MAX_CHARS_PER_TOKEN] for text in texts], return_tensors="np", padding=True,
+        truncation=True, max_length=window, stride=stride, return_overflowing_tokens=True
+    )
+    # Keep the first `limit` windows of every text; the rest is past the token budget
+    sample_mapping = encoded.pop("overflow_to_sample_mapping")
+    window_counts = np.bincount(sample_mapping, minlength=len(texts))
+    window_index = np.arange(len(sample_mapping)) - np.concatenate(([0], np.cumsum(window_counts)[:-1]))[sample_mapping]
+    keep = window_index < limit
+    truncated = [bool(count > limit) or len(text) > token_budget * MAX_CHARS_PER_TOKEN
+                 for count, text in zip(window_counts, texts)]
+
+    # Dynamic padding, as in the truncate mode: pad only to the longest kept window
+    longest = int(encoded["attention_mask"][keep].sum(1).max())
+    inputs = {name: array[keep, :longest] for name, array in encoded.items()}
+    if tensor_type == "pt":
+        import torch
+        inputs = {name: torch.from_numpy(array) for name, array in inputs.items()}
+    return WindowedInputs(inputs, sample_mapping[keep], len(texts), truncated)
+
+
+def aggregate_windows(probabilities: np.ndarray, text_rows: np.ndarray, num_texts: int, hate_index: int,
+                      method: str = AGGREGATE_MAX) -> np.ndarray:
+    """Pencere olasılıklarını metin başına birleştirir.
+
+    `max` keeps the whole distribution of the window with the highest hate probability, so
+    one hateful passage is enough to flag a long text; `mean` averages all windows.
+    """
+    result = np.zeros((num_texts, probabilities.shape[1]), dtype=probabilities.dtype)
+    for row in range(num_texts):
+        rows = np.flatnonzero(text_rows == row)
+        if method == AGGREGATE_MEAN:
+            result[row] = probabilities[rows].mean(axis=0)
+        else:
+            result[row] = probabilities[rows[np.argmax(probabilities[rows, hate_index])]]
+    return result
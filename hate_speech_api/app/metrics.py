@@ -0,0 +1,344 @@
+import bisect
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Seconds; the model forward pass dominates, so the buckets stretch to a few seconds
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+TOKEN_LENGTH_BUCKETS = (8, 16, 32, 64, 128, 256, 384, 512)
+
+_LABEL_SEPARATOR = "\x1f"
+
+
+class _Metric:
+    type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._children: Dict[Tuple[str, ...], object] = {}
+
+    def labels(self, *values: str):
+        # Callers on the hot path keep the returned child instead of looking it up per request
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def snapshot(self) -> Dict:
+        return {
+            "type": self.type,
+            "help": self.documentation,
+            "labelnames": self.labelnames,
+            "samples": {_LABEL_SEPARATOR.join(key): child.value() for key, child in list(self._children.items())}
+        }
+
+
+class _CounterChild:
+    __slots__ = ("_lock", "_value")
+
+    def __init__(self, lock: threading.Lock):
+        self._lock = lock
+        self._value = 0.0
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self._value += amount
+
+    def value(self) -> float:
+        return self._value
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def _new_child(self):
+        return _CounterChild(self._lock)
+
+    def inc(self, amount: float = 1.0):
+        self.labels().inc(amount)
+
+
+class _HistogramChild:
+    __slots__ = ("_lock", "_bounds", "_counts", "_sum")
+
+    def __init__(self, lock: threading.Lock, bounds: Tuple[float, ...]):
+        self._lock = lock
+        self._bounds = bounds
+        self._counts = [0] * (len(bounds) + 1)  # the last slot is +Inf
+        self._sum = 0.0
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(self._bounds, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+
+    def observe_many(self, values):
+        bounds = self._bounds
+        indices = [bisect.bisect_left(bounds, value) for value in values]
+        with self._lock:
+            for index in indices:
+                self._counts[index] += 1
+            self._sum += float(sum(values))
+
+    def value(self) -> List:
+        return [list(self._counts), self._sum]
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramChild(self._lock, self.buckets)
+
+    def observe(self, value: float):
+        self.labels().observe(value)
+
+    def snapshot(self) -> Dict:
+        snapshot = super().snapshot()
+        snapshot["buckets"] = self.buckets
+        return snapshot
+
+
+class CallbackMetric:
+    """Değeri kazıma (scrape) anında bir fonksiyondan okunan gauge veya sayaç."""
+
+    def __init__(self, name: str, documentation: str, function: Callable[[], Optional[float]],
+                 type: str = "gauge"):
+        self.name = name
+        self.documentation = documentation
+        self.type = type
+        self.labelnames = ()
+        self._function = function
+
+    def snapshot(self) -> Dict:
+        try:
+            value = self._function()
+        except Exception as e:
+            logger.warning("Metrik okunamadı (%s): %s", self.name, e)
+            value = None
+        return {
+            "type": self.type,
+            "help": self.documentation,
+            "labelnames": (),
+            "samples": {} if value is None else {"": float(value)}
+        }
+
+
+class Registry:
+    """Süreç içi metrikler; METRICS_DIR verildiğinde worker'ların anlık görüntüleri birleştirilir.
+
+    gunicorn worker'ları ayrı süreçlerdir ve bir kazıma isteği yalnızca birine düşer.
+    Her worker kendi anlık görüntüsünü belirli aralıklarla METRICS_DIR altına yazar,
+    /api/metrics'i yanıtlayan worker bunları kendi canlı değerleriyle toplar.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+        self._lock = threading.Lock()
+        self._directory = None
+        self._flush_interval = 5.0
+        self._flusher_pid = None
+
+    def register(self, metric):
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def callback(self, name: str, documentation: str, function: Callable[[], Optional[float]],
+                 type: str = "gauge") -> CallbackMetric:
+        return self.register(CallbackMetric(name, documentation, function, type))
+
+    def configure(self, directory: Optional[str], flush_interval: float = 5.0):
+        self._directory = directory or None
+        self._flush_interval = max(0.5, flush_interval)
+        if self._directory:
+            os.makedirs(self._directory, exist_ok=True)
+
+    def ensure_flusher(self):
+        # The flush thread does not survive fork, so each worker starts its own
+        if self._directory is None or self._flusher_pid == os.getpid():
+            return
+        with self._lock:
+            if self._flusher_pid != os.getpid():
+                self._flusher_pid = os.getpid()
+                threading.Thread(target=self._flush_loop, name="metrics-flusher", daemon=True).start()
+
+    def snapshot(self) -> Dict:
+        return {name: metric.snapshot() for name, metric in list(self._metrics.items())}
+
+    def flush(self):
+        if self._directory is None:
+            return
+        path = os.path.join(self._directory, f"{os.getpid()}.json")
+        fd, tmp_path = tempfile.mkstemp(dir=self._directory, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(self.snapshot(), f)
+        os.replace(tmp_path, path)
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(self._flush_interval)
+            try:
+                self.flush()
+            except Exception as e:
+                logger.warning("Metrikler yazılamadı: %s", e)
+
+    def _collect(self) -> Dict:
+        merged = self.snapshot()
+        if self._directory is None:
+            return merged
+        own = f"{os.getpid()}.json"
+        for filename in os.listdir(self._directory):
+            if not filename.endswith(".json") or filename == own:
+                continue
+            try:
+                with open(os.path.join(self._directory, filename)) as f:
+                    other = json.load(f)
+            except (OSError, ValueError):
+                continue
+            # Counters of exited workers are kept so totals stay monotonic; their gauges are not
+            alive = _pid_alive(int(filename[:-5]))
+            for name, family in other.items():
+                if family["type"] == "gauge" and not alive:
+                    continue
+                target = merged.setdefault(name, dict(family, samples={}))
+                _merge_samples(target, family)
+        return merged
+
+    def render(self) -> str:
+        lines = []
+        for name, family in sorted(self._collect().items()):
+            lines.append(f"# HELP {name} {family['help']}")
+            lines.append(f"# TYPE {name} {family['type']}")
+            labelnames = family["labelnames"]
+            for key, value in sorted(family["samples"].items()):
+                labels = list(zip(labelnames, key.split(_LABEL_SEPARATOR))) if labelnames else []
+                if family["type"] == "histogram":
+                    counts, total = value
+                    cumulative = 0
+                    for bound, count in zip(list(family["buckets"]) + ["+Inf"], counts):
+                        cumulative += count
+                        lines.append(f"{name}_bucket{_format_labels(labels + [('le', _format_bound(bound))])} {cumulative}")
+                    lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(total)}")
+                    lines.append(f"{name}_count{_format_labels(labels)} {cumulative}")
+                else:
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def _merge_samples(target: Dict, family: Dict):
+    samples = target["samples"]
+    for key, value in family["samples"].items():
+        current = samples.get(key)
+        if current is None:
+            samples[key] = value
+        elif family["type"] == "histogram":
+            samples[key] = [[a + b for a, b in zip(current[0], value[0])], current[1] + value[1]]
+        else:
+            samples[key] = current + value
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _format_labels(labels: List[Tuple[str, str]]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels) + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_bound(bound) -> str:
+    return bound if isinstance(bound, str) else repr(float(bound))
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value))
+
+
+REGISTRY = Registry()
+
+# Shared metric families; ModelHandler, MicroBatcher and the Flask app record into these
+REQUESTS = REGISTRY.counter(
+    "hate_speech_requests_total", "HTTP istekleri (uç nokta ve durum koduna göre)", ("endpoint", "status")
+)
+REQUEST_ERRORS = REGISTRY.counter(
+    "hate_speech_request_errors_total", "İşlenirken hata oluşan istekler", ("endpoint",)
+)
+REQUEST_SECONDS = REGISTRY.histogram(
+    "hate_speech_request_duration_seconds", "Uç nokta başına istek süresi", ("endpoint",)
+)
+STAGE_SECONDS = REGISTRY.histogram(
+    "hate_speech_stage_duration_seconds",
+    "Aşama başına süre (cache, tokenize, forward, features, analysis, queue_wait, serialize)",
+    ("stage",)
+)
+BATCH_SIZE = REGISTRY.histogram(
+    "hate_speech_batch_size", "Model forward pass başına metin sayısı", buckets=BATCH_SIZE_BUCKETS
+)
+TOKEN_LENGTH = REGISTRY.histogram(
+    "hate_speech_token_length", "Metin başına token sayısı (kırpma sonrası)", buckets=TOKEN_LENGTH_BUCKETS
+)
+CASCADE_DECISIONS = REGISTRY.counter(
+    "hate_speech_cascade_decisions_total", "Kaskadda kararı veren aşama (lexicon, fast, transformer)", ("stage",)
+)
+SHADOW_COMPARISONS = REGISTRY.counter(
+    "hate_speech_shadow_comparisons_total", "Gölge modda aday model karşılaştırmaları (agree, disagree, dropped, error)",
+    ("result",)
+)
+SHADOW_SECONDS = REGISTRY.histogram(
+    "hate_speech_shadow_duration_seconds", "Gölge modda aynı metin için model süresi (active, candidate)", ("model",)
+)
+COALESCED = REGISTRY.counter(
+    "hate_speech_coalesced_requests_total",
+    "Başka bir özdeş metnin sonucunu paylaşan metinler (in_flight: eşzamanlı istekler, batch: aynı batch)",
+    ("scope",)
+)
+LONG_TEXT_WINDOWS = REGISTRY.histogram(
+    "hate_speech_long_text_windows", "Pencere modunda metin başına puanlanan pencere sayısı", buckets=BATCH_SIZE_BUCKETS
+)
+TRUNCATED_TEXTS = REGISTRY.counter(
+    "hate_speech_truncated_texts_total", "Sonu puanlanmayan metinler (truncate: 512 token, window: token bütçesi)",
+    ("mode",)
+)
+ADMISSION = REGISTRY.counter(
+    "hate_speech_admission_total",
+    "Kabul kontrolü kararları (admitted, queued, queue_full, deadline, expired)", ("priority", "result")
+)
@@ -1,20 +1,56 @@
 import logging
 import os
+import queue
+import threading
 import numpy as np
-import torch
-import pickle
-import re
-from typing import Dict, List, Tuple
-from transformers import AutoTokenizer, AutoModelForSequenceClassification
+import time
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import settings
+import metrics
+from cascade import STAGE_TRANSFORMER, Cascade, hate_class_index
+from inference_backends import create_backend
+from label_map import load_labels
+from long_text import MODE_TRUNCATE, MODE_WINDOW, WindowedInputs, aggregate_windows, tokenize_windows
+from result_cache import ResultCache, make_key, model_fingerprint, normalize_text, text_digest
+from sensitive_words import SensitiveWordMatcher
+from single_flight import SingleFlight
+from text_features import extract_features, extract_features_batch, text_metrics
 
 logger = logging.getLogger(__name__)
 
+# Per-stage timers, resolved once so the hot path does not look up labels
+_CACHE_SECONDS = metrics.STAGE_SECONDS.labels("cache")
+_TOKENIZE_SECONDS = metrics.STAGE_SECONDS.labels("tokenize")
+_FORWARD_SECONDS = metrics.STAGE_SECONDS.labels("forward")
+_FEATURES_SECONDS = metrics.STAGE_SECONDS.labels("features")
+_ANALYSIS_SECONDS = metrics.STAGE_SECONDS.labels("analysis")
+_CASCADE_SECONDS = metrics.STAGE_SECONDS.labels("cascade")
+_COALESCED_IN_FLIGHT = metrics.COALESCED.labels("in_flight")
+_COALESCED_BATCH = metrics.COALESCED.labels("batch")
+_BATCH_SIZE = metrics.BATCH_SIZE.labels()
+_TOKEN_LENGTH = metrics.TOKEN_LENGTH.labels()
+_LONG_TEXT_WINDOWS = metrics.LONG_TEXT_WINDOWS.labels()
+
+# Response detail levels; lower levels skip the work for the fields they leave out
+DETAIL_MINIMAL = "minimal"  # prediction only, no details block
+DETAIL_STANDARD = "standard"  # plus text length, severity and found words, no text features
+DETAIL_FULL = "full"  # everything, including category lists and text metrics
+DETAIL_LEVELS = (DETAIL_MINIMAL, DETAIL_STANDARD, DETAIL_FULL)
+
 class ModelHandler:
-    def __init__(self):
-        self.model_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'model'))
+    def __init__(self, model_path: Optional[str] = None, backend: Optional[str] = None, load: bool = True):
+        self.model_path = model_path or settings.MODEL_PATH
+        self.backend_name = backend or settings.INFERENCE_BACKEND
         self.tokenizer = None
-        self.model = None
-        self.label_encoder = None
+        self.backend = None
+        self.labels = None
+        self.loaded = False
+        self.cascade = None
+        self.hate_index = None
+        self.startup_timings = {}
+        self._warmed_pid = None
         self.categories = {
             "hate": [
                 "racist", "xenophobic", "antisemitic", "islamophobic",
@@ -37,15 +73,61 @@ class ModelHandler:
                 "fake_news", "disinformation", "misinformation"
             ]
         }
-        self.emoji_pattern = re.compile("["
-            u"\U0001F600-\U0001F64F"  # emojis
-            u"\U0001F300-\U0001F5FF"  # symbols & pictographs
-            u"\U0001F680-\U0001F6FF"  # transport & map symbols
-            u"\U0001F1E0-\U0001F1FF"  # flags (iOS)
-            u"\U00002702-\U000027B0"
-            u"\U000024C2-\U0001F251"
-            "]+", flags=re.UNICODE)
-        self._load_model()
+        self.sensitive_words = SensitiveWordMatcher.from_sources(
+            self.categories,
+            settings.BANNED_WORDS_PATH,
+            lexicon_word_boundary=settings.BANNED_WORDS_WORD_BOUNDARY
+        )
+        
+        # Result cache keyed on normalized text + model version
+        self.model_version = None
+        self._cache_namespace = None
+        self._disk_version = self.model_version
+        self._version_checked_at = time.monotonic()
+        self.result_cache = None
+        if settings.RESULT_CACHE_ENABLED:
+            self.result_cache = ResultCache(
+                settings.RESULT_CACHE_MAX_ENTRIES,
+                settings.RESULT_CACHE_MAX_BYTES,
+                settings.RESULT_CACHE_TTL_SECONDS
+            )
+        # Identical texts that arrive while one of them is being analyzed share that analysis
+        self.single_flight = SingleFlight(_COALESCED_IN_FLIGHT.inc) if settings.SINGLE_FLIGHT_ENABLED else None
+        if load:
+            self._load_model()
+        
+    @property
+    def ready(self) -> bool:
+        # Loaded and, if enabled, warmed up in this process (workers warm up after fork)
+        if not self.loaded:
+            return False
+        return not settings.WARMUP_ENABLED or self._warmed_pid == os.getpid()
+    
+    def start(self):
+        # Load + warmup, used for background loading
+        try:
+            if not self.loaded:
+                self._load_model()
+            self.warmup()
+        except Exception as e:
+            logger.error("Model arka planda yüklenemedi: %s", e)
+    
+    def warmup(self):
+        # Run the first forward passes now so that requests do not pay for
+        # lazy allocations and kernel selection at each sequence length
+        if not settings.WARMUP_ENABLED or self._warmed_pid == os.getpid():
+            return
+        start = time.perf_counter()
+        for length in settings.WARMUP_SEQUENCE_LENGTHS:
+            text = " ".join(["merhaba"] * length)
+            for batch_size in settings.WARMUP_BATCH_SIZES:
+                # Same path as requests, so window mode warms up its window shapes
+                self._predict(self._tokenize([text] * batch_size))
+        extract_features_batch(["Merhaba dünya! 😀"])
+        self.sensitive_words.find_words("Merhaba dünya! 😀")
+        self.startup_timings["warmup_s"] = round(time.perf_counter() - start, 3)
+        self._warmed_pid = os.getpid()
+        logger.info("Model ısındırıldı (%s sn)", self.startup_timings['warmup_s'])
         
     def _load_model(self):
         try:
@@ -55,80 +137,437 @@ class ModelHandler:
                 
             # Model ve tokenizer'ı yükle
             logger.info("Model ve tokenizer yükleniyor...")
+            start = time.perf_counter()
+            from transformers import AutoTokenizer
+            self.startup_timings["import_s"] = round(time.perf_counter() - start, 3)
+            
+            start = time.perf_counter()
             self.tokenizer = AutoTokenizer.from_pretrained(self.model_path, local_files_only=True)
-            self.model = AutoModelForSequenceClassification.from_pretrained(self.model_path, local_files_only=True)
+            self.startup_timings["tokenizer_s"] = round(time.perf_counter() - start, 3)
+            
+            start = time.perf_counter()
+            self.backend = create_backend(
+                self.backend_name,
+                self.model_path,
+                settings.INFERENCE_THREADS,
+                settings.ONNX_MODEL_FILE,
+                settings.MODEL_LOW_CPU_MEM
+            )
+            self.startup_timings["weights_s"] = round(time.perf_counter() - start, 3)
             logger.info("Model ve tokenizer başarıyla yüklendi")
             
-            # Label encoder'ı yükle
-            label_encoder_path = os.path.join(self.model_path, 'label_encoder.pkl')
-            if os.path.exists(label_encoder_path):
-                logger.info("Label encoder yükleniyor...")
-                with open(label_encoder_path, 'rb') as f:
-                    self.label_encoder = pickle.load(f)
-                logger.info("Label encoder başarıyla yüklendi")
-            else:
-                logger.warning("Label encoder bulunamadı, varsayılan kategoriler kullanılacak")
-                self.label_encoder = None
+            # Etiket haritasını yükle
+            start = time.perf_counter()
+            self.labels = load_labels(self.model_path)
+            self.startup_timings["labels_s"] = round(time.perf_counter() - start, 3)
+            if self.labels is None:
+                logger.warning("Etiket haritası bulunamadı, varsayılan kategoriler kullanılacak")
+            
+            # Kaskad: ilk aşama (sözlük + hızlı sınıflandırıcı) etiket sırasına bağlı
+            if settings.CASCADE_ENABLED:
+                self.cascade = Cascade.load(
+                    self.model_path, self.sensitive_words, self.get_categories(),
+                    settings.CASCADE_LOW, settings.CASCADE_HIGH, settings.CASCADE_LEXICON,
+                    settings.CASCADE_CLASSIFIER_PATH or None
+                )
+            
+            self.hate_index = hate_class_index(self.get_categories())
+            self.model_version = model_fingerprint(self.model_path)
+            self._disk_version = self.model_version
+            # Cascade and long-text settings change the answers, so they are part of the cache key
+            self._cache_namespace = self.model_version + (f"|{self.cascade.version}" if self.cascade else "")
+            if settings.LONG_TEXT_MODE == MODE_WINDOW:
+                self._cache_namespace += (
+                    f"|window:{settings.LONG_TEXT_WINDOW_TOKENS}/{settings.LONG_TEXT_STRIDE_TOKENS}"
+                    f"/{settings.LONG_TEXT_TOKEN_BUDGET}/{settings.LONG_TEXT_AGGREGATE}"
+                )
+            elif settings.LONG_TEXT_MODE != MODE_TRUNCATE:
+                raise ValueError(f"Geçersiz LONG_TEXT_MODE: {settings.LONG_TEXT_MODE} (truncate veya window)")
+            self.loaded = True
                 
         except Exception as e:
             logger.error(f"Model yüklenirken hata oluştu: {str(e)}")
             raise
             
     def get_categories(self):
-        if self.label_encoder:
-            return list(self.label_encoder.classes_)
+        if self.labels:
+            return list(self.labels)
         return ["nefret_söylemi_değil", "nefret_söylemi"]
             
-    def analyze_text(self, text: str) -> Dict:
+    def analyze_text(self, text: str, detail: str = DETAIL_FULL) -> Dict:
+        return self.coalesced(text, lambda text: self._analyze_text(text, detail), detail)
+    
+    def coalesced(self, text: str, compute, detail: str = DETAIL_FULL, timeout: Optional[float] = None,
+                  retry=None) -> Dict:
+        # Concurrent calls for the same normalized text and detail level wait for the first one's result;
+        # timeout and retry are this caller's, see SingleFlight.do
+        if self.single_flight is None or not isinstance(text, str):
+            return compute(text)
+        leader_text, result = self.single_flight.do(
+            (normalize_text(text), detail), lambda: (text, compute(text)), timeout, retry
+        )
+        if leader_text == text:
+            return result
+        return self._reuse_result(text, result, detail)
+    
+    def _analyze_text(self, text: str, detail: str = DETAIL_FULL) -> Dict:
         try:
-            logger.debug(f"Metin analiz ediliyor: {text}")
+            logger.debug("Metin analiz ediliyor: %s", text)
+            
+            start = time.perf_counter()
+            cached = self._cache_get(text, detail)
+            if cached is not None:
+                _CACHE_SECONDS.observe(time.perf_counter() - start)
+                logger.debug("Sonuç önbellekten alındı")
+                return cached
+            
+            cascade_start = time.perf_counter()
+            decided = self._cascade_decide(text, detail)
+            if decided is not None:
+                _CACHE_SECONDS.observe(cascade_start - start)
+                _CASCADE_SECONDS.observe(time.perf_counter() - cascade_start)
+                return decided
             
             # Tokenize input
-            inputs = self.tokenizer(text, return_tensors="pt", truncation=True, max_length=512)
+            tokenize_start = time.perf_counter()
+            inputs = self._tokenize([text])
             logger.debug("Metin tokenize edildi")
             
             # Get model predictions
-            with torch.no_grad():
-                outputs = self.model(**inputs)
-                logits = outputs.logits
-                probabilities = torch.softmax(logits, dim=1)
-                logger.debug("Model tahmini yapıldı")
-                
-            # Get predicted class and confidence
-            predicted_class = torch.argmax(probabilities, dim=1).item()
-            confidence = float(probabilities[0][predicted_class].item())
-            logger.debug(f"Tahmin edilen sınıf: {predicted_class}, Güven: {confidence}")
-            
-            # Get category
-            if self.label_encoder:
-                category = str(self.label_encoder.inverse_transform([predicted_class])[0])
-            else:
-                category = "nefret_söylemi" if predicted_class == 1 else "nefret_söylemi_değil"
-            logger.debug(f"Kategori: {category}")
+            forward_start = time.perf_counter()
+            probabilities = self._predict(inputs)
+            logger.debug("Model tahmini yapıldı")
             
-            # Detailed analysis
-            details = self._get_detailed_analysis(text, category, confidence)
-            logger.debug(f"Detaylı analiz: {details}")
+            analysis_start = time.perf_counter()
+            result = self._build_result(text, probabilities[0], detail=detail)
+            self._cache_put(text, result, detail)
+            end = time.perf_counter()
             
-            return {
-                "is_hate_speech": bool(category == "nefret_söylemi"),
-                "confidence": confidence,
-                "category": category,
-                "details": details
-            }
+            _CACHE_SECONDS.observe(cascade_start - start)
+            _CASCADE_SECONDS.observe(tokenize_start - cascade_start)
+            _TOKENIZE_SECONDS.observe(forward_start - tokenize_start)
+            _FORWARD_SECONDS.observe(analysis_start - forward_start)
+            _ANALYSIS_SECONDS.observe(end - analysis_start)
+            _BATCH_SIZE.observe(1)
+            self._observe_token_lengths(inputs)
+            return result
             
         except Exception as e:
-            logger.error(f"Tahmin yapılırken hata oluştu: {str(e)}")
+            logger.error("Tahmin yapılırken hata oluştu: %s", e)
             raise
             
-    def _get_detailed_analysis(self, text: str, category: str, confidence: float) -> Dict:
+    def analyze_batch(self, texts: List[str], detail: Union[str, List[str]] = DETAIL_FULL) -> List[Dict]:
+        # `detail` is one level for the whole batch or one per text (the micro-batcher mixes requests)
+        levels = [detail] * len(texts) if isinstance(detail, str) else detail
+        results, pending = self._lookup(texts, levels)
+        
+        # Duplicates inside the batch are inferred once and copied afterwards
+        first_index = {}
+        duplicates = []
+        unique = []
+        for index in pending:
+            key = (normalize_text(texts[index]), levels[index])
+            if key in first_index:
+                duplicates.append((index, first_index[key]))
+            else:
+                first_index[key] = index
+                unique.append(index)
+        if duplicates:
+            _COALESCED_BATCH.inc(len(duplicates))
+        pending = unique
+        
+        # Sort by length so that each forward pass pads to a similar length
+        pending.sort(key=lambda index: len(texts[index]))
+        
+        for start in range(0, len(pending), settings.MODEL_BATCH_SIZE):
+            chunk = pending[start:start + settings.MODEL_BATCH_SIZE]
+            chunk_texts = [texts[index] for index in chunk]
+            chunk_levels = [levels[index] for index in chunk]
+            try:
+                inputs, features = self._prepare(chunk_texts, chunk_levels)
+                chunk_results = self._infer(chunk_texts, inputs, features, chunk_levels)
+            except Exception as e:
+                logger.error("Toplu tahmin yapılırken hata oluştu: %s", e)
+                chunk_results = [{"error": str(e)} for _ in chunk]
+            for index, result in zip(chunk, chunk_results):
+                results[index] = result
+        
+        for index, source in duplicates:
+            result = results[source]
+            if "error" in result or texts[index] == texts[source]:
+                results[index] = result
+            else:
+                results[index] = self._reuse_result(texts[index], result, levels[index])
+        
+        logger.debug("Toplu analiz tamamlandı: %d metin", len(texts))
+        return results
+    
+    def analyze_stream(self, items: Iterable[Tuple[Any, Any]], batch_size: Optional[int] = None,
+                       prefetch: Optional[int] = None, detail: str = DETAIL_FULL) -> Iterator[Tuple[Any, Dict]]:
+        """(anahtar, metin) çiftlerini sırayla analiz eder; sonuçlar batch'ler bittikçe üretilir.
+        
+        Bir arka plan iş parçacığı sonraki batch'leri okuyup tokenize ederken bu iş
+        parçacığı mevcut batch'in forward pass'ini çalıştırır. En fazla `prefetch`
+        hazır batch bekletilir, böylece bellek girdi boyutundan bağımsızdır.
+        """
+        batch_size = batch_size or settings.MODEL_BATCH_SIZE
+        prepared: "queue.Queue" = queue.Queue(maxsize=max(1, prefetch or settings.STREAM_PREFETCH_BATCHES))
+        stop = threading.Event()
+        
+        def put(item) -> bool:
+            while not stop.is_set():
+                try:
+                    prepared.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+        
+        def produce():
+            try:
+                for chunk in _chunked(items, batch_size):
+                    if stop.is_set():
+                        return
+                    texts = [text for _, text in chunk]
+                    results, pending = self._lookup(texts, [detail] * len(texts))
+                    pending.sort(key=lambda index: len(texts[index]))
+                    pending_texts = [texts[index] for index in pending]
+                    try:
+                        ready = self._prepare(pending_texts, [detail] * len(pending)) if pending else None
+                    except Exception as e:
+                        ready = e
+                    if not put((chunk, results, pending, pending_texts, ready)):
+                        return
+            except Exception as e:
+                # Reading the input itself failed; surface it in the consuming thread
+                put(e)
+                return
+            put(None)
+        
+        producer = threading.Thread(target=produce, name="stream-tokenizer", daemon=True)
+        producer.start()
         try:
-            # Calculate emoji count
-            emoji_count = int(len(self.emoji_pattern.findall(text)))
+            while True:
+                item = prepared.get()
+                if item is None:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                chunk, results, pending, pending_texts, ready = item
+                if pending:
+                    try:
+                        if isinstance(ready, Exception):
+                            raise ready
+                        chunk_results = self._infer(pending_texts, *ready, [detail] * len(pending))
+                    except Exception as e:
+                        logger.error("Akış batch'i işlenirken hata oluştu: %s", e)
+                        chunk_results = [{"error": str(e)} for _ in pending]
+                    for index, result in zip(pending, chunk_results):
+                        results[index] = result
+                for (key, _), result in zip(chunk, results):
+                    yield key, result
+        finally:
+            # Runs on normal completion, on errors and when the client disconnects
+            stop.set()
+            while True:
+                try:
+                    prepared.get_nowait()
+                except queue.Empty:
+                    break
+            producer.join(timeout=5)
+    
+    def _lookup(self, texts: List[Any], levels: List[str]) -> Tuple[List[Optional[Dict]], List[int]]:
+        # Invalid, cached and cascade-decided texts are resolved here; the rest are returned as pending indices
+        results: List[Optional[Dict]] = [None] * len(texts)
+        pending = []
+        start = time.perf_counter()
+        for index, text in enumerate(texts):
+            if not isinstance(text, str):
+                results[index] = {"error": "Metin string olmalı"}
+                continue
+            cached = self._cache_get(text, levels[index])
+            if cached is not None:
+                results[index] = cached
+            else:
+                pending.append(index)
+        cascade_start = time.perf_counter()
+        _CACHE_SECONDS.observe(cascade_start - start)
+        if self.cascade is not None and pending:
+            escalated = []
+            for index in pending:
+                try:
+                    results[index] = self._cascade_decide(texts[index], levels[index])
+                except Exception as e:
+                    results[index] = {"error": str(e)}
+                if results[index] is None:
+                    escalated.append(index)
+            pending = escalated
+            _CASCADE_SECONDS.observe(time.perf_counter() - cascade_start)
+        return results, pending
+    
+    def _cascade_decide(self, text: str, detail: str = DETAIL_FULL) -> Optional[Dict]:
+        # First stage result, or None when the text goes to the transformer
+        if self.cascade is None:
+            return None
+        probabilities, stage = self.cascade.decide(text)
+        if probabilities is None:
+            return None
+        result = self._build_result(text, probabilities, decided_by=stage, detail=detail)
+        self._cache_put(text, result, detail)
+        return result
+    
+    def _prepare(self, texts: List[str], levels: List[str]):
+        # Everything before the forward pass: tokenization and, for full details only, text features
+        tokenize_start = time.perf_counter()
+        inputs = self._tokenize(texts)
+        features_start = time.perf_counter()
+        full = [row for row, level in enumerate(levels) if level == DETAIL_FULL]
+        features: List[Optional[Dict]] = [None] * len(texts)
+        for row, row_features in zip(full, extract_features_batch([texts[row] for row in full]) if full else []):
+            features[row] = row_features
+        _TOKENIZE_SECONDS.observe(features_start - tokenize_start)
+        _FEATURES_SECONDS.observe(time.perf_counter() - features_start)
+        _BATCH_SIZE.observe(len(texts))
+        self._observe_token_lengths(inputs)
+        return inputs, features
+    
+    def _infer(self, texts: List[str], inputs, features: List[Optional[Dict]], levels: List[str]) -> List[Dict]:
+        forward_start = time.perf_counter()
+        probabilities = self._predict(inputs)
+        analysis_start = time.perf_counter()
+        results = []
+        for row, text in enumerate(texts):
+            try:
+                result = self._build_result(text, probabilities[row], features[row], detail=levels[row])
+                self._cache_put(text, result, levels[row])
+            except Exception as e:
+                result = {"error": str(e)}
+            results.append(result)
+        _FORWARD_SECONDS.observe(analysis_start - forward_start)
+        _ANALYSIS_SECONDS.observe(time.perf_counter() - analysis_start)
+        return results
             
-            # Text length
-            text_length = int(len(text))
+    def cache_stats(self) -> Optional[Dict]:
+        if self.result_cache is None:
+            return None
+        stats = self.result_cache.stats()
+        stats["model_version"] = self.model_version
+        return stats
+    
+    def _check_model_version(self):
+        # Invalidate cached results when the files in the model directory change
+        now = time.monotonic()
+        if now - self._version_checked_at < settings.MODEL_VERSION_CHECK_SECONDS:
+            return
+        self._version_checked_at = now
+        disk_version = model_fingerprint(self.model_path)
+        if disk_version != self._disk_version:
+            logger.warning("Model klasörü değişti (%s -> %s), önbellek temizleniyor", self._disk_version, disk_version)
+            self._disk_version = disk_version
+            self.result_cache.clear()
+    
+    def _cache_get(self, text: str, detail: str = DETAIL_FULL) -> Optional[Dict]:
+        if self.result_cache is None:
+            return None
+        self._check_model_version()
+        entry = self.result_cache.get(make_key(text, f"{self._cache_namespace}|{detail}"))
+        if entry is None:
+            return None
+        digest, result = entry
+        if digest == text_digest(text):
+            return result
+        return self._reuse_result(text, result, detail)
+    
+    def _reuse_result(self, text: str, result: Dict, detail: str = DETAIL_FULL) -> Dict:
+        # Same normalized text but different raw text: reuse the prediction, redo the details
+        reused = {
+            "is_hate_speech": result["is_hate_speech"],
+            "confidence": result["confidence"],
+            "category": result["category"],
+            "decided_by": result["decided_by"]
+        }
+        if detail != DETAIL_MINIMAL:
+            reused["details"] = self._get_detailed_analysis(text, result["category"], result["confidence"],
+                                                            detail=detail)
+        return reused
+    
+    def _cache_put(self, text: str, result: Dict, detail: str = DETAIL_FULL):
+        if self.result_cache is None:
+            return
+        self.result_cache.put(make_key(text, f"{self._cache_namespace}|{detail}"), (text_digest(text), result))
+    
+    def predict_proba(self, texts: List[str]) -> np.ndarray:
+        # Class probabilities only, without details or cache (offline evaluation)
+        chunks = []
+        for start in range(0, len(texts), settings.MODEL_BATCH_SIZE):
+            chunk = texts[start:start + settings.MODEL_BATCH_SIZE]
+            chunks.append(self._predict(self._tokenize(chunk)))
+        return np.concatenate(chunks) if chunks else np.zeros((0, len(self.get_categories())), dtype=np.float32)
+    
+    def label_for(self, class_index: int) -> str:
+        if self.labels:
+            return self.labels[class_index]
+        return "nefret_söylemi" if class_index == 1 else "nefret_söylemi_değil"
+    
+    def _tokenize(self, texts: List[str]):
+        if settings.LONG_TEXT_MODE == MODE_WINDOW:
+            # Long texts become several training-length windows, all scored in the same forward pass
+            return tokenize_windows(
+                self.tokenizer, texts, settings.LONG_TEXT_WINDOW_TOKENS, settings.LONG_TEXT_STRIDE_TOKENS,
+                settings.LONG_TEXT_TOKEN_BUDGET, self.backend.tensor_type
+            )
+        # Dynamic padding: pad only to the longest text in this batch
+        return self.tokenizer(
+            texts, return_tensors=self.backend.tensor_type, padding=True, truncation=True, max_length=512
+        )
+    
+    def _predict(self, inputs) -> np.ndarray:
+        if isinstance(inputs, WindowedInputs):
+            probabilities = self.backend.predict(inputs.inputs)
+            return aggregate_windows(
+                probabilities, inputs.text_rows, inputs.num_texts, self.hate_index, settings.LONG_TEXT_AGGREGATE
+            )
+        return self.backend.predict(inputs)
+    
+    def _observe_token_lengths(self, inputs):
+        # Works for both torch tensors and numpy arrays; in window mode these are window lengths
+        lengths = inputs["attention_mask"].sum(1).tolist()
+        _TOKEN_LENGTH.observe_many(lengths)
+        if isinstance(inputs, WindowedInputs):
+            _LONG_TEXT_WINDOWS.observe_many(np.bincount(inputs.text_rows, minlength=inputs.num_texts).tolist())
+            truncated = sum(inputs.truncated)
+        else:
+            truncated = sum(1 for length in lengths if length >= 512)
+        if truncated:
+            metrics.TRUNCATED_TEXTS.labels(settings.LONG_TEXT_MODE).inc(truncated)
+    
+    def _build_result(self, text: str, probabilities: np.ndarray, features: Optional[Dict] = None,
+                      decided_by: str = STAGE_TRANSFORMER, detail: str = DETAIL_FULL) -> Dict:
+        # Get predicted class and confidence
+        predicted_class = int(np.argmax(probabilities))
+        confidence = float(probabilities[predicted_class])
+        logger.debug("Tahmin edilen sınıf: %s, Güven: %s", predicted_class, confidence)
+        
+        # Get category
+        category = self.label_for(predicted_class)
+        logger.debug("Kategori: %s", category)
+        
+        result = {
+            "is_hate_speech": bool(category == "nefret_söylemi"),
+            "confidence": confidence,
+            "category": category,
+            "decided_by": decided_by
+        }
+        
+        # Detailed analysis, only as much as the requested level returns
+        if detail != DETAIL_MINIMAL:
+            result["details"] = self._get_detailed_analysis(text, category, confidence, features, detail)
+            logger.debug("Detaylı analiz: %s", result["details"])
+        return result
             
+    def _get_detailed_analysis(self, text: str, category: str, confidence: float,
+                               features: Optional[Dict] = None, detail: str = DETAIL_FULL) -> Dict:
+        try:
             # Category details
             category_details = self._get_category_details(category)
             
@@ -136,21 +575,31 @@ class ModelHandler:
             severity_score = int(self._calculate_severity_score(confidence, category_details))
             
             # Found sensitive words
-            found_words = self._find_sensitive_words(text)
+            found = self._find_sensitive_words(text)
+            found_words = [word for word, _ in found]
             
-            # Additional metrics
-            metrics = self._calculate_additional_metrics(text)
+            if detail == DETAIL_STANDARD:
+                return {
+                    "text_length": len(text),
+                    "severity_score": severity_score,
+                    "found_words": found_words
+                }
+            
+            # Emoji count, length, word and character metrics in one extraction
+            if features is None:
+                features = extract_features(text)
             
             return {
-                "emoji_count": emoji_count,
-                "text_length": text_length,
+                "emoji_count": int(features["emoji_count"]),
+                "text_length": int(features["text_length"]),
                 "category_details": category_details,
                 "severity_score": severity_score,
                 "found_words": found_words,
-                "metrics": metrics
+                "found_word_categories": dict(found),
+                "metrics": text_metrics(features)
             }
         except Exception as e:
-            logger.error(f"Detaylı analiz yapılırken hata oluştu: {str(e)}")
+            logger.error("Detaylı analiz yapılırken hata oluştu: %s", e)
             raise
     
     def _get_category_details(self, category: str) -> List[str]:
@@ -161,38 +610,15 @@ class ModelHandler:
         category_multiplier = len(category_details) * 0.2
         return min(100, int(base_score * (1 + category_multiplier)))
     
-    def _find_sensitive_words(self, text: str) -> List[str]:
-        sensitive_words = []
-        text_lower = text.lower()
-        
-        for category, words in self.categories.items():
-            for word in words:
-                if word in text_lower:
-                    sensitive_words.append(word)
-        
-        return sensitive_words
-    
-    def _calculate_additional_metrics(self, text: str) -> Dict:
-        try:
-            # Calculate word count
-            word_count = int(len(text.split()))
-            
-            # Calculate average word length
-            words = text.split()
-            avg_word_length = float(sum(len(word) for word in words) / len(words) if words else 0)
-            
-            # Calculate punctuation count
-            punctuation_count = int(sum(1 for char in text if char in '.,!?;:'))
-            
-            # Calculate capitalization ratio
-            capital_ratio = float(sum(1 for char in text if char.isupper()) / len(text) if text else 0)
-            
-            return {
-                "word_count": word_count,
-                "average_word_length": round(avg_word_length, 2),
-                "punctuation_count": punctuation_count,
-                "capitalization_ratio": round(capital_ratio, 2)
-            }
-        except Exception as e:
-            logger.error(f"Metrikler hesaplanırken hata oluştu: {str(e)}")
-            raise
\ No newline at end of file
+    def _find_sensitive_words(self, text: str) -> List[Tuple[str, str]]:
+        # Single pass over the text for all category terms and banned words
+        return self.sensitive_words.find_words(text)
+
+
+def _chunked(items: Iterable, size: int) -> Iterator[List]:
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
@@ -0,0 +1,449 @@
+import json
+import logging
+import os
+import queue
+import random
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+import metrics
+import settings
+from batching import MicroBatcher
+from model_handler import DETAIL_FULL, ModelHandler
+from result_cache import model_fingerprint
+
+logger = logging.getLogger(__name__)
+
+# Sürümlü model kökü: <kök>/<sürüm>/config.json ...; etkin sürüm CURRENT dosyasında,
+# gölge (shadow) aday SHADOW.json dosyasında. Tüm worker'lar bu dosyaları izler.
+CURRENT_FILE = "CURRENT"
+SHADOW_FILE = "SHADOW.json"
+
+_SHADOW_COMPARISONS = {
+    result: metrics.SHADOW_COMPARISONS.labels(result) for result in ("agree", "disagree", "dropped", "error")
+}
+_SHADOW_ACTIVE_SECONDS = metrics.SHADOW_SECONDS.labels("active")
+_SHADOW_CANDIDATE_SECONDS = metrics.SHADOW_SECONDS.labels("candidate")
+
+
+class ModelUnavailable(Exception):
+    """Model katmanı kapatıldı (worker duruyor); istek başka bir worker'da tekrar denenebilir (503)."""
+
+
+def is_model_dir(path: str) -> bool:
+    return os.path.isfile(os.path.join(path, "config.json"))
+
+
+def _natural_key(name: str):
+    return [int(part) if part.isdigit() else part for part in re.split(r"(\d+)", name)]
+
+
+def list_versions(root: str) -> List[str]:
+    if is_model_dir(root) or not os.path.isdir(root):
+        return []
+    return sorted((name for name in os.listdir(root) if is_model_dir(os.path.join(root, name))), key=_natural_key)
+
+
+def resolve_version(root: str, version: Optional[str] = None) -> Tuple[Optional[str], str]:
+    """(sürüm, klasör) döndürür. Düz bir model klasörü sürümsüzdür (sürüm None)."""
+    if is_model_dir(root):
+        if version:
+            raise ValueError(f"Model klasörü sürümlü değil: {root}")
+        return None, root
+    if not version:
+        current_path = os.path.join(root, CURRENT_FILE)
+        if os.path.exists(current_path):
+            with open(current_path, encoding="utf-8") as f:
+                version = f.read().strip()
+        else:
+            versions = list_versions(root)
+            if not versions:
+                raise FileNotFoundError(f"Model klasörü bulunamadı: {root}")
+            version = versions[-1]
+    # Version names come from requests: no path components
+    if os.path.basename(version) != version or version in (".", ".."):
+        raise ValueError(f"Geçersiz sürüm adı: {version}")
+    path = os.path.join(root, version)
+    if not is_model_dir(path):
+        raise FileNotFoundError(f"Model sürümü bulunamadı: {path}")
+    return version, path
+
+
+def _write_atomic(path: str, content: str):
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
+class ModelState:
+    """Bir model sürümü ve ona bağlı mikro-batch zamanlayıcı; kullanan istekler sayılır.
+
+    Swapping replaces the whole state object. The old state is retired: new requests
+    can no longer acquire it, and its batcher is closed once the requests that did
+    acquire it have finished.
+    """
+
+    def __init__(self, handler: ModelHandler, version: Optional[str], path: str, micro_batch: bool = True):
+        self.handler = handler
+        self.version = version
+        self.path = path
+        self.batcher = None
+        if micro_batch and settings.MICRO_BATCH_ENABLED:
+            self.batcher = MicroBatcher(handler, settings.MICRO_BATCH_MAX_SIZE, settings.MICRO_BATCH_MAX_WAIT_MS)
+        self.loaded_at = datetime.now().isoformat()
+        self._in_flight = 0
+        self._retired = False
+        self._condition = threading.Condition()
+
+    def try_acquire(self) -> bool:
+        with self._condition:
+            if self._retired:
+                return False
+            self._in_flight += 1
+            return True
+
+    def release(self):
+        with self._condition:
+            self._in_flight -= 1
+            drained = self._in_flight == 0
+            if drained:
+                self._condition.notify_all()
+        if drained and self._retired:
+            # retire() gave up waiting: the last request out stops the batcher instead
+            self._close_batcher()
+
+    def retire(self, timeout: float) -> bool:
+        # Wait for in-flight requests, then let the batcher drain its queue and stop.
+        # Requests still running after the timeout keep using the batcher; release() closes it.
+        with self._condition:
+            self._retired = True
+            drained = self._condition.wait_for(lambda: self._in_flight == 0, timeout)
+        if drained:
+            self._close_batcher()
+        return drained
+
+    def _close_batcher(self):
+        if self.batcher is not None:
+            self.batcher.close()
+
+    def analyze_text(self, text: str, detail: str = DETAIL_FULL, deadline: Optional[float] = None) -> Dict:
+        # `deadline` (time.monotonic()) bounds the wait for a micro-batch result
+        if self.batcher is not None:
+            return self.batcher.analyze_text(text, detail, deadline)
+        return self.handler.analyze_text(text, detail)
+
+
+class ShadowScorer:
+    """Trafiğin örneklenmiş bir kısmını aday modelle de puanlar; yanıtı etkilemez.
+
+    Sampled texts go to a bounded queue and are scored by one background thread with
+    both the active and the candidate model (probabilities only, no cache), so the
+    latency and agreement numbers compare the two models on the same inputs.
+    """
+
+    def __init__(self, handler: ModelHandler, version: Optional[str], sample_rate: float, queue_size: int = 1000):
+        self.handler = handler
+        self.version = version
+        self.sample_rate = max(0.0, min(1.0, sample_rate))
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max(1, queue_size))
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self.compared = 0
+        self.agreed = 0
+        self.dropped = 0
+        self.errors = 0
+        self._active_ms = deque(maxlen=1000)
+        self._candidate_ms = deque(maxlen=1000)
+
+    def offer(self, texts: List, active: ModelHandler):
+        for text in texts:
+            if not isinstance(text, str) or random.random() >= self.sample_rate:
+                continue
+            self._ensure_started()
+            try:
+                self._queue.put_nowait((text, active))
+            except queue.Full:
+                # Shadow scoring must never slow down real traffic
+                self.dropped += 1
+                _SHADOW_COMPARISONS["dropped"].inc()
+
+    def _ensure_started(self):
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is None or self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run, name="shadow-scorer", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            text, active = item
+            try:
+                start = time.perf_counter()
+                active_class = int(np.argmax(active.predict_proba([text])[0]))
+                middle = time.perf_counter()
+                candidate_class = int(np.argmax(self.handler.predict_proba([text])[0]))
+                end = time.perf_counter()
+            except Exception as e:
+                self.errors += 1
+                _SHADOW_COMPARISONS["error"].inc()
+                logger.warning("Gölge puanlama başarısız: %s", e)
+                continue
+            agree = active.label_for(active_class) == self.handler.label_for(candidate_class)
+            with self._lock:
+                self.compared += 1
+                self.agreed += int(agree)
+                self._active_ms.append((middle - start) * 1000)
+                self._candidate_ms.append((end - middle) * 1000)
+            _SHADOW_COMPARISONS["agree" if agree else "disagree"].inc()
+            _SHADOW_ACTIVE_SECONDS.observe(middle - start)
+            _SHADOW_CANDIDATE_SECONDS.observe(end - middle)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            active_ms = sorted(self._active_ms)
+            candidate_ms = sorted(self._candidate_ms)
+            compared, agreed = self.compared, self.agreed
+
+        def quantile(values, q):
+            return round(values[min(len(values) - 1, int(q * len(values)))], 3) if values else None
+
+        return {
+            "version": self.version,
+            "model_version": self.handler.model_version,
+            "sample_rate": self.sample_rate,
+            "compared": compared,
+            "agreement": round(agreed / compared, 4) if compared else None,
+            "dropped": self.dropped,
+            "errors": self.errors,
+            "queue_depth": self._queue.qsize(),
+            "active_latency_ms": {"p50": quantile(active_ms, 0.5), "p95": quantile(active_ms, 0.95)},
+            "candidate_latency_ms": {"p50": quantile(candidate_ms, 0.5), "p95": quantile(candidate_ms, 0.95)}
+        }
+
+    def close(self):
+        if self._thread is not None and self._pid == os.getpid():
+            self._queue.put(None)
+            self._thread.join(timeout=5)
+
+
+class ModelSlot:
+    """Bir model katmanının (standard/fast) etkin sürümü; kesintisiz yeniden yükleme ve gölge mod.
+
+    Requests take the current state through `use()`. A reload builds and warms up a
+    new ModelHandler in the background, then replaces the state with one assignment;
+    requests already running keep the state they acquired until they finish.
+    """
+
+    def __init__(self, name: str, root: str, load: bool = True):
+        self.name = name
+        self.root = root
+        version, path = resolve_version(root) if os.path.isdir(root) else (None, root)
+        self.state = ModelState(ModelHandler(model_path=path, load=load), version, path)
+        self.shadow: Optional[ShadowScorer] = None
+        self._shadow_config = None
+        self.last_reload: Optional[Dict] = None
+        self._reload_lock = threading.Lock()
+        self._watch_lock = threading.Lock()
+        self._watcher = None
+        self._watcher_pid = None
+        self._pending_fingerprint = None
+        self._closed = False
+
+    @property
+    def handler(self) -> ModelHandler:
+        return self.state.handler
+
+    @property
+    def versioned(self) -> bool:
+        return os.path.isdir(self.root) and not is_model_dir(self.root)
+
+    @contextmanager
+    def use(self) -> Iterator[ModelState]:
+        state = self.acquire()
+        try:
+            yield state
+        finally:
+            state.release()
+
+    def acquire(self) -> ModelState:
+        # A state retired between reading it and acquiring it is skipped; the new one is already in place.
+        # After close() there is no new one, so requests fail instead of retrying forever.
+        while True:
+            if self._closed:
+                raise ModelUnavailable(f"Model katmanı kapatıldı: {self.name}")
+            state = self.state
+            if state.try_acquire():
+                return state
+
+    # -- yeniden yükleme ----------------------------------------------------------------
+
+    def request_reload(self, version: Optional[str] = None, wait: bool = False) -> Dict:
+        """Sürümü CURRENT dosyasına yazar (tüm worker'lar izler) ve bu süreçte yüklemeyi başlatır."""
+        if version:
+            version, _ = resolve_version(self.root, version)
+            _write_atomic(os.path.join(self.root, CURRENT_FILE), version + "\n")
+        if wait:
+            return self.reload()
+        threading.Thread(target=self.reload, name=f"model-reload-{self.name}", daemon=True).start()
+        return {"status": "started", "version": version}
+
+    def reload(self) -> Dict:
+        with self._reload_lock:
+            start = time.perf_counter()
+            old = self.state
+            try:
+                version, path = resolve_version(self.root) if self.versioned else (None, self.root)
+                if path == old.path and model_fingerprint(path) == old.handler.model_version:
+                    return {"status": "unchanged", "version": version, "model_version": old.handler.model_version}
+                logger.info("Model yeniden yükleniyor (%s): %s", self.name, path)
+                handler = ModelHandler(model_path=path)
+                handler.warmup()
+                new = ModelState(handler, version, path)
+            except Exception as e:
+                logger.error("Model yeniden yüklenemedi (%s), eski sürüm kullanılmaya devam ediyor: %s", self.name, e)
+                self.last_reload = {"status": "failed", "error": str(e), "at": datetime.now().isoformat()}
+                return self.last_reload
+
+            self.state = new
+            load_seconds = time.perf_counter() - start
+            logger.info("Model değiştirildi (%s): %s -> %s (%.1f sn)", self.name, old.handler.model_version,
+                        handler.model_version, load_seconds)
+            drained = old.retire(settings.GRACEFUL_TIMEOUT_SECONDS)
+            if not drained:
+                logger.warning("Eski model sürümündeki istekler %d sn içinde bitmedi", settings.GRACEFUL_TIMEOUT_SECONDS)
+            self.last_reload = {
+                "status": "swapped",
+                "from": {"version": old.version, "model_version": old.handler.model_version},
+                "to": {"version": version, "model_version": handler.model_version},
+                "load_seconds": round(load_seconds, 2),
+                "at": datetime.now().isoformat()
+            }
+            return self.last_reload
+
+    # -- gölge mod --------------------------------------------------------------------
+
+    def request_shadow(self, version: Optional[str], sample_rate: float) -> Dict:
+        if not self.versioned:
+            raise ValueError(f"Gölge mod için sürümlü model klasörü gerekli: {self.root}")
+        version, _ = resolve_version(self.root, version)
+        config = {"version": version, "sample_rate": sample_rate}
+        _write_atomic(os.path.join(self.root, SHADOW_FILE), json.dumps(config))
+        threading.Thread(target=self._apply_shadow, args=(config,), name=f"shadow-load-{self.name}", daemon=True).start()
+        return {"status": "started", **config}
+
+    def stop_shadow(self) -> Dict:
+        if self.versioned:
+            try:
+                os.remove(os.path.join(self.root, SHADOW_FILE))
+            except FileNotFoundError:
+                pass
+        self._apply_shadow(None)
+        return {"status": "stopped"}
+
+    def _apply_shadow(self, config: Optional[Dict]):
+        with self._reload_lock:
+            if config == self._shadow_config:
+                return
+            old = self.shadow
+            if config is None:
+                self.shadow = None
+            else:
+                try:
+                    _, path = resolve_version(self.root, config["version"])
+                    handler = ModelHandler(model_path=path)
+                    handler.warmup()
+                except Exception as e:
+                    logger.error("Gölge model yüklenemedi (%s): %s", self.name, e)
+                    return
+                self.shadow = ShadowScorer(handler, config["version"], float(config["sample_rate"]),
+                                           settings.SHADOW_QUEUE_SIZE)
+                logger.info("Gölge mod etkin (%s): %s, örnekleme %.2f", self.name, config["version"],
+                            config["sample_rate"])
+            self._shadow_config = config
+            if old is not None:
+                old.close()
+
+    def offer_shadow(self, texts: List, active: ModelHandler):
+        shadow = self.shadow
+        if shadow is not None:
+            shadow.offer(texts, active)
+
+    # -- dosya izleme -----------------------------------------------------------------
+
+    def ensure_watcher(self):
+        # Threads do not survive fork: each worker starts its own watcher
+        if settings.MODEL_WATCH_SECONDS <= 0 or (self._watcher is not None and self._watcher_pid == os.getpid()):
+            return
+        with self._watch_lock:
+            if self._watcher is None or self._watcher_pid != os.getpid():
+                self._watcher_pid = os.getpid()
+                self._watcher = threading.Thread(target=self._watch, name=f"model-watch-{self.name}", daemon=True)
+                self._watcher.start()
+
+    def _watch(self):
+        while True:
+            time.sleep(settings.MODEL_WATCH_SECONDS)
+            try:
+                self._check_disk()
+            except Exception as e:
+                logger.warning("Model klasörü kontrol edilemedi (%s): %s", self.name, e)
+
+    def _check_disk(self):
+        state = self.state
+        if not state.handler.loaded:
+            return
+        if self.versioned:
+            _, path = resolve_version(self.root)
+            shadow_path = os.path.join(self.root, SHADOW_FILE)
+            config = None
+            if os.path.exists(shadow_path):
+                with open(shadow_path, encoding="utf-8") as f:
+                    config = json.load(f)
+            if config != self._shadow_config:
+                self._apply_shadow(config)
+            if path != state.path:
+                self.reload()
+                return
+        else:
+            path = self.root
+        # Files changed in place: reload only after the fingerprint is stable for two checks (copy finished)
+        fingerprint = model_fingerprint(path)
+        if fingerprint == state.handler.model_version:
+            self._pending_fingerprint = None
+        elif fingerprint == self._pending_fingerprint:
+            self._pending_fingerprint = None
+            self.reload()
+        else:
+            self._pending_fingerprint = fingerprint
+
+    def status(self) -> Dict:
+        state = self.state
+        return {
+            "version": state.version,
+            "path": state.path,
+            "model_version": state.handler.model_version,
+            "loaded_at": state.loaded_at,
+            "available_versions": list_versions(self.root),
+            "last_reload": self.last_reload,
+            "shadow": self.shadow.stats() if self.shadow is not None else None
+        }
+
+    def close(self):
+        self._closed = True
+        self.state.retire(settings.GRACEFUL_TIMEOUT_SECONDS)
+        if self.shadow is not None:
+            self.shadow.close()
@@ -0,0 +1,50 @@
+import re
+import zlib
+from typing import Sequence, Tuple
+
+import numpy as np
+
+from sensitive_words import casefold_tr
+
+# Shared by serving (cascade.py) and training (stages/trainstage/train_fast_classifier.py):
+# any change here changes the feature space, so bump FEATURE_VERSION with it.
+# Lexicon features are opt-in per classifier (its lexicon_features flag), so they do not change the version.
+FEATURE_VERSION = 1
+DEFAULT_N_FEATURES = 2 ** 20
+
+_WORD_PATTERN = re.compile(r"\w+", flags=re.UNICODE)
+
+
+def _ngrams(text: str, lexicon_categories: Sequence[str] = ()):
+    # Banned-word hits (SensitiveWordMatcher.find_banned) are evidence for the classifier, not a verdict
+    if lexicon_categories:
+        yield "l:*"
+        for category in lexicon_categories:
+            yield "l:" + category
+    words = _WORD_PATTERN.findall(casefold_tr(text))
+    for word in words:
+        yield "w:" + word
+        # Character trigrams inside each word catch Turkish suffixes and misspellings
+        padded = f"<{word}>"
+        for start in range(len(padded) - 2):
+            yield "c:" + padded[start:start + 3]
+    for first, second in zip(words, words[1:]):
+        yield f"b:{first} {second}"
+
+
+def hash_features(text: str, n_features: int = DEFAULT_N_FEATURES,
+                  lexicon_categories: Sequence[str] = ()) -> Tuple[np.ndarray, np.ndarray]:
+    """Metni (özellik indeksleri, L2-normalize sayımlar) çiftine dönüştürür.
+
+    crc32 is used instead of hash() because Python salts string hashes per process,
+    and the trained weights must map to the same buckets in every worker.
+    """
+    counts = {}
+    for gram in _ngrams(text, lexicon_categories):
+        index = zlib.crc32(gram.encode("utf-8")) % n_features
+        counts[index] = counts.get(index, 0) + 1
+    if not counts:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+    indices = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+    values = np.fromiter(counts.values(), dtype=np.float32, count=len(counts))
+    return indices, values / np.linalg.norm(values)
@@ -0,0 +1,139 @@
+import hashlib
+import os
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+
+def normalize_text(text: str) -> str:
+    # Unicode NFC + collapsed whitespace; case is kept because the model may be cased
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def make_key(text: str, model_version: str) -> bytes:
+    return hashlib.sha256(f"{model_version}\0{normalize_text(text)}".encode("utf-8")).digest()
+
+
+def text_digest(text: str) -> bytes:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+def model_fingerprint(model_path: str) -> str:
+    # Name, size and mtime of every file in the model directory
+    digest = hashlib.sha1()
+    for root, _, files in sorted(os.walk(model_path)):
+        for name in sorted(files):
+            path = os.path.join(root, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            digest.update(f"{os.path.relpath(path, model_path)}:{stat.st_size}:{stat.st_mtime_ns};".encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def model_identity(model_path: str) -> str:
+    """Model mimarisinin kimliği: config.json içeriği ile dosya adları ve boyutları.
+
+    Unlike model_fingerprint there are no mtimes, so a copy of the same model (another
+    checkout, a Docker image) keeps its identity, while a different architecture or
+    size (e.g. the distilled student) does not. Used to tie a tuned config to a model.
+    """
+    digest = hashlib.sha1()
+    for root, _, files in sorted(os.walk(model_path)):
+        for name in sorted(files):
+            path = os.path.join(root, name)
+            try:
+                size = os.path.getsize(path)
+            except OSError:
+                continue
+            digest.update(f"{os.path.relpath(path, model_path)}:{size};".encode("utf-8"))
+            if name == "config.json":
+                with open(path, "rb") as f:
+                    digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+def _estimate_size(value: Any) -> int:
+    if isinstance(value, dict):
+        return 64 + sum(_estimate_size(k) + _estimate_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return 56 + sum(_estimate_size(item) for item in value)
+    if isinstance(value, (str, bytes)):
+        return 49 + len(value)
+    return 28
+
+
+class ResultCache:
+    """LRU + TTL tahliyeli, bellek sınırlı, iş parçacığı güvenli sonuç önbelleği."""
+
+    def __init__(self, max_entries: int, max_bytes: int, ttl_seconds: float):
+        self.max_entries = max(1, max_entries)
+        self.max_bytes = max(1, max_bytes)
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[bytes, Tuple[float, int, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key: bytes) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, size, value = entry
+            if self.ttl_seconds > 0 and expires_at < time.monotonic():
+                del self._entries[key]
+                self._bytes -= size
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: bytes, value: Any):
+        size = _estimate_size(value) + len(key)
+        if size > self.max_bytes:
+            return
+        expires_at = time.monotonic() + self.ttl_seconds
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+            self._entries[key] = (expires_at, size, value)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, evicted_size, _) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self.invalidations += 1
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations
+            }
@@ -0,0 +1,155 @@
+import csv
+import logging
+import os
+from collections import deque
+from typing import Dict, Iterable, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Turkish casing: İ→i and I→ı, so dotted and dotless i stay different letters ("sık" is not
+# "sik"). Spellings that should match each other are listed separately in banned_words.csv.
+# Offsets returned by find_all refer to the folded text.
+_TR_FOLD = str.maketrans({"İ": "i", "I": "ı"})
+
+
+def casefold_tr(text: str) -> str:
+    return text.translate(_TR_FOLD).casefold()
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == "_"
+
+
+def load_lexicon_csv(path: str) -> List[Tuple[str, str]]:
+    # banned_words.csv: "word,category" header, "#" comment lines, blank lines
+    entries = []
+    with open(path, encoding="utf-8") as f:
+        for row in csv.reader(f):
+            if len(row) < 2:
+                continue
+            word, category = row[0].strip(), row[1].strip()
+            if not word or word.startswith("#") or (word, category) == ("word", "category"):
+                continue
+            entries.append((word, category))
+    return entries
+
+
+class SensitiveWordMatcher:
+    """Tüm hassas kelimeleri metin üzerinde tek geçişte bulan Aho-Corasick otomatı."""
+
+    def __init__(self, patterns: Iterable[Tuple]):
+        # patterns: (word, category, word_boundary) or (word, category, word_boundary, curated);
+        # curated marks entries from the banned-word list as opposed to category terms
+        self.words: List[str] = []
+        self.word_categories: List[str] = []
+        self.word_boundaries: List[bool] = []
+        self.word_curated: List[bool] = []
+        self.pattern_lengths: List[int] = []
+
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[int]] = [[]]
+
+        seen = set()
+        for word, category, word_boundary, *curated in patterns:
+            folded = casefold_tr(word)
+            if not folded or folded in seen:
+                continue
+            seen.add(folded)
+            self._add(folded, len(self.words))
+            self.words.append(word)
+            self.word_categories.append(category)
+            self.word_boundaries.append(word_boundary)
+            self.word_curated.append(bool(curated and curated[0]))
+            self.pattern_lengths.append(len(folded))
+        self._build_failure_links()
+
+    @classmethod
+    def from_sources(cls, categories: Dict[str, List[str]], lexicon_path: str = None,
+                     lexicon_word_boundary: bool = True) -> "SensitiveWordMatcher":
+        # Category terms keep the original substring semantics; the CSV lexicon
+        # holds short words ("mal", "aq") that need word boundaries
+        patterns = [(word, category, False, False) for category, words in categories.items() for word in words]
+        if lexicon_path:
+            if os.path.exists(lexicon_path):
+                lexicon = load_lexicon_csv(lexicon_path)
+                patterns.extend((word, category, lexicon_word_boundary, True) for word, category in lexicon)
+                logger.info("Yasaklı kelime listesi yüklendi: %d kelime (%s)", len(lexicon), lexicon_path)
+            else:
+                # A configured but missing lexicon would silently turn off banned-word matching
+                raise FileNotFoundError(f"Yasaklı kelime listesi bulunamadı: {lexicon_path}")
+        return cls(patterns)
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def _add(self, folded: str, pattern_id: int):
+        node = 0
+        for char in folded:
+            next_node = self._goto[node].get(char)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto[node][char] = next_node
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            node = next_node
+        self._output[node].append(pattern_id)
+
+    def _build_failure_links(self):
+        pending = deque(self._goto[0].values())
+        while pending:
+            node = pending.popleft()
+            for char, child in self._goto[node].items():
+                pending.append(child)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(char, 0)
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+
+    def find_all(self, text: str) -> List[Tuple[int, int]]:
+        # Returns (pattern_id, start_offset) for every match, in text order
+        folded = casefold_tr(text)
+        goto, fail, output = self._goto, self._fail, self._output
+        lengths, boundaries = self.pattern_lengths, self.word_boundaries
+        text_length = len(folded)
+        matches = []
+        node = 0
+        for position, char in enumerate(folded):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for pattern_id in output[node]:
+                start = position - lengths[pattern_id] + 1
+                if boundaries[pattern_id]:
+                    if start > 0 and _is_word_char(folded[start - 1]):
+                        continue
+                    if position + 1 < text_length and _is_word_char(folded[position + 1]):
+                        continue
+                matches.append((pattern_id, start))
+        return matches
+
+    def find_words(self, text: str) -> List[Tuple[str, str]]:
+        # Unique (word, category) pairs in order of first occurrence
+        found = []
+        seen = set()
+        for pattern_id, _ in self.find_all(text):
+            if pattern_id not in seen:
+                seen.add(pattern_id)
+                found.append((self.words[pattern_id], self.word_categories[pattern_id]))
+        return found
+
+    def find_banned(self, text: str) -> List[str]:
+        """Yasaklı kelime listesinden tam kelime olarak geçenlerin kategorileri (ilk görülme sırasıyla).
+
+        Category terms ("harassment") and substring matches are left out: they are too
+        ambiguous to count as evidence on their own.
+        """
+        categories = []
+        for pattern_id, _ in self.find_all(text):
+            if self.word_curated[pattern_id] and self.word_boundaries[pattern_id]:
+                category = self.word_categories[pattern_id]
+                if category not in categories:
+                    categories.append(category)
+        return categories
@@ -0,0 +1,159 @@
+import json
+import os
+
+from result_cache import model_identity
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.environ.get(name)
+    return int(value) if value not in (None, "") else default
+
+
+def _env_float(name: str, default: float) -> float:
+    value = os.environ.get(name)
+    return float(value) if value not in (None, "") else default
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.environ.get(name)
+    if value in (None, ""):
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def _load_tuned_config(path: str, model_path: str):
+    # stages/teststage/autotune.py output; only used on a machine with the same core count
+    # and for the same model it was measured with
+    if not path or not os.path.exists(path):
+        return {}, "yok"
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    if data.get("cpu_count") != os.cpu_count():
+        return {}, f"yok sayıldı: {data.get('cpu_count')} çekirdekte ölçülmüş, bu makinede {os.cpu_count()}"
+    if data.get("model_path") != os.path.abspath(model_path):
+        return {}, f"yok sayıldı: {data.get('model_path')} için ölçülmüş, MODEL_PATH {os.path.abspath(model_path)}"
+    if not os.path.exists(model_path) or data.get("model_identity") != model_identity(model_path):
+        return {}, f"yok sayıldı: {model_path} ölçülen modelden farklı (model_identity)"
+    return data.get("recommended", {}), f"yüklendi: {path}"
+
+
+# Model klasörü (tokenizer, ağırlıklar ve label_map.json)
+MODEL_PATH = os.environ.get(
+    "MODEL_PATH", os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "model"))
+)
+
+# Ayarlanmış yapılandırma: ortam değişkenleri her zaman önceliklidir, dosya yalnızca varsayılanları değiştirir
+TUNED_CONFIG_PATH = os.environ.get(
+    "TUNED_CONFIG_PATH", os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "tuned_config.json"))
+)  # boş: kapalı
+TUNED_CONFIG, TUNED_CONFIG_STATUS = _load_tuned_config(TUNED_CONFIG_PATH, MODEL_PATH)
+# Damıtılmış küçük model (stages/trainstage/distill.py); istekte "tier": "fast" ile seçilir. Boş: kapalı
+FAST_MODEL_PATH = os.environ.get("FAST_MODEL_PATH", "")
+
+# Kesintisiz yeniden yükleme: MODEL_PATH düz bir model klasörü ya da <kök>/<sürüm>/ yapısında sürümlü bir kök olabilir
+MODEL_WATCH_SECONDS = _env_float("MODEL_WATCH_SECONDS", 10.0)  # CURRENT/SHADOW.json ve dosya değişikliği kontrolü; 0: kapalı
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN", "")  # /api/admin/* için; boş: yönetim uç noktaları kapalı
+SHADOW_QUEUE_SIZE = _env_int("SHADOW_QUEUE_SIZE", 1000)  # gölge puanlamayı bekleyen en fazla metin, fazlası düşürülür
+
+# Çıkarım backend'i: torch (fp32), torch-int8 (dinamik kuantize) veya onnx (ONNX Runtime)
+INFERENCE_BACKEND = os.environ.get("INFERENCE_BACKEND", "torch")
+INFERENCE_THREADS = _env_int(
+    "INFERENCE_THREADS", TUNED_CONFIG.get("WORKER_INTRA_OP_THREADS", 0)
+)  # 0: kütüphane varsayılanı
+ONNX_MODEL_FILE = os.environ.get("ONNX_MODEL_FILE", "model.onnx")
+
+# Kaskad: sözlük + hızlı n-gram sınıflandırıcı önce karar verir, yalnızca belirsiz metinler transformer'a gider
+CASCADE_ENABLED = _env_bool("CASCADE_ENABLED", False)
+CASCADE_CLASSIFIER_PATH = os.environ.get("CASCADE_CLASSIFIER_PATH", "")  # boş: <model>/fast_classifier.npz
+CASCADE_LOW = _env_float("CASCADE_LOW", 0.1)  # nefret olasılığı bunun altındaysa hızlı aşama karar verir
+CASCADE_HIGH = _env_float("CASCADE_HIGH", 0.9)  # bunun üstündeyse de; arası transformer'a gider
+# Yasaklı listeden tam kelime eşleşmesi doğrudan nefret söylemi sayılır; cascade_report.py'deki sözlük
+# kesinliği yeterince yüksek değilse kapalı kalmalı (eşleşme yine de hızlı sınıflandırıcıya özellik olarak girer)
+CASCADE_LEXICON = _env_bool("CASCADE_LEXICON", False)
+
+# Toplu analiz ayarları
+BATCH_MAX_TEXTS = _env_int("BATCH_MAX_TEXTS", 256)  # tek istekte kabul edilen en fazla metin
+MODEL_BATCH_SIZE = _env_int("MODEL_BATCH_SIZE", TUNED_CONFIG.get("MODEL_BATCH_SIZE", 32))  # tek forward pass'teki en fazla metin
+
+# Uzun metinler: truncate (512 token'da kes) veya window (eğitim uzunluğunda örtüşen pencereler, tek batch'te)
+LONG_TEXT_MODE = os.environ.get("LONG_TEXT_MODE", "truncate")
+LONG_TEXT_WINDOW_TOKENS = _env_int("LONG_TEXT_WINDOW_TOKENS", 128)  # train_model.py'deki max_length
+LONG_TEXT_STRIDE_TOKENS = _env_int("LONG_TEXT_STRIDE_TOKENS", 32)  # ardışık pencerelerin örtüşmesi
+LONG_TEXT_TOKEN_BUDGET = _env_int("LONG_TEXT_TOKEN_BUDGET", 1024)  # metin başına puanlanan en fazla token
+LONG_TEXT_AGGREGATE = os.environ.get("LONG_TEXT_AGGREGATE", "max")  # max (en yüksek nefret olasılığı) veya mean
+
+# Tekil istekleri birleştiren mikro-batch zamanlayıcı
+MICRO_BATCH_ENABLED = _env_bool("MICRO_BATCH_ENABLED", True)
+MICRO_BATCH_MAX_SIZE = _env_int("MICRO_BATCH_MAX_SIZE", TUNED_CONFIG.get("MICRO_BATCH_MAX_SIZE", 16))
+MICRO_BATCH_MAX_WAIT_MS = _env_float("MICRO_BATCH_MAX_WAIT_MS", 5.0)
+MICRO_BATCH_RESULT_TIMEOUT_S = _env_float("MICRO_BATCH_RESULT_TIMEOUT_S", 30.0)  # istek son tarihi daha erkense o geçerli
+
+# Kabul kontrolü: worker başına model işine giren istekler sınırlanır; kuyruk doluysa 429, son tarih tutmuyorsa 503
+ADMISSION_ENABLED = _env_bool("ADMISSION_ENABLED", True)
+ADMISSION_MAX_CONCURRENT = _env_int("ADMISSION_MAX_CONCURRENT", 32)  # aynı anda modele giren en fazla istek
+ADMISSION_QUEUE_SIZE = _env_int("ADMISSION_QUEUE_SIZE", 64)  # sıra bekleyebilecek en fazla istek
+ADMISSION_BULK_QUEUE_SIZE = _env_int("ADMISSION_BULK_QUEUE_SIZE", 16)  # kuyruğun bulk isteklere ayrılan kısmı
+ADMISSION_DEFAULT_DEADLINE_MS = _env_float("ADMISSION_DEFAULT_DEADLINE_MS", 0)  # X-Request-Deadline-Ms yoksa; 0: yok
+
+# Normalize edilmiş metin sonuç önbelleği
+RESULT_CACHE_ENABLED = _env_bool("RESULT_CACHE_ENABLED", True)
+RESULT_CACHE_MAX_ENTRIES = _env_int("RESULT_CACHE_MAX_ENTRIES", 10000)
+RESULT_CACHE_MAX_BYTES = _env_int("RESULT_CACHE_MAX_BYTES", 64 * 1024 * 1024)
+RESULT_CACHE_TTL_SECONDS = _env_float("RESULT_CACHE_TTL_SECONDS", 3600.0)
+MODEL_VERSION_CHECK_SECONDS = _env_float("MODEL_VERSION_CHECK_SECONDS", 5.0)
+
+# Aynı anda gelen özdeş (normalize edilmiş) metinler tek bir çıkarımı bekler
+SINGLE_FLIGHT_ENABLED = _env_bool("SINGLE_FLIGHT_ENABLED", True)
+
+# Hassas kelime sözlüğü: iOS istemcisinin Lori/Resources/banned_words.csv listesinin sunucudaki kopyası
+# (Docker imajına app/ ile birlikte girer). Tanımlı ama dosya yoksa sunucu başlamaz; boş: sözlük kapalı.
+BANNED_WORDS_PATH = os.environ.get(
+    "BANNED_WORDS_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "resources", "banned_words.csv")
+)
+BANNED_WORDS_WORD_BOUNDARY = _env_bool("BANNED_WORDS_WORD_BOUNDARY", True)
+
+# Sunucu ayarları (geliştirme sunucusu ve gunicorn)
+PORT = _env_int("PORT", 8000)
+FLASK_DEBUG = _env_bool("FLASK_DEBUG", False)
+SERVE_WORKERS = _env_int("SERVE_WORKERS", TUNED_CONFIG.get("SERVE_WORKERS", 0))  # 0: CPU çekirdeği sayısı
+SERVE_THREADS = _env_int("SERVE_THREADS", TUNED_CONFIG.get("SERVE_THREADS", 4))  # worker başına istek iş parçacığı
+SERVE_BACKLOG = _env_int("SERVE_BACKLOG", 0)  # kabul kontrolü açıkken dinleme kuyruğu; 0: ADMISSION_QUEUE_SIZE
+WORKER_INTRA_OP_THREADS = _env_int(
+    "WORKER_INTRA_OP_THREADS", TUNED_CONFIG.get("WORKER_INTRA_OP_THREADS", 0)
+)  # 0: çekirdekler / worker
+WORKER_INTER_OP_THREADS = _env_int("WORKER_INTER_OP_THREADS", TUNED_CONFIG.get("WORKER_INTER_OP_THREADS", 1))
+GRACEFUL_TIMEOUT_SECONDS = _env_int("GRACEFUL_TIMEOUT_SECONDS", 30)
+
+# Yanıtlar: istekte "detail" verilmediğinde kullanılan ayrıntı düzeyi ve JSON kodlayıcı
+DEFAULT_DETAIL_LEVEL = os.environ.get("DEFAULT_DETAIL_LEVEL", "full")  # minimal, standard veya full
+JSON_ENCODER = os.environ.get("JSON_ENCODER", "orjson")  # orjson (kuruluysa) veya json (Flask jsonify)
+
+# Soğuk başlangıç: arka planda yükleme ve ısınma (warmup)
+MODEL_LOAD_IN_BACKGROUND = _env_bool("MODEL_LOAD_IN_BACKGROUND", False)  # gunicorn preload ile kullanmayın
+MODEL_LOW_CPU_MEM = _env_bool("MODEL_LOW_CPU_MEM", True)  # safetensors'tan doğrudan yükle, rastgele init yok
+WARMUP_ENABLED = _env_bool("WARMUP_ENABLED", True)
+WARMUP_SEQUENCE_LENGTHS = [
+    int(length) for length in os.environ.get("WARMUP_SEQUENCE_LENGTHS", "16,64,128,256").split(",") if length
+]
+WARMUP_BATCH_SIZES = [int(size) for size in os.environ.get("WARMUP_BATCH_SIZES", "1,8").split(",") if size]
+
+# Loglama: kayıtlar kuyruğa bırakılır, arka plan iş parçacığı biçimlendirip yazar
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO")
+LOG_FORMAT = os.environ.get("LOG_FORMAT", "json")  # json (satır başına bir kayıt) veya text
+LOG_FILE = os.environ.get("LOG_FILE", os.path.join("logs", "api.log"))  # boş: dosyaya yazma
+LOG_MAX_BYTES = _env_int("LOG_MAX_BYTES", 10 * 1024 * 1024)
+LOG_BACKUP_COUNT = _env_int("LOG_BACKUP_COUNT", 5)
+LOG_TO_STDOUT = _env_bool("LOG_TO_STDOUT", True)
+LOG_ASYNC = _env_bool("LOG_ASYNC", True)  # kapalıyken kayıtlar istek iş parçacığında yazılır
+LOG_QUEUE_SIZE = _env_int("LOG_QUEUE_SIZE", 10000)  # dolduğunda yeni kayıtlar düşürülür
+LOG_SAMPLE_RATES = os.environ.get("LOG_SAMPLE_RATES", "DEBUG=0.01")  # seviye başına örnekleme oranı
+
+# Prometheus metrikleri (/api/metrics); METRICS_DIR birden fazla worker'ın değerlerini birleştirir
+METRICS_DIR = os.environ.get("METRICS_DIR", "")  # boş: yalnızca bu sürecin metrikleri
+METRICS_FLUSH_SECONDS = _env_float("METRICS_FLUSH_SECONDS", 5.0)
+
+# NDJSON akış uç noktası (toplu yeniden puanlama)
+STREAM_BATCH_SIZE = _env_int("STREAM_BATCH_SIZE", 0)  # 0: MODEL_BATCH_SIZE
+STREAM_PREFETCH_BATCHES = _env_int("STREAM_PREFETCH_BATCHES", 2)  # tokenize edilip bekleyen en fazla batch
+STREAM_SPOOL_MEMORY_BYTES = _env_int("STREAM_SPOOL_MEMORY_BYTES", 8 * 1024 * 1024)  # aşılırsa diske yazılır
+STREAM_MAX_LINE_BYTES = _env_int("STREAM_MAX_LINE_BYTES", 1024 * 1024)
@@ -0,0 +1,67 @@
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class SingleFlight:
+    """Aynı anahtar için eşzamanlı çağrıları tek bir çalıştırmada birleştirir.
+
+    The first caller for a key runs the function; callers that arrive while it is
+    still running wait for the same result (or exception) instead of running it
+    again. Nothing is kept after the call finishes: caching is the result cache's job.
+
+    Each follower waits at most its own `timeout` (concurrent.futures.TimeoutError).
+    A leader exception for which `retry(exception)` is true is not handed to the
+    followers: they call again instead, one of them becoming the new leader with its
+    own function (e.g. the leader ran out of its deadline while they still have time).
+    """
+
+    def __init__(self, on_coalesced: Callable[[], None] = None):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, Future] = {}
+        self._on_coalesced = on_coalesced
+        self.coalesced = 0
+
+    def do(self, key: Hashable, function: Callable[[], Any], timeout: Optional[float] = None,
+           retry: Callable[[BaseException], bool] = None) -> Any:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                future = self._calls.get(key)
+                leader = future is None
+                if leader:
+                    future = self._calls[key] = Future()
+                else:
+                    self.coalesced += 1
+            if leader:
+                return self._lead(key, future, function)
+
+            if self._on_coalesced is not None:
+                self._on_coalesced()
+            try:
+                return future.result(None if deadline is None else max(0.0, deadline - time.monotonic()))
+            except Exception as e:
+                if future.done() and future.exception() is e and retry is not None and retry(e):
+                    continue
+                raise
+
+    def _lead(self, key: Hashable, future: Future, function: Callable[[], Any]) -> Any:
+        try:
+            result = function()
+        except BaseException as e:
+            # Unregistered before the followers wake up, so a retrying follower starts a new call
+            self._finish(key)
+            future.set_exception(e)
+            raise
+        self._finish(key)
+        future.set_result(result)
+        return result
+
+    def _finish(self, key: Hashable):
+        with self._lock:
+            del self._calls[key]
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
@@ -0,0 +1,124 @@
+import re
+from typing import Dict, List
+
+import numpy as np
+
+PUNCTUATION = '.,!?;:'
+
+EMOJI_PATTERN = re.compile("["
+    u"\U0001F600-\U0001F64F"  # emojis
+    u"\U0001F300-\U0001F5FF"  # symbols & pictographs
+    u"\U0001F680-\U0001F6FF"  # transport & map symbols
+    u"\U0001F1E0-\U0001F1FF"  # flags (iOS)
+    u"\U00002702-\U000027B0"
+    u"\U000024C2-\U0001F251"
+    "]+", flags=re.UNICODE)
+
+# Code point ranges of EMOJI_PATTERN, merged (the last range already covers
+# 2702-27B0 and 1F1E0-1F1FF)
+_EMOJI_RANGES = (
+    (0x24C2, 0x1F251),
+    (0x1F300, 0x1F5FF),
+    (0x1F600, 0x1F64F),
+    (0x1F680, 0x1F6FF),
+)
+
+_DELETE_ASCII_UPPERCASE = str.maketrans("", "", "ABCDEFGHIJKLMNOPQRSTUVWXYZ")
+_PUNCTUATION_CODES = np.array([ord(char) for char in PUNCTUATION], dtype=np.uint32)
+
+
+def extract_features(text: str) -> Dict:
+    # One split and C-level counting instead of one Python-level scan per metric
+    text_length = len(text)
+    words = text.split()
+    word_count = len(words)
+    if text.isascii():
+        # No emoji possible and only A-Z can be uppercase
+        emoji_count = 0
+        uppercase_count = text_length - len(text.translate(_DELETE_ASCII_UPPERCASE))
+    else:
+        emoji_count = len(EMOJI_PATTERN.findall(text))
+        uppercase_count = sum(map(str.isupper, text))
+    return {
+        "text_length": text_length,
+        "emoji_count": emoji_count,
+        "word_count": word_count,
+        "word_char_count": sum(map(len, words)),
+        "punctuation_count": sum(map(text.count, PUNCTUATION)),
+        "uppercase_count": uppercase_count
+    }
+
+
+def extract_features_batch(texts: List[str]) -> List[Dict]:
+    # Vectorized over the concatenated code points of every text in the batch
+    count = len(texts)
+    if count == 0:
+        return []
+    lengths = np.fromiter(map(len, texts), dtype=np.int64, count=count)
+    ends = np.cumsum(lengths)
+    starts = ends - lengths
+    total = int(ends[-1])
+    if total == 0:
+        return [extract_features(text) for text in texts]
+
+    joined = "".join(texts)
+    codes = np.frombuffer(joined.encode("utf-32-le", "surrogatepass"), dtype=np.uint32)
+
+    # Unicode properties are evaluated once per distinct code point
+    unique_codes, inverse = np.unique(codes, return_inverse=True)
+    unique_chars = [chr(code) for code in unique_codes.tolist()]
+    is_space = np.fromiter(map(str.isspace, unique_chars), dtype=bool, count=len(unique_chars))[inverse]
+    is_upper = np.fromiter(map(str.isupper, unique_chars), dtype=bool, count=len(unique_chars))[inverse]
+    is_punctuation = np.isin(codes, _PUNCTUATION_CODES)
+    is_emoji = np.zeros(total, dtype=bool)
+    for low, high in _EMOJI_RANGES:
+        is_emoji |= (codes >= low) & (codes <= high)
+
+    # A word (or an emoji run) starts where the previous character is not part of
+    # one, or where a new text begins
+    text_start = np.zeros(total, dtype=bool)
+    text_start[starts[lengths > 0]] = True
+    previous_space = np.empty(total, dtype=bool)
+    previous_space[0] = True
+    previous_space[1:] = is_space[:-1]
+    previous_emoji = np.empty(total, dtype=bool)
+    previous_emoji[0] = False
+    previous_emoji[1:] = is_emoji[:-1]
+    word_start = ~is_space & (previous_space | text_start)
+    emoji_start = is_emoji & (~previous_emoji | text_start)
+
+    def per_text(mask):
+        cumulative = np.concatenate(([0], np.cumsum(mask, dtype=np.int64)))
+        return (cumulative[ends] - cumulative[starts]).tolist()
+
+    word_counts = per_text(word_start)
+    word_char_counts = per_text(~is_space)
+    punctuation_counts = per_text(is_punctuation)
+    uppercase_counts = per_text(is_upper)
+    emoji_counts = per_text(emoji_start)
+
+    return [
+        {
+            "text_length": int(lengths[index]),
+            "emoji_count": emoji_counts[index],
+            "word_count": word_counts[index],
+            "word_char_count": word_char_counts[index],
+            "punctuation_count": punctuation_counts[index],
+            "uppercase_count": uppercase_counts[index]
+        }
+        for index in range(count)
+    ]
+
+
+def text_metrics(features: Dict) -> Dict:
+    # Same shape and rounding as the "metrics" block of the API response
+    word_count = features["word_count"]
+    text_length = features["text_length"]
+    average_word_length = float(features["word_char_count"] / word_count if word_count else 0)
+    capitalization_ratio = float(features["uppercase_count"] / text_length if text_length else 0)
+    return {
+        "word_count": int(word_count),
+        "average_word_length": round(average_word_length, 2),
+        "punctuation_count": int(features["punctuation_count"]),
+        "capitalization_ratio": round(capitalization_ratio, 2)
+    }
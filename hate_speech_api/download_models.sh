@@ -17,10 +17,21 @@ gdown "1PHig41O8g3ocLlgrPCno8-65P4-vbbKM/tokenizer_config.json" -O model/tokeniz
 gdown "1PHig41O8g3ocLlgrPCno8-65P4-vbbKM/tokenizer.json" -O model/tokenizer.json
 gdown "1PHig41O8g3ocLlgrPCno8-65P4-vbbKM/vocab.txt" -O model/vocab.txt
 
+# Etiket haritasını JSON'a çevir (başlangıçta scikit-learn yüklenmesin)
+if [ ! -f model/label_map.json ]; then
+    python app/label_map.py model
+fi
+
 # Model dosyalarının varlığını kontrol et
 echo "✅ Model dosyaları kontrol ediliyor..."
 ls -la model/
 
 # API'yi başlat
 echo "🚀 API başlatılıyor..."
-PORT=10000 python app/app.py 
\ No newline at end of file
+export PORT=10000
+if [ "${SERVE_MODE:-production}" = "dev" ]; then
+    python app/app.py
+else
+    # Çok worker'lı üretim sunucusu, model fork öncesi bir kez yüklenir
+    exec gunicorn -c gunicorn.conf.py app:app
+fi 
\ No newline at end of file
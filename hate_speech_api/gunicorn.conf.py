@@ -0,0 +1,94 @@
+# Üretim sunucusu: model master süreçte bir kez yüklenir (preload_app), worker'lar
+# fork ile oluşturulur ve ağırlıkları copy-on-write olarak paylaşır.
+#
+#   gunicorn -c gunicorn.conf.py app:app
+import gc
+import logging
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "app"))
+
+import settings
+
+os.makedirs("logs", exist_ok=True)
+
+# Workers write metric snapshots here so /api/metrics reports all of them
+_created_metrics_dir = None
+if not settings.METRICS_DIR:
+    _created_metrics_dir = settings.METRICS_DIR = tempfile.mkdtemp(prefix="hate-speech-metrics-")
+
+bind = f"0.0.0.0:{settings.PORT}"
+workers = settings.SERVE_WORKERS or multiprocessing.cpu_count()
+worker_class = "gthread"
+threads = settings.SERVE_THREADS
+if settings.ADMISSION_ENABLED:
+    # Admitted and queued requests each hold a handler thread. With fewer threads, excess
+    # requests would wait in gunicorn's own unbounded queue, where they cannot be shed
+    threads = max(threads, settings.ADMISSION_MAX_CONCURRENT + settings.ADMISSION_QUEUE_SIZE)
+    # gthread accepts up to worker_connections connections and queues their requests for a free
+    # thread, out of sight of admission control. Bounded to the threads, the excess stays in the
+    # listen backlog, which is kept short as well, so overload is shed at accept
+    worker_connections = threads
+    backlog = settings.SERVE_BACKLOG or settings.ADMISSION_QUEUE_SIZE
+preload_app = True
+graceful_timeout = settings.GRACEFUL_TIMEOUT_SECONDS
+timeout = 120
+# Idle keep-alive connections also count against worker_connections; with the bound above they
+# would keep new requests waiting in the backlog, so connections are closed after each response
+keepalive = 0 if settings.ADMISSION_ENABLED else 5
+
+
+def when_ready(server):
+    # Move everything allocated while preloading into the permanent generation so
+    # the garbage collector in the workers does not touch (and copy) those pages
+    gc.collect()
+    gc.freeze()
+    server.log.info(f"{workers} worker başlatılıyor (worker başına {threads} iş parçacığı)")
+
+
+def post_fork(server, worker):
+    import torch
+
+    intra_op_threads = settings.WORKER_INTRA_OP_THREADS or max(1, multiprocessing.cpu_count() // workers)
+    torch.set_num_threads(intra_op_threads)
+    try:
+        torch.set_num_interop_threads(settings.WORKER_INTER_OP_THREADS)
+    except RuntimeError:
+        # Inter-op pool was already started in the master; keep its size
+        pass
+    server.log.info(
+        f"Worker {worker.pid}: intra-op iş parçacığı sayısı {intra_op_threads}, "
+        f"inter-op {torch.get_num_interop_threads()}"
+    )
+
+
+def post_worker_init(worker):
+    # Warm up inside each worker (not in the master) so that no torch thread pool
+    # is running when the master forks; the worker accepts requests afterwards
+    app_module = sys.modules.get("app")
+    for slot in getattr(app_module, "slots", {}).values():
+        if slot.handler.loaded:
+            slot.handler.warmup()
+        # Each worker watches the model directory for new versions (CURRENT, SHADOW.json)
+        slot.ensure_watcher()
+
+
+def worker_exit(server, worker):
+    # In-flight requests have finished; drain whatever is left in the micro-batch queue
+    app_module = sys.modules.get("app")
+    for slot in getattr(app_module, "slots", {}).values():
+        slot.close()
+    # Keep this worker's counters in the merged totals after it exits
+    metrics_module = sys.modules.get("metrics")
+    if metrics_module is not None:
+        metrics_module.REGISTRY.flush()
+    logging.shutdown()
+
+
+def on_exit(server):
+    if _created_metrics_dir is not None:
+        shutil.rmtree(_created_metrics_dir, ignore_errors=True)
@@ -0,0 +1,202 @@
+import argparse
+import itertools
+import json
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime
+
+import requests
+
+from bench_workers import API_DIR, SAMPLE_TEXTS, wait_ready
+from compare_backends import APP_DIR, percentile
+
+sys.path.insert(0, APP_DIR)
+from result_cache import model_identity  # noqa: E402
+
+
+def powers_of_two(limit):
+    values, value = [], 1
+    while value <= limit:
+        values.append(value)
+        value *= 2
+    if values[-1] != limit:
+        values.append(limit)
+    return values
+
+
+def candidate_configs(args, cpu_count):
+    # workers x intra-op threads beyond the core count only oversubscribe, so they are skipped by default
+    workers = [int(value) for value in args.workers.split(",")] if args.workers else powers_of_two(cpu_count)
+    intra = [int(value) for value in args.intra_op.split(",")] if args.intra_op else powers_of_two(cpu_count)
+    inter = [int(value) for value in args.inter_op.split(",")]
+    batch_sizes = [int(value) for value in args.batch_sizes.split(",")]
+    for worker_count, intra_threads, inter_threads, batch_size in itertools.product(workers, intra, inter, batch_sizes):
+        if worker_count * intra_threads > cpu_count and not args.allow_oversubscription:
+            continue
+        yield {
+            "SERVE_WORKERS": worker_count,
+            "SERVE_THREADS": args.serve_threads,
+            "WORKER_INTRA_OP_THREADS": intra_threads,
+            "WORKER_INTER_OP_THREADS": inter_threads,
+            "MICRO_BATCH_MAX_SIZE": batch_size,
+            "MODEL_BATCH_SIZE": max(batch_size, 8)
+        }
+
+
+def drive_load(url, concurrency, duration, offset):
+    # Closed loop: every client sends its next request as soon as the previous one returns
+    stop_at = time.time() + duration
+    latencies, errors = [], [0]
+    lock = threading.Lock()
+
+    def client(index):
+        session = requests.Session()
+        position = index
+        while time.time() < stop_at:
+            # Unique texts, so neither the result cache nor single-flight answers for the model
+            text = f"{SAMPLE_TEXTS[position % len(SAMPLE_TEXTS)]} #{offset}-{position}"
+            position += concurrency
+            start = time.perf_counter()
+            try:
+                ok = session.post(f"{url}/api/check-hate-speech", json={"text": text}, timeout=30).status_code == 200
+            except requests.RequestException:
+                ok = False
+            elapsed = time.perf_counter() - start
+            with lock:
+                if ok:
+                    latencies.append(elapsed)
+                else:
+                    errors[0] += 1
+
+    threads = [threading.Thread(target=client, args=(index,)) for index in range(concurrency)]
+    start = time.time()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, errors[0], time.time() - start
+
+
+def measure(config, args):
+    url = f"http://127.0.0.1:{args.port}"
+    env = dict(
+        os.environ,
+        PORT=str(args.port),
+        MODEL_PATH=os.path.abspath(args.model_path),
+        TUNED_CONFIG_PATH="",
+        # Shed requests (429/503) would count as errors and disqualify configs; this sweep measures raw capacity
+        ADMISSION_ENABLED="0",
+        RESULT_CACHE_ENABLED="0",
+        LOG_TO_STDOUT="0",
+        LOG_FILE="",
+        MODEL_WATCH_SECONDS="0",
+        **{name: str(value) for name, value in config.items()}
+    )
+    server = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "app:app"],
+        cwd=API_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        if not wait_ready(url, args.startup_timeout):
+            raise SystemExit(f"Sunucu {args.startup_timeout} sn içinde hazır olmadı: {config}")
+        drive_load(url, args.concurrency, args.warmup, "warmup")
+        latencies, errors, elapsed = drive_load(url, args.concurrency, args.duration, "run")
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=60)
+
+    return {
+        "config": config,
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / elapsed, 1),
+        "latency_ms_p50": round(percentile(latencies, 50) * 1000, 2) if latencies else None,
+        "latency_ms_p99": round(percentile(latencies, 99) * 1000, 2) if latencies else None
+    }
+
+
+def recommend(results, max_p99_ms):
+    # Highest throughput among error-free configs within the p99 limit; lower p99 breaks ties
+    usable = [result for result in results if result["requests"] and not result["errors"]]
+    if max_p99_ms:
+        within = [result for result in usable if result["latency_ms_p99"] <= max_p99_ms]
+        if not within:
+            print(f"Uyarı: hiçbir yapılandırma p99 <= {max_p99_ms} ms koşulunu sağlamadı, sınır yok sayılıyor")
+        usable = within or usable
+    if not usable:
+        return None
+    return max(usable, key=lambda result: (result["throughput_rps"], -result["latency_ms_p99"]))
+
+
+def main():
+    cpu_count = os.cpu_count()
+    parser = argparse.ArgumentParser(description="Bu makinede worker, iş parçacığı ve batch boyutu taraması")
+    parser.add_argument("--model-path", default="model")
+    parser.add_argument("--workers", help="Virgülle ayrılmış worker sayıları (varsayılan: 1, 2, 4, ... çekirdek)")
+    parser.add_argument("--intra-op", help="Worker başına intra-op iş parçacıkları (varsayılan: 1, 2, 4, ... çekirdek)")
+    parser.add_argument("--inter-op", default="1,2")
+    parser.add_argument("--batch-sizes", default="1,8,16,32", help="MICRO_BATCH_MAX_SIZE değerleri")
+    parser.add_argument("--serve-threads", type=int, default=4, help="Worker başına istek iş parçacığı")
+    parser.add_argument("--allow-oversubscription", action="store_true",
+                        help="worker x intra-op > çekirdek olan yapılandırmaları da ölç")
+    parser.add_argument("--concurrency", type=int, default=max(8, cpu_count * 4), help="Eşzamanlı istemci sayısı")
+    parser.add_argument("--warmup", type=float, default=3)
+    parser.add_argument("--duration", type=float, default=15)
+    parser.add_argument("--max-p99-ms", type=float, default=0, help="Önerilecek yapılandırma için p99 sınırı; 0: yok")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--startup-timeout", type=float, default=120)
+    parser.add_argument("--output", default="reports/autotune.json")
+    parser.add_argument("--config-output", default=os.path.join(API_DIR, "tuned_config.json"),
+                        help="Sunucunun başlangıçta okuduğu önerilen yapılandırma (TUNED_CONFIG_PATH)")
+    args = parser.parse_args()
+
+    configs = list(candidate_configs(args, cpu_count))
+    print(f"{cpu_count} çekirdek, {len(configs)} yapılandırma, {args.concurrency} eşzamanlı istemci")
+    print(f"{'worker':>6} {'intra':>6} {'inter':>6} {'batch':>6} {'istek/sn':>9} {'p50 ms':>8} {'p99 ms':>8} {'hata':>5}")
+    results = []
+    for config in configs:
+        result = measure(config, args)
+        results.append(result)
+        print(f"{config['SERVE_WORKERS']:>6} {config['WORKER_INTRA_OP_THREADS']:>6} "
+              f"{config['WORKER_INTER_OP_THREADS']:>6} {config['MICRO_BATCH_MAX_SIZE']:>6} "
+              f"{result['throughput_rps']:>9.1f} {result['latency_ms_p50'] or 0:>8.2f} "
+              f"{result['latency_ms_p99'] or 0:>8.2f} {result['errors']:>5}")
+
+    best = recommend(results, args.max_p99_ms)
+    report = {
+        "timestamp": datetime.now().isoformat(),
+        "cpu_count": cpu_count,
+        "model_path": os.path.abspath(args.model_path),
+        "concurrency": args.concurrency,
+        "duration_s": args.duration,
+        "max_p99_ms": args.max_p99_ms or None,
+        "recommended": best["config"] if best else None,
+        "results": results
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\nRapor kaydedildi: {args.output}")
+    if best is None:
+        raise SystemExit("Hatasız çalışan yapılandırma yok, önerilen yapılandırma yazılmadı")
+
+    with open(args.config_output, "w", encoding="utf-8") as f:
+        json.dump({
+            "timestamp": report["timestamp"],
+            "cpu_count": cpu_count,
+            "model_path": report["model_path"],
+            # settings.py ignores this file for any other model (path or architecture)
+            "model_identity": model_identity(report["model_path"]),
+            "recommended": best["config"],
+            "measured": {key: best[key] for key in ("throughput_rps", "latency_ms_p50", "latency_ms_p99")}
+        }, f, ensure_ascii=False, indent=2)
+    print(f"Önerilen yapılandırma ({best['throughput_rps']} istek/sn, p99 {best['latency_ms_p99']} ms): "
+          f"{args.config_output}")
+
+
+if __name__ == "__main__":
+    main()
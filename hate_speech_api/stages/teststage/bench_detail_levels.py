@@ -0,0 +1,107 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+from datetime import datetime
+
+from bench_workers import SAMPLE_TEXTS
+from compare_backends import APP_DIR
+
+LEVELS = ("minimal", "standard", "full")
+ENCODERS = ("json", "orjson")
+
+CHILD = r'''
+import json, sys, time
+sys.path.insert(0, {app_dir!r})
+import app as api
+import metrics
+
+client = api.app.test_client()
+texts = {texts!r}
+
+def stage_seconds(stage):
+    _, total = metrics.STAGE_SECONDS.labels(stage).value()
+    return total
+
+def run(level, requests, offset):
+    latencies, sizes = [], []
+    before = {{stage: stage_seconds(stage) for stage in ("analysis", "serialize")}}
+    for index in range(requests):
+        # Unique texts: every request pays for inference and for its detail level
+        text = f"{{texts[index % len(texts)]}} #{{offset}}-{{index}}"
+        start = time.perf_counter()
+        response = client.post("/api/check-hate-speech", json={{"text": text, "detail": level}})
+        latencies.append(time.perf_counter() - start)
+        assert response.status_code == 200, response.data
+        sizes.append(len(response.data))
+    latencies.sort()
+    stages = {{stage: (stage_seconds(stage) - value) / requests * 1000 for stage, value in before.items()}}
+    return {{
+        "payload_bytes": round(sum(sizes) / len(sizes), 1),
+        "latency_ms_p50": round(latencies[len(latencies) // 2] * 1000, 3),
+        "latency_ms_p99": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000, 3),
+        "analysis_ms": round(stages["analysis"], 4),
+        "serialize_ms": round(stages["serialize"], 4)
+    }}
+
+results = {{}}
+for level in {levels!r}:
+    run(level, 20, "warmup")
+    results[level] = run(level, {requests}, "run")
+print(json.dumps({{"encoder": "orjson" if api.orjson is not None else "json", "levels": results}}))
+'''
+
+
+def run_encoder(encoder, args):
+    env = dict(
+        os.environ,
+        MODEL_PATH=os.path.abspath(args.model_path),
+        JSON_ENCODER=encoder,
+        RESULT_CACHE_ENABLED="0",
+        MICRO_BATCH_ENABLED="0",
+        LOG_TO_STDOUT="0",
+        LOG_FILE="",
+        MODEL_WATCH_SECONDS="0"
+    )
+    code = CHILD.format(app_dir=APP_DIR, texts=SAMPLE_TEXTS, levels=LEVELS, requests=args.requests)
+    output = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True)
+    if output.returncode != 0:
+        raise SystemExit(f"{encoder} başarısız:\n{output.stderr}")
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ayrıntı düzeyine ve JSON kodlayıcıya göre yanıt boyutu ve gecikme")
+    parser.add_argument("--model-path", default="model")
+    parser.add_argument("--requests", type=int, default=300, help="Düzey başına istek sayısı")
+    parser.add_argument("--encoders", default=",".join(ENCODERS))
+    parser.add_argument("--output", default="reports/detail_levels.json")
+    args = parser.parse_args()
+
+    results = {}
+    print(f"{'kodlayıcı':>9} {'düzey':>9} {'bayt':>7} {'p50 ms':>8} {'p99 ms':>8} "
+          f"{'analiz ms':>10} {'json ms':>8}")
+    for encoder in args.encoders.split(","):
+        result = run_encoder(encoder, args)
+        if result["encoder"] != encoder:
+            print(f"Uyarı: {encoder} kullanılamadı, {result['encoder']} ile ölçüldü")
+        results[encoder] = result["levels"]
+        for level, row in result["levels"].items():
+            print(f"{result['encoder']:>9} {level:>9} {row['payload_bytes']:>7.0f} {row['latency_ms_p50']:>8.2f} "
+                  f"{row['latency_ms_p99']:>8.2f} {row['analysis_ms']:>10.4f} "
+                  f"{row['serialize_ms']:>8.4f}")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump({
+            "timestamp": datetime.now().isoformat(),
+            "model_path": os.path.abspath(args.model_path),
+            "requests_per_level": args.requests,
+            "results": results
+        }, f, ensure_ascii=False, indent=2)
+    print(f"\nRapor kaydedildi: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
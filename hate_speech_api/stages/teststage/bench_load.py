@@ -0,0 +1,356 @@
+import argparse
+import hashlib
+import json
+import os
+import random
+import signal
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from urllib.parse import urlparse
+
+import requests
+
+API_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+# Gerçekçi gönderi uzunlukları için parçalar: çoğu gönderi kısa, az sayıda uzun gönderi
+FRAGMENTS = [
+    "Bugün hava çok güzel", "herkese iyi günler", "bu paylaşım için teşekkürler",
+    "yarın akşam konsere kim geliyor", "I really enjoyed this post", "you people are the worst",
+    "go back to where you came from", "harika bir fotoğraf olmuş", "bu ne saçmalık böyle",
+    "seni bir daha burada görmek istemiyorum", "what a beautiful day", "bunu herkes okumalı",
+    "kimse senin fikrini sormadı", "tebrikler çok başarılı", "I want to kill you",
+    "maç çok heyecanlıydı", "bu konuda sana katılmıyorum", "lütfen saygılı olalım",
+]
+EMOJIS = ["😀", "🎉", "❤️", "😡", "👍", "🔥", "😂"]
+
+DEFAULT_HEADERS = {"Content-Type": "application/json"}
+
+
+def generate_corpus(size, seed):
+    # Seeded, so the same --seed always replays the same sequence of posts
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(size):
+        # Log-normal word counts: median around 12 words with a long tail
+        target_words = max(1, min(400, int(rng.lognormvariate(2.5, 0.9))))
+        words = []
+        while len(words) < target_words:
+            words.extend(rng.choice(FRAGMENTS).split())
+        text = " ".join(words[:target_words])
+        if rng.random() < 0.3:
+            text += " " + rng.choice(EMOJIS)
+        if rng.random() < 0.5:
+            text += rng.choice([".", "!", "?", "!!"])
+        corpus.append(text)
+    return corpus
+
+
+def load_corpus(path):
+    texts = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                texts.append(json.loads(line)["text"] if path.endswith(".jsonl") else line)
+    return texts
+
+
+def save_corpus(texts, path):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        for text in texts:
+            f.write(json.dumps({"text": text}, ensure_ascii=False) + "\n")
+
+
+def corpus_digest(texts):
+    digest = hashlib.sha1()
+    for text in texts:
+        digest.update(text.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()[:16]
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class Recorder:
+    """İstek sonuçlarını iş parçacıkları arasında toplar."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = []
+        self.errors = {}
+
+    def record(self, latency, status):
+        with self.lock:
+            if status == 200:
+                self.latencies.append(latency)
+            else:
+                self.errors[str(status)] = self.errors.get(str(status), 0) + 1
+
+    def summary(self, elapsed, offered=None):
+        error_count = sum(self.errors.values())
+        total = len(self.latencies) + error_count
+        latencies_ms = [latency * 1000 for latency in self.latencies]
+        result = {
+            "requests": total,
+            "throughput_rps": round(len(self.latencies) / elapsed, 1) if elapsed else 0.0,
+            "error_rate": round(error_count / total, 4) if total else 0.0,
+            "errors": self.errors,
+            "latency_ms": {
+                "p50": round(percentile(latencies_ms, 50), 2),
+                "p95": round(percentile(latencies_ms, 95), 2),
+                "p99": round(percentile(latencies_ms, 99), 2),
+                "max": round(max(latencies_ms), 2) if latencies_ms else 0.0
+            }
+        }
+        if offered is not None:
+            result["offered_rps"] = offered
+        return result
+
+
+_local = threading.local()
+
+
+def send(url, text, headers, timeout):
+    session = getattr(_local, "session", None)
+    if session is None:
+        session = _local.session = requests.Session()
+    try:
+        response = session.post(f"{url}/api/check-hate-speech", json={"text": text}, headers=headers, timeout=timeout)
+        return response.status_code
+    except requests.Timeout:
+        return "timeout"
+    except requests.RequestException:
+        return "connection_error"
+
+
+def run_closed_loop(url, corpus, concurrency, duration, headers=None, timeout=30.0):
+    # Each client sends its next request as soon as the previous one returns
+    recorder = Recorder()
+    stop_at = time.perf_counter() + duration
+
+    def client(index):
+        position = index
+        while time.perf_counter() < stop_at:
+            text = corpus[position % len(corpus)]
+            position += concurrency
+            start = time.perf_counter()
+            status = send(url, text, headers or DEFAULT_HEADERS, timeout)
+            recorder.record(time.perf_counter() - start, status)
+
+    threads = [threading.Thread(target=client, args=(index,)) for index in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    result = recorder.summary(time.perf_counter() - start)
+    result["concurrency"] = concurrency
+    return result
+
+
+def run_open_loop(url, corpus, rate, duration, headers=None, timeout=30.0, max_in_flight=512,
+                  poisson=True, seed=0, request_start=False):
+    # Requests are sent on a fixed schedule regardless of how fast the server answers.
+    # Latency is measured from the scheduled send time, so queueing on our side while the
+    # server is saturated counts against the server (no coordinated omission).
+    recorder = Recorder()
+    rng = random.Random(seed)
+    executor = ThreadPoolExecutor(max_workers=max_in_flight)
+
+    def fire(text, scheduled):
+        request_headers = headers or DEFAULT_HEADERS
+        if request_start:
+            # Like a proxy would: the server counts our client-side queueing against the deadline too
+            sent_at = time.time() - (time.perf_counter() - scheduled)
+            request_headers = dict(request_headers, **{"X-Request-Start": f"t={int(sent_at * 1000)}"})
+        status = send(url, text, request_headers, timeout)
+        recorder.record(time.perf_counter() - scheduled, status)
+
+    start = time.perf_counter()
+    scheduled = start
+    position = 0
+    while scheduled < start + duration:
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        executor.submit(fire, corpus[position % len(corpus)], scheduled)
+        position += 1
+        scheduled += rng.expovariate(rate) if poisson else 1.0 / rate
+    executor.shutdown(wait=True)
+    return recorder.summary(time.perf_counter() - start, offered=rate)
+
+
+def find_saturation(results, key, slo_p99_ms):
+    # Last step that still kept up with the offered load within the p99 objective
+    saturation = None
+    for result in results:
+        within_slo = result["latency_ms"]["p99"] <= slo_p99_ms and result["error_rate"] < 0.01
+        if key == "offered_rps":
+            kept_up = result["throughput_rps"] >= 0.95 * result["offered_rps"]
+        else:
+            # Closed loop: more clients must still buy at least 5% more throughput
+            previous = saturation["throughput_rps"] if saturation else 0.0
+            kept_up = result["throughput_rps"] >= previous * 1.05
+        if not (within_slo and kept_up):
+            break
+        saturation = result
+    if saturation is None:
+        return None
+    return {key: saturation[key], "throughput_rps": saturation["throughput_rps"],
+            "p99_ms": saturation["latency_ms"]["p99"]}
+
+
+def wait_ready(url, timeout):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if requests.get(f"{url}/api/ready", timeout=1).status_code == 200:
+                return True
+        except requests.RequestException:
+            pass
+        time.sleep(0.5)
+    return False
+
+
+def start_server(port, workers, extra_env=None):
+    env = dict(os.environ, PORT=str(port), **(extra_env or {}))
+    if workers:
+        env["SERVE_WORKERS"] = str(workers)
+    # Önbellek tekrar eden korpusu ölçümden saklamasın
+    env.setdefault("RESULT_CACHE_ENABLED", "0")
+    return subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "app:app"],
+        cwd=API_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=API_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def parse_list(value, cast):
+    return [cast(item) for item in value.split(",") if item]
+
+
+def print_row(label, result):
+    latency = result["latency_ms"]
+    print(f"{label:>10} {result['throughput_rps']:>9.1f} {latency['p50']:>8.1f} {latency['p95']:>8.1f} "
+          f"{latency['p99']:>8.1f} {result['error_rate']:>7.2%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="/api/check-hate-speech yük testi ve gecikme ölçümü")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--allow-remote", action="store_true", help="localhost dışındaki sunuculara izin ver")
+    parser.add_argument("--start-server", action="store_true", help="gunicorn sunucusunu bu betik başlatsın")
+    parser.add_argument("--workers", type=int, default=0)
+    parser.add_argument("--corpus", help="Metin dosyası (.txt satır başına bir metin veya .jsonl {text})")
+    parser.add_argument("--corpus-size", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--save-corpus", help="Üretilen korpusu tekrar oynatmak için kaydet")
+    parser.add_argument("--concurrency", default="1,2,4,8,16,32", help="Kapalı döngü eşzamanlılık adımları")
+    parser.add_argument("--rates", default="", help="Açık döngü istek/sn adımları (ör. 10,20,50,100)")
+    parser.add_argument("--constant-rate", action="store_true", help="Poisson yerine sabit aralıklı gönderim")
+    parser.add_argument("--duration", type=float, default=20)
+    parser.add_argument("--warmup", type=float, default=3)
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--slo-p99-ms", type=float, default=500)
+    parser.add_argument("--header", action="append", default=[], help="Ek istek başlığı (Ad: değer)")
+    parser.add_argument("--output", default="reports/load_test.json")
+    args = parser.parse_args()
+
+    url = args.url.rstrip("/")
+    host = urlparse(url).hostname
+    if host not in ("127.0.0.1", "localhost", "::1") and not args.allow_remote:
+        raise SystemExit(f"Yük testi yalnızca yerel sunucuya karşı çalışır: {host} (--allow-remote)")
+
+    corpus = load_corpus(args.corpus) if args.corpus else generate_corpus(args.corpus_size, args.seed)
+    if args.save_corpus:
+        save_corpus(corpus, args.save_corpus)
+    lengths = [len(text) for text in corpus]
+    print(f"Korpus: {len(corpus)} metin, uzunluk p50={percentile(lengths, 50)} p95={percentile(lengths, 95)} "
+          f"max={max(lengths)} karakter")
+
+    headers = dict(DEFAULT_HEADERS)
+    for header in args.header:
+        name, value = header.split(":", 1)
+        headers[name.strip()] = value.strip()
+
+    server = None
+    if args.start_server:
+        server = start_server(urlparse(url).port or 8000, args.workers)
+    try:
+        if not wait_ready(url, 120):
+            raise SystemExit(f"Sunucu hazır değil: {url}/api/ready")
+        run_closed_loop(url, corpus, 4, args.warmup, headers, args.timeout)
+
+        report = {
+            "timestamp": datetime.now().isoformat(),
+            "commit": git_commit(),
+            "url": url,
+            "corpus": {
+                "source": os.path.abspath(args.corpus) if args.corpus else f"generated(seed={args.seed})",
+                "size": len(corpus),
+                "sha1": corpus_digest(corpus),
+                "length_p50": percentile(lengths, 50),
+                "length_p95": percentile(lengths, 95)
+            },
+            "duration_s": args.duration,
+            "slo_p99_ms": args.slo_p99_ms,
+            "headers": headers
+        }
+
+        header_row = f"{'istek/sn':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'hata':>7}"
+        concurrency_steps = parse_list(args.concurrency, int)
+        if concurrency_steps:
+            print(f"\nKapalı döngü\n{'eşzamanlı':>10} {header_row}")
+            closed = []
+            for concurrency in concurrency_steps:
+                result = run_closed_loop(url, corpus, concurrency, args.duration, headers, args.timeout)
+                closed.append(result)
+                print_row(str(concurrency), result)
+            report["closed_loop"] = closed
+            report["closed_loop_saturation"] = find_saturation(closed, "concurrency", args.slo_p99_ms)
+            print(f"Doygunluk noktası: {report['closed_loop_saturation']}")
+
+        rate_steps = parse_list(args.rates, float)
+        if rate_steps:
+            print(f"\nAçık döngü\n{'hedef/sn':>10} {header_row}")
+            opened = []
+            for rate in rate_steps:
+                result = run_open_loop(url, corpus, rate, args.duration, headers, args.timeout,
+                                       poisson=not args.constant_rate, seed=args.seed)
+                opened.append(result)
+                print_row(f"{rate:g}", result)
+            report["open_loop"] = opened
+            report["open_loop_saturation"] = find_saturation(opened, "offered_rps", args.slo_p99_ms)
+            print(f"Doygunluk noktası: {report['open_loop_saturation']}")
+    finally:
+        if server is not None:
+            server.send_signal(signal.SIGTERM)
+            server.wait(timeout=60)
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\nRapor kaydedildi: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
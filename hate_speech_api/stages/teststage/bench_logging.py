@@ -0,0 +1,82 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+
+APP_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'app'))
+
+# Loglama ayarının istek başına maliyeti; her yapılandırma temiz bir süreçte ölçülür
+CONFIGS = {
+    "off": {"LOG_LEVEL": "CRITICAL"},
+    "sync-debug-text": {"LOG_ASYNC": "0", "LOG_LEVEL": "DEBUG", "LOG_FORMAT": "text", "LOG_SAMPLE_RATES": ""},
+    "async-debug-json": {"LOG_ASYNC": "1", "LOG_LEVEL": "DEBUG", "LOG_FORMAT": "json", "LOG_SAMPLE_RATES": ""},
+    "async-debug-sampled": {"LOG_ASYNC": "1", "LOG_LEVEL": "DEBUG", "LOG_FORMAT": "json", "LOG_SAMPLE_RATES": "DEBUG=0.01"},
+    "async-info-json": {"LOG_ASYNC": "1", "LOG_LEVEL": "INFO", "LOG_FORMAT": "json"},
+}
+
+CHILD = r'''
+import json, sys, time
+sys.path.insert(0, {app_dir!r})
+import app as api
+client = api.app.test_client()
+texts = ["Bugün hava çok güzel, herkese iyi günler! #%d" % i for i in range({requests})]
+for text in texts[:20]:
+    client.post("/api/check-hate-speech", json={{"text": text}})
+start = time.perf_counter()
+for text in texts:
+    client.post("/api/check-hate-speech", json={{"text": text}})
+elapsed = time.perf_counter() - start
+print(json.dumps({{"rps": round(len(texts) / elapsed, 1), "ms_per_request": round(elapsed / len(texts) * 1000, 3)}}))
+'''
+
+
+def run_config(name, overrides, args, log_dir):
+    env = dict(
+        os.environ,
+        MODEL_PATH=os.path.abspath(args.model_path),
+        RESULT_CACHE_ENABLED="0",
+        MICRO_BATCH_ENABLED="0",
+        LOG_TO_STDOUT="0",
+        LOG_FILE=os.path.join(log_dir, f"{name}.log"),
+        **overrides
+    )
+    code = CHILD.format(app_dir=APP_DIR, requests=args.requests)
+    output = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True)
+    result = json.loads(output.stdout.strip().splitlines()[-1])
+    log_path = env["LOG_FILE"]
+    result["log_bytes"] = os.path.getsize(log_path) if os.path.exists(log_path) else 0
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Loglama yapılandırmalarına göre istek/sn karşılaştırması")
+    parser.add_argument("--model-path", default="model")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--configs", default=",".join(CONFIGS))
+    parser.add_argument("--output", default="reports/logging_overhead.json")
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as log_dir:
+        print(f"{'yapılandırma':>20} {'istek/sn':>9} {'ms/istek':>9} {'log (KB)':>9}")
+        for name in args.configs.split(","):
+            result = run_config(name, CONFIGS[name], args, log_dir)
+            results[name] = result
+            print(f"{name:>20} {result['rps']:>9.1f} {result['ms_per_request']:>9.3f} {result['log_bytes'] / 1024:>9.1f}")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump({
+            "timestamp": datetime.now().isoformat(),
+            "requests": args.requests,
+            "configs": {name: CONFIGS[name] for name in results},
+            "results": results
+        }, f, ensure_ascii=False, indent=2)
+    print(f"\nRapor kaydedildi: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+from datetime import datetime
+
+from compare_backends import APP_DIR
+
+# Her mod temiz bir süreçte ölçülür; ayarlar modül yüklenirken okunur
+MODES = {
+    "truncate": {"LONG_TEXT_MODE": "truncate"},
+    "window": {"LONG_TEXT_MODE": "window"},
+}
+
+CHILD = r'''
+import json, sys, time
+sys.path.insert(0, {app_dir!r})
+import settings
+from model_handler import ModelHandler
+
+handler = ModelHandler(model_path={model_path!r})
+sentence = "bu uzun paylaşımda herkes kendi fikrini özgürce yazıyor ve tartışma devam ediyor. "
+
+def text_of(tokens):
+    # Repeat the sentence past the requested length, then cut it at exactly that many tokens
+    per_sentence = len(handler.tokenizer(sentence, add_special_tokens=False)["input_ids"])
+    ids = handler.tokenizer(sentence * (tokens // per_sentence + 1), add_special_tokens=False)["input_ids"]
+    return handler.tokenizer.decode(ids[:tokens])
+
+results = []
+for tokens in {lengths}:
+    text = text_of(tokens)
+    inputs = handler._tokenize([text])
+    handler._predict(inputs)
+    latencies = []
+    for _ in range({repeats}):
+        start = time.perf_counter()
+        handler._predict(handler._tokenize([text]))
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    windows = int(inputs["attention_mask"].shape[0])
+    scored = int(inputs["attention_mask"].sum())
+    results.append({{
+        "tokens": tokens,
+        "windows": windows,
+        "scored_tokens": scored,
+        "latency_ms_p50": round(latencies[len(latencies) // 2] * 1000, 3),
+        "latency_ms_p99": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000, 3)
+    }})
+print(json.dumps(results))
+'''
+
+
+def run_mode(name, overrides, args, lengths):
+    env = dict(
+        os.environ,
+        LOG_TO_STDOUT="0",
+        LOG_FILE="",
+        WARMUP_ENABLED="0",
+        RESULT_CACHE_ENABLED="0",
+        LONG_TEXT_WINDOW_TOKENS=str(args.window),
+        LONG_TEXT_STRIDE_TOKENS=str(args.stride),
+        LONG_TEXT_TOKEN_BUDGET=str(args.token_budget),
+        **overrides
+    )
+    code = CHILD.format(app_dir=APP_DIR, model_path=os.path.abspath(args.model_path), lengths=lengths,
+                        repeats=args.repeats)
+    output = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True)
+    if output.returncode != 0:
+        raise SystemExit(f"{name} başarısız:\n{output.stderr}")
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Metin uzunluğuna göre gecikme: 512'de kesme ve kayan pencere")
+    parser.add_argument("--model-path", default="model")
+    parser.add_argument("--lengths", default="16,64,128,256,512,1024,2048,4096", help="Token cinsinden metin uzunlukları")
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--window", type=int, default=128)
+    parser.add_argument("--stride", type=int, default=32)
+    parser.add_argument("--token-budget", type=int, default=1024)
+    parser.add_argument("--output", default="reports/long_text.json")
+    args = parser.parse_args()
+
+    lengths = [int(length) for length in args.lengths.split(",")]
+    results = {name: run_mode(name, overrides, args, lengths) for name, overrides in MODES.items()}
+
+    print(f"{'token':>6} | {'kesme p50':>10} {'puanlanan':>10} | {'pencere p50':>12} {'pencere':>8} {'puanlanan':>10}")
+    for truncate, window in zip(results["truncate"], results["window"]):
+        print(f"{truncate['tokens']:>6} | {truncate['latency_ms_p50']:>10.2f} {truncate['scored_tokens']:>10} | "
+              f"{window['latency_ms_p50']:>12.2f} {window['windows']:>8} {window['scored_tokens']:>10}")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump({
+            "timestamp": datetime.now().isoformat(),
+            "model_path": os.path.abspath(args.model_path),
+            "window_tokens": args.window,
+            "stride_tokens": args.stride,
+            "token_budget": args.token_budget,
+            "repeats": args.repeats,
+            "results": results
+        }, f, ensure_ascii=False, indent=2)
+    print(f"\nRapor kaydedildi: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
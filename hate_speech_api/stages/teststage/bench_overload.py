@@ -0,0 +1,129 @@
+import argparse
+import json
+import os
+import re
+import signal
+import threading
+from datetime import datetime
+from urllib.parse import urlparse
+
+import requests
+
+from bench_load import (DEFAULT_HEADERS, corpus_digest, generate_corpus, git_commit, print_row, run_closed_loop,
+                       run_open_loop, start_server, wait_ready)
+
+# Kabul kontrolü kapalı ve açıkken aynı aşırı yük: etkileşimli ve bulk trafik birlikte gönderilir
+MODES = {
+    "admission_off": {"ADMISSION_ENABLED": "0"},
+    "admission_on": {"ADMISSION_ENABLED": "1"},
+}
+
+
+def scrape_admission(url):
+    # Server-side view of the same run: how many requests were admitted, queued or shed, and why
+    try:
+        text = requests.get(f"{url}/api/metrics", timeout=5).text
+    except requests.RequestException:
+        return None
+    pattern = r'^hate_speech_admission_total\{priority="(\w+)",result="(\w+)"\} ([0-9.e+]+)$'
+    return {f"{priority}/{result}": int(float(value))
+            for priority, result, value in re.findall(pattern, text, re.MULTILINE)}
+
+
+def measure_capacity(url, corpus, args):
+    # Closed loop with plenty of clients: the throughput the server sustains when it is never idle
+    result = run_closed_loop(url, corpus, args.capacity_concurrency, args.duration, DEFAULT_HEADERS, args.timeout)
+    return result["throughput_rps"]
+
+
+def run_mixed(url, corpus, rate, args):
+    # Both classes are open loops running at the same time, so they compete for the same workers
+    interactive_headers = dict(DEFAULT_HEADERS, **{"X-Priority": "interactive"})
+    if args.deadline_ms:
+        interactive_headers["X-Request-Deadline-Ms"] = str(args.deadline_ms)
+    bulk_headers = dict(DEFAULT_HEADERS, **{"X-Priority": "bulk"})
+    classes = {
+        "interactive": (rate * args.interactive_share, interactive_headers),
+        "bulk": (rate * (1 - args.interactive_share), bulk_headers),
+    }
+    results = {}
+
+    def run(name, class_rate, headers):
+        results[name] = run_open_loop(url, corpus, class_rate, args.duration, headers, args.timeout,
+                                      seed=args.seed + len(name), request_start=True)
+
+    threads = [threading.Thread(target=run, args=(name, class_rate, headers))
+               for name, (class_rate, headers) in classes.items() if class_rate > 0]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Doygunluğun katları yükte kabul kontrolü ile kuyruk gecikmesi")
+    parser.add_argument("--port", type=int, default=8767)
+    parser.add_argument("--workers", type=int, default=0)
+    parser.add_argument("--corpus-size", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--overload", type=float, default=2.0, help="Doygunluk kapasitesinin katı")
+    parser.add_argument("--capacity-rps", type=float, default=0, help="Ölçmek yerine kullanılacak kapasite")
+    parser.add_argument("--capacity-concurrency", type=int, default=32)
+    parser.add_argument("--interactive-share", type=float, default=0.3, help="Etkileşimli isteklerin oranı")
+    parser.add_argument("--deadline-ms", type=float, default=1000, help="Etkileşimli isteklerin son tarihi; 0: yok")
+    parser.add_argument("--duration", type=float, default=20)
+    parser.add_argument("--warmup", type=float, default=3)
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--modes", default=",".join(MODES))
+    parser.add_argument("--output", default="reports/overload.json")
+    args = parser.parse_args()
+
+    url = f"http://127.0.0.1:{args.port}"
+    corpus = generate_corpus(args.corpus_size, args.seed)
+    capacity = args.capacity_rps or None
+    report = {
+        "timestamp": datetime.now().isoformat(),
+        "commit": git_commit(),
+        "corpus": {"source": f"generated(seed={args.seed})", "size": len(corpus), "sha1": corpus_digest(corpus)},
+        "overload": args.overload,
+        "interactive_share": args.interactive_share,
+        "deadline_ms": args.deadline_ms or None,
+        "duration_s": args.duration,
+        "modes": {}
+    }
+
+    for mode in args.modes.split(","):
+        server = start_server(urlparse(url).port, args.workers, MODES[mode])
+        try:
+            if not wait_ready(url, 120):
+                raise SystemExit(f"Sunucu hazır değil: {url}/api/ready ({mode})")
+            run_closed_loop(url, corpus, 4, args.warmup, DEFAULT_HEADERS, args.timeout)
+            if capacity is None:
+                # Measured once, in the first mode, so every mode gets the same offered load
+                capacity = measure_capacity(url, corpus, args)
+                report["capacity_rps"] = capacity
+                print(f"Kapasite: {capacity:.1f} istek/sn, gönderilen yük: {capacity * args.overload:.1f} istek/sn")
+            results = run_mixed(url, corpus, capacity * args.overload, args)
+            admission = scrape_admission(url)
+        finally:
+            server.send_signal(signal.SIGTERM)
+            server.wait(timeout=60)
+
+        report["modes"][mode] = dict(results, server_admission=admission)
+        print(f"\n{mode}\n{'sınıf':>10} {'istek/sn':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'hata':>7}")
+        for name, result in results.items():
+            print_row(name, result)
+            print(f"{'':>10} hatalar: {result['errors']}")
+        if admission:
+            print(f"{'':>10} sunucu: {admission}")
+
+    report.setdefault("capacity_rps", capacity)
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\nRapor kaydedildi: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
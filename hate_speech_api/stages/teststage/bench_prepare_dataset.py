@@ -0,0 +1,108 @@
+import argparse
+import csv
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+
+TRAINSTAGE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'trainstage'))
+
+WORDS = ["merhaba", "dünya", "insanlar", "nefret", "sevgi", "berbat", "harika", "bugün", "yarın", "herkes",
+         "people", "hate", "love", "terrible", "great", "today", "everyone", "never", "always", "why"]
+
+# Her ölçüm ayrı süreçte: tepe bellek (ru_maxrss) yalnızca o örnekleyiciye ait olur
+STREAMING = r'''
+import resource, sys, time
+sys.path.insert(0, {trainstage!r})
+sys.argv = ["prepare_dataset.py", "--input", {input!r}, "--output", {output!r}, "--per-class", {per_class!r},
+            "--val-fraction", "0.2"]
+import prepare_dataset
+start = time.perf_counter()
+prepare_dataset.main()
+print("RESULT", time.perf_counter() - start, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+'''
+
+# Önceki sürüm: tüm CSV pandas'a okunur, sınıflar maskeyle örneklenir, döngüde pd.concat
+LEGACY = r'''
+import resource, time
+import pandas as pd
+start = time.perf_counter()
+df = pd.read_csv({input!r})
+df_sampled = pd.DataFrame()
+for label in df['Label'].unique():
+    temp_df = df[df['Label'] == label].sample(n={per_class}, random_state=42)
+    df_sampled = pd.concat([df_sampled, temp_df])
+df_sampled = df_sampled.sample(frac=1, random_state=42).reset_index(drop=True)
+df_sampled.to_csv({output!r}, index=False)
+print("RESULT", time.perf_counter() - start, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+'''
+
+
+def generate_csv(path, size_bytes, seed):
+    rng = random.Random(seed)
+    written = 0
+    rows = 0
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Content", "Label"])
+        while written < size_bytes:
+            batch = []
+            for _ in range(10000):
+                text = " ".join(rng.choice(WORDS) for _ in range(int(rng.lognormvariate(2.5, 0.8)) + 1))
+                # Imbalanced on purpose: about 30% of rows are class 1
+                batch.append((text, 1 if rng.random() < 0.3 else 0))
+            writer.writerows(batch)
+            rows += len(batch)
+            written = f.tell()
+    return rows
+
+
+def run(code):
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    if output.returncode != 0:
+        return {"error": output.stderr.strip().splitlines()[-1] if output.stderr else f"exit {output.returncode}"}
+    _, seconds, max_rss_kb = output.stdout.strip().splitlines()[-1].split()
+    return {"seconds": round(float(seconds), 1), "peak_rss_mb": round(int(max_rss_kb) / 1024, 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Akışlı örnekleyici ile eski pandas örnekleyicisinin bellek/süre karşılaştırması")
+    parser.add_argument("--sizes-mb", default="512,2048", help="Sentetik CSV boyutları (MB)")
+    parser.add_argument("--per-class", type=int, default=5000)
+    parser.add_argument("--legacy", action="store_true", help="Eski sürümü de ölç (tüm dosyayı belleğe alır)")
+    parser.add_argument("--workdir", help="Sentetik dosyaların yazılacağı klasör (varsayılan: geçici)")
+    parser.add_argument("--output", default="reports/prepare_dataset.json")
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory(dir=args.workdir) as workdir:
+        for size_mb in (int(size) for size in args.sizes_mb.split(",")):
+            input_path = os.path.join(workdir, f"synthetic_{size_mb}mb.csv")
+            print(f"\n{size_mb} MB sentetik CSV oluşturuluyor...")
+            rows = generate_csv(input_path, size_mb * 1024 * 1024, seed=size_mb)
+            result = {"size_mb": size_mb, "rows": rows}
+            result["streaming"] = run(STREAMING.format(
+                trainstage=TRAINSTAGE_DIR, input=input_path, output=os.path.join(workdir, "streaming.csv"),
+                per_class=str(args.per_class)
+            ))
+            print(f"  akışlı : {result['streaming']}")
+            if args.legacy:
+                result["legacy"] = run(LEGACY.format(
+                    input=input_path, output=os.path.join(workdir, "legacy.csv"), per_class=args.per_class
+                ))
+                print(f"  eski   : {result['legacy']}")
+            results.append(result)
+            os.remove(input_path)
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump({"timestamp": datetime.now().isoformat(), "per_class": args.per_class, "results": results},
+                  f, ensure_ascii=False, indent=2)
+    print(f"\nRapor kaydedildi: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
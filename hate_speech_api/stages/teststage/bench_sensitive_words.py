@@ -0,0 +1,92 @@
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'app')))
+
+from sensitive_words import SensitiveWordMatcher
+
+ALPHABET = "abcdefghjklmnoprstuvyzçğöşü"
+
+
+def legacy_find(text, categories):
+    # Eski ModelHandler._find_sensitive_words döngüsü
+    sensitive_words = []
+    text_lower = text.lower()
+    for category, words in categories.items():
+        for word in words:
+            if word in text_lower:
+                sensitive_words.append(word)
+    return sensitive_words
+
+
+def make_lexicon(size, rng):
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choice(ALPHABET) for _ in range(rng.randint(4, 12))))
+    words = sorted(words)
+    categories = {}
+    for index, word in enumerate(words):
+        categories.setdefault(f"kategori_{index % 8}", []).append(word)
+    return categories, words
+
+
+def make_texts(count, words, rng):
+    texts = []
+    for _ in range(count):
+        tokens = []
+        for _ in range(rng.randint(5, 60)):
+            if rng.random() < 0.05:
+                tokens.append(rng.choice(words))
+            else:
+                tokens.append("".join(rng.choice(ALPHABET) for _ in range(rng.randint(2, 9))))
+        texts.append(" ".join(tokens))
+    return texts
+
+
+def bench(func, texts, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in texts:
+            func(text)
+        best = min(best, time.perf_counter() - start)
+    return best / len(texts) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Aho-Corasick ve eski döngü karşılaştırması")
+    parser.add_argument("--sizes", default="150,1000,10000,50000")
+    parser.add_argument("--texts", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    print(f"{'sözlük':>8} {'derleme (ms)':>13} {'eski (µs/metin)':>16} {'otomat (µs/metin)':>18} {'hızlanma':>9}")
+    for size in (int(value) for value in args.sizes.split(",")):
+        categories, words = make_lexicon(size, rng)
+        texts = make_texts(args.texts, words, rng)
+
+        start = time.perf_counter()
+        matcher = SensitiveWordMatcher(
+            (word, category, False) for category, category_words in categories.items() for word in category_words
+        )
+        build_ms = (time.perf_counter() - start) * 1000
+
+        # Alt dize modunda sonuçlar eski döngüyle aynı kelime kümesini vermeli
+        for text in texts:
+            expected = set(legacy_find(text, categories))
+            actual = {word for word, _ in matcher.find_words(text)}
+            if expected != actual:
+                raise SystemExit(f"Eşleşme farkı bulundu: {sorted(expected ^ actual)}")
+
+        legacy_us = bench(lambda text: legacy_find(text, categories), texts, args.repeat)
+        matcher_us = bench(matcher.find_words, texts, args.repeat)
+        print(f"{size:>8} {build_ms:>13.1f} {legacy_us:>16.1f} {matcher_us:>18.1f} {legacy_us / matcher_us:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+from datetime import datetime
+
+APP_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'app'))
+
+# Aynı anda gelen özdeş istek dalgası; her yapılandırma temiz bir süreçte ölçülür
+CONFIGS = {
+    "direct": {"SINGLE_FLIGHT_ENABLED": "0", "MICRO_BATCH_ENABLED": "0"},
+    "direct+single-flight": {"SINGLE_FLIGHT_ENABLED": "1", "MICRO_BATCH_ENABLED": "0"},
+    "micro-batch": {"SINGLE_FLIGHT_ENABLED": "0", "MICRO_BATCH_ENABLED": "1"},
+    "micro-batch+single-flight": {"SINGLE_FLIGHT_ENABLED": "1", "MICRO_BATCH_ENABLED": "1"},
+}
+
+CHILD = r'''
+import json, sys, threading, time
+sys.path.insert(0, {app_dir!r})
+import app as api
+import metrics
+
+def forward_passes():
+    counts, _ = metrics.STAGE_SECONDS.labels("forward").value()
+    return sum(counts)
+
+def coalesced():
+    return sum(metrics.COALESCED.labels(scope).value() for scope in ("in_flight", "batch"))
+
+def burst(texts):
+    barrier = threading.Barrier(len(texts))
+    latencies = [0.0] * len(texts)
+    def send(index):
+        client = api.app.test_client()
+        barrier.wait()
+        start = time.perf_counter()
+        response = client.post("/api/check-hate-speech", json={{"text": texts[index]}})
+        latencies[index] = time.perf_counter() - start
+        assert response.status_code == 200, response.data
+    threads = [threading.Thread(target=send, args=(index,)) for index in range(len(texts))]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start, latencies
+
+# Warmup burst, then measured bursts; every burst uses new texts so the result cache cannot answer
+burst(["ısınma %d" % (i % {distinct}) for i in range({burst_size})])
+passes_before, coalesced_before = forward_passes(), coalesced()
+walls, latencies = [], []
+for round_index in range({bursts}):
+    texts = ["Bu paylaşım viral oldu! tur %d metin %d" % (round_index, i % {distinct}) for i in range({burst_size})]
+    wall, burst_latencies = burst(texts)
+    walls.append(wall)
+    latencies.extend(burst_latencies)
+latencies.sort()
+requests = len(latencies)
+print(json.dumps({{
+    "requests": requests,
+    "forward_passes": forward_passes() - passes_before,
+    "coalesced": coalesced() - coalesced_before,
+    "burst_ms_mean": round(sum(walls) / len(walls) * 1000, 2),
+    "latency_ms_p50": round(latencies[requests // 2] * 1000, 2),
+    "latency_ms_p99": round(latencies[min(requests - 1, int(requests * 0.99))] * 1000, 2),
+    "rps": round(requests / sum(walls), 1)
+}}))
+'''
+
+
+def run_config(name, overrides, args):
+    env = dict(
+        os.environ,
+        MODEL_PATH=os.path.abspath(args.model_path),
+        LOG_TO_STDOUT="0",
+        LOG_FILE="",
+        MODEL_WATCH_SECONDS="0",
+        **overrides
+    )
+    code = CHILD.format(app_dir=APP_DIR, burst_size=args.burst_size, bursts=args.bursts, distinct=args.distinct)
+    output = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True)
+    if output.returncode != 0:
+        raise SystemExit(f"{name} başarısız:\n{output.stderr}")
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Özdeş istek dalgasında single-flight birleştirmenin etkisi")
+    parser.add_argument("--model-path", default="model")
+    parser.add_argument("--burst-size", type=int, default=64, help="Aynı anda gönderilen istek sayısı")
+    parser.add_argument("--bursts", type=int, default=20)
+    parser.add_argument("--distinct", type=int, default=1, help="Dalga başına farklı metin sayısı")
+    parser.add_argument("--configs", default=",".join(CONFIGS))
+    parser.add_argument("--output", default="reports/single_flight.json")
+    args = parser.parse_args()
+
+    results = {}
+    print(f"{'yapılandırma':>26} {'forward':>8} {'birleşen':>9} {'dalga ms':>9} {'p50 ms':>8} {'p99 ms':>8} {'istek/sn':>9}")
+    for name in args.configs.split(","):
+        result = run_config(name, CONFIGS[name], args)
+        results[name] = result
+        print(f"{name:>26} {result['forward_passes']:>8} {result['coalesced']:>9.0f} {result['burst_ms_mean']:>9.2f} "
+              f"{result['latency_ms_p50']:>8.2f} {result['latency_ms_p99']:>8.2f} {result['rps']:>9.1f}")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump({
+            "timestamp": datetime.now().isoformat(),
+            "burst_size": args.burst_size,
+            "bursts": args.bursts,
+            "distinct": args.distinct,
+            "configs": {name: CONFIGS[name] for name in results},
+            "results": results
+        }, f, ensure_ascii=False, indent=2)
+    print(f"\nRapor kaydedildi: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+from datetime import datetime
+
+APP_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'app'))
+
+# Her ölçüm temiz bir yorumlayıcıda çalışır, import önbellekleri paylaşılmaz
+CHILD = r'''
+import json, sys, time
+start = time.perf_counter()
+sys.path.insert(0, {app_dir!r})
+import model_handler
+module_import_s = time.perf_counter() - start
+heavy_at_import = sorted(name for name in ("torch", "transformers", "sklearn") if name in sys.modules)
+
+start = time.perf_counter()
+handler = model_handler.ModelHandler(model_path={model_path!r}, backend={backend!r})
+load_s = time.perf_counter() - start
+
+handler.warmup()
+
+start = time.perf_counter()
+handler.analyze_text("Bugün hava çok güzel, herkese iyi günler!")
+first_request_ms = (time.perf_counter() - start) * 1000
+
+print(json.dumps({{
+    "module_import_s": round(module_import_s, 3),
+    "heavy_modules_at_import": heavy_at_import,
+    "load_s": round(load_s, 3),
+    "breakdown": handler.startup_timings,
+    "first_request_ms": round(first_request_ms, 2),
+    "sklearn_imported": "sklearn" in sys.modules,
+    "total_s": round(module_import_s + load_s + handler.startup_timings.get("warmup_s", 0), 3)
+}}))
+'''
+
+
+def run_once(model_path, backend, warmup):
+    env = dict(os.environ, WARMUP_ENABLED="1" if warmup else "0", RESULT_CACHE_ENABLED="0")
+    code = CHILD.format(app_dir=APP_DIR, model_path=model_path, backend=backend)
+    output = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True)
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Başlangıç süresi ölçümü: import, yükleme ve warmup")
+    parser.add_argument("--model-path", default="model")
+    parser.add_argument("--backend", default="torch")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--output", default="reports/startup.json")
+    args = parser.parse_args()
+
+    model_path = os.path.abspath(args.model_path)
+    report = {"timestamp": datetime.now().isoformat(), "model_path": model_path, "backend": args.backend}
+    for warmup in (True, False):
+        runs = [run_once(model_path, args.backend, warmup) for _ in range(args.runs)]
+        # Medyan çalıştırma raporlanır
+        runs.sort(key=lambda run: run["total_s"])
+        median = runs[len(runs) // 2]
+        report["warmup" if warmup else "no_warmup"] = median
+
+        breakdown = median["breakdown"]
+        print(f"\nWarmup {'açık' if warmup else 'kapalı'} (medyan / {args.runs} çalıştırma):")
+        print(f"  modül importu          : {median['module_import_s']:.3f} sn "
+              f"(ağır modüller: {', '.join(median['heavy_modules_at_import']) or 'yok'})")
+        print(f"  transformers importu   : {breakdown.get('import_s', 0):.3f} sn")
+        print(f"  tokenizer              : {breakdown.get('tokenizer_s', 0):.3f} sn")
+        print(f"  ağırlıklar             : {breakdown.get('weights_s', 0):.3f} sn")
+        print(f"  etiket haritası        : {breakdown.get('labels_s', 0):.3f} sn "
+              f"(sklearn yüklendi: {'evet' if median['sklearn_imported'] else 'hayır'})")
+        print(f"  warmup                 : {breakdown.get('warmup_s', 0):.3f} sn")
+        print(f"  ilk istek              : {median['first_request_ms']:.1f} ms")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\nRapor kaydedildi: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
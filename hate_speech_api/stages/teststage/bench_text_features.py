@@ -0,0 +1,106 @@
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'app')))
+
+from text_features import extract_features, extract_features_batch, text_metrics
+
+# Eski ModelHandler._get_detailed_analysis / _calculate_additional_metrics hesapları
+LEGACY_EMOJI_PATTERN = re.compile("["
+    u"\U0001F600-\U0001F64F"  # emojis
+    u"\U0001F300-\U0001F5FF"  # symbols & pictographs
+    u"\U0001F680-\U0001F6FF"  # transport & map symbols
+    u"\U0001F1E0-\U0001F1FF"  # flags (iOS)
+    u"\U00002702-\U000027B0"
+    u"\U000024C2-\U0001F251"
+    "]+", flags=re.UNICODE)
+
+
+def legacy_metrics(text):
+    emoji_count = int(len(LEGACY_EMOJI_PATTERN.findall(text)))
+    text_length = int(len(text))
+    word_count = int(len(text.split()))
+    words = text.split()
+    avg_word_length = float(sum(len(word) for word in words) / len(words) if words else 0)
+    punctuation_count = int(sum(1 for char in text if char in '.,!?;:'))
+    capital_ratio = float(sum(1 for char in text if char.isupper()) / len(text) if text else 0)
+    return {
+        "emoji_count": emoji_count,
+        "text_length": text_length,
+        "metrics": {
+            "word_count": word_count,
+            "average_word_length": round(avg_word_length, 2),
+            "punctuation_count": punctuation_count,
+            "capitalization_ratio": round(capital_ratio, 2)
+        }
+    }
+
+
+def fused_metrics(features):
+    return {
+        "emoji_count": features["emoji_count"],
+        "text_length": features["text_length"],
+        "metrics": text_metrics(features)
+    }
+
+
+FRAGMENTS = [
+    "I want to kill you", "Bugün hava çok güzel!", "İSTANBUL ılık", "ÇOK KÖTÜ; değil mi?",
+    "😀😀 🎉", "✂️ ✈", "漢字テキスト", "a b c", "tab\tnew\nline\r\n", "\x1cx\x1fy",
+    "...!!!???", "Ⓜ️ 🇹🇷", "", " ", "ÀÉÎ ñ ß ẞ", "x" * 50, "\ud800 lone surrogate",
+]
+
+
+def make_corpus(count, rng):
+    corpus = list(FRAGMENTS)
+    while len(corpus) < count:
+        parts = rng.sample(FRAGMENTS, rng.randint(1, 6))
+        corpus.append(rng.choice([" ", "", "  ", "\n"]).join(parts))
+    return corpus
+
+
+def bench(func, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    # Parite (tekil/toplu = eski hesaplar) test_text_features.py'de pytest ile kontrol edilir
+    parser = argparse.ArgumentParser(description="Metin özellik çıkarıcı mikro benchmark")
+    parser.add_argument("--texts", type=int, default=5000)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    corpus = make_corpus(args.texts, random.Random(args.seed))
+
+    def run_legacy():
+        for text in corpus:
+            legacy_metrics(text)
+
+    def run_single():
+        for text in corpus:
+            fused_metrics(extract_features(text))
+
+    def run_batch():
+        for start in range(0, len(corpus), args.batch_size):
+            for features in extract_features_batch(corpus[start:start + args.batch_size]):
+                fused_metrics(features)
+
+    baseline = bench(run_legacy, args.repeat)
+    for name, func in (("eski", run_legacy), ("tekil", run_single), (f"toplu ({args.batch_size})", run_batch)):
+        elapsed = bench(func, args.repeat)
+        print(f"{name:>12}: {elapsed / len(corpus) * 1e6:8.2f} µs/metin  ({baseline / elapsed:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+import argparse
+import json
+import multiprocessing
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime
+
+import requests
+
+API_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+SAMPLE_TEXTS = [
+    "Bugün hava çok güzel, herkese iyi günler!",
+    "I want to kill you",
+    "Bu paylaşım için teşekkürler, çok faydalı oldu.",
+    "You people are the worst, go back to where you came from",
+    "Yarın akşam konsere kim geliyor? 🎉",
+]
+
+
+def memory_kb(pid):
+    # Rss counts shared pages in full, Pss divides them between the processes sharing them
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if parts[0] in ("Rss:", "Pss:", "Shared_Clean:", "Private_Dirty:"):
+                values[parts[0][:-1]] = int(parts[1])
+    return values
+
+
+def worker_pids(master_pid):
+    with open(f"/proc/{master_pid}/task/{master_pid}/children") as f:
+        return [int(pid) for pid in f.read().split()]
+
+
+def wait_ready(url, timeout):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if requests.get(f"{url}/api/health", timeout=1).status_code == 200:
+                return True
+        except requests.RequestException:
+            pass
+        time.sleep(0.5)
+    return False
+
+
+def drive_load(url, concurrency, duration):
+    stop_at = time.time() + duration
+    counts = {"ok": 0, "error": 0}
+    lock = threading.Lock()
+
+    def client(index):
+        session = requests.Session()
+        position = index
+        while time.time() < stop_at:
+            text = f"{SAMPLE_TEXTS[position % len(SAMPLE_TEXTS)]} #{position}"
+            position += concurrency
+            try:
+                ok = session.post(f"{url}/api/check-hate-speech", json={"text": text}, timeout=30).status_code == 200
+            except requests.RequestException:
+                ok = False
+            with lock:
+                counts["ok" if ok else "error"] += 1
+
+    threads = [threading.Thread(target=client, args=(index,)) for index in range(concurrency)]
+    start = time.time()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.time() - start
+    return counts["ok"] / elapsed, counts["error"]
+
+
+def bench_workers(workers, args):
+    port = args.port
+    url = f"http://127.0.0.1:{port}"
+    env = dict(os.environ, SERVE_WORKERS=str(workers), PORT=str(port))
+    # Önbellek tekrar eden metinleri ölçümden saklamasın
+    env.setdefault("RESULT_CACHE_ENABLED", "0")
+    server = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "app:app"],
+        cwd=API_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        if not wait_ready(url, args.startup_timeout):
+            raise SystemExit(f"Sunucu {args.startup_timeout} sn içinde hazır olmadı ({workers} worker)")
+        drive_load(url, workers, 2)  # warmup
+        throughput, errors = drive_load(url, workers * args.clients_per_worker, args.duration)
+        master_memory = memory_kb(server.pid)
+        memories = [memory_kb(pid) for pid in worker_pids(server.pid)]
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=60)
+
+    return {
+        "workers": workers,
+        "throughput_rps": round(throughput, 1),
+        "errors": errors,
+        "master_rss_mb": round(master_memory["Rss"] / 1024, 1),
+        "worker_rss_mb": [round(memory["Rss"] / 1024, 1) for memory in memories],
+        "worker_pss_mb": [round(memory["Pss"] / 1024, 1) for memory in memories],
+        "worker_private_dirty_mb": [round(memory["Private_Dirty"] / 1024, 1) for memory in memories],
+        "total_pss_mb": round((master_memory["Pss"] + sum(memory["Pss"] for memory in memories)) / 1024, 1)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="gunicorn worker sayısına göre bellek ve throughput ölçümü")
+    parser.add_argument("--max-workers", type=int, default=multiprocessing.cpu_count())
+    parser.add_argument("--clients-per-worker", type=int, default=4)
+    parser.add_argument("--duration", type=float, default=20)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--startup-timeout", type=float, default=120)
+    parser.add_argument("--output", default="reports/worker_scaling.json")
+    args = parser.parse_args()
+
+    results = []
+    print(f"{'worker':>6} {'istek/sn':>9} {'ölçek':>6} {'worker RSS (MB)':>16} {'worker PSS (MB)':>16} {'toplam PSS':>11}")
+    for workers in range(1, args.max_workers + 1):
+        result = bench_workers(workers, args)
+        results.append(result)
+        scaling = result["throughput_rps"] / results[0]["throughput_rps"] if results[0]["throughput_rps"] else 0
+        result["scaling"] = round(scaling, 2)
+        average_rss = sum(result["worker_rss_mb"]) / workers
+        average_pss = sum(result["worker_pss_mb"]) / workers
+        print(f"{workers:>6} {result['throughput_rps']:>9.1f} {scaling:>5.2f}x {average_rss:>16.1f} "
+              f"{average_pss:>16.1f} {result['total_pss_mb']:>11.1f}")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump({
+            "timestamp": datetime.now().isoformat(),
+            "cpu_count": multiprocessing.cpu_count(),
+            "results": results
+        }, f, ensure_ascii=False, indent=2)
+    print(f"\nRapor kaydedildi: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+import argparse
+import csv
+import io
+import json
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+
+APP_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'app'))
+
+# Her worker sürecinde bir kez yüklenen model
+_handler = None
+
+
+def init_worker(model_path, backend, threads, batch_size):
+    # Runs once per worker process: one model per process, threads split between workers
+    global _handler
+    os.environ["INFERENCE_THREADS"] = str(threads)
+    os.environ["MODEL_BATCH_SIZE"] = str(batch_size)
+    os.environ["RESULT_CACHE_ENABLED"] = "0"
+    os.environ["WARMUP_ENABLED"] = "0"
+    sys.path.insert(0, APP_DIR)
+    from model_handler import ModelHandler
+
+    _handler = ModelHandler(model_path=model_path, backend=backend)
+
+
+def classify_chunk(chunk_index, rows):
+    import numpy as np
+
+    texts = [text for _, text in rows]
+    probabilities = _handler.predict_proba(texts)
+    predicted = np.argmax(probabilities, axis=1)
+    results = []
+    for (row_id, _), row_probabilities, class_index in zip(rows, probabilities, predicted):
+        results.append([row_id, _handler.label_for(int(class_index)), round(float(row_probabilities[class_index]), 6)]
+                       + [round(float(p), 6) for p in row_probabilities])
+    return chunk_index, results
+
+
+def read_chunks(path, text_column, id_column, chunk_rows, skip_rows):
+    csv.field_size_limit(sys.maxsize)
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        if text_column not in reader.fieldnames:
+            raise SystemExit(f"Metin sütunu bulunamadı: {text_column} (sütunlar: {', '.join(reader.fieldnames)})")
+        chunk = []
+        for row_number, row in enumerate(reader):
+            # Rows already written before the checkpoint are only parsed, not classified
+            if row_number < skip_rows:
+                continue
+            row_id = row[id_column] if id_column else row_number
+            chunk.append((row_id, row[text_column] or ""))
+            if len(chunk) >= chunk_rows:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+
+def encode_rows(rows):
+    # Binary output so that the checkpoint can record exact byte offsets
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue().encode("utf-8")
+
+
+def input_signature(path):
+    stat = os.stat(path)
+    return {"path": os.path.abspath(path), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def load_checkpoint(path, signature):
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        checkpoint = json.load(f)
+    if checkpoint.get("input") != signature:
+        raise SystemExit(f"Kontrol noktası başka bir girdiye ait: {path} (silin veya --restart kullanın)")
+    return checkpoint
+
+
+def save_checkpoint(path, checkpoint):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(checkpoint, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def label_names(model_path):
+    sys.path.insert(0, APP_DIR)
+    from label_map import load_labels
+
+    return list(load_labels(model_path) or ["nefret_söylemi_değil", "nefret_söylemi"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Büyük CSV dosyaları için paralel, kaldığı yerden devam eden toplu sınıflandırma")
+    parser.add_argument("input", help="Girdi CSV dosyası (ör. dataset/HateSpeechDatasetBalanced.csv)")
+    parser.add_argument("--output", help="Sonuç CSV dosyası (varsayılan: <girdi>.predictions.csv)")
+    parser.add_argument("--model-path", default="model")
+    parser.add_argument("--backend", default="torch")
+    parser.add_argument("--text-column", default="Content")
+    parser.add_argument("--id-column", help="Kimlik sütunu (varsayılan: satır numarası)")
+    parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count())
+    parser.add_argument("--threads-per-worker", type=int, default=0, help="0: çekirdekler / worker")
+    parser.add_argument("--chunk-rows", type=int, default=1024, help="Worker'a gönderilen satır sayısı")
+    parser.add_argument("--batch-size", type=int, default=32, help="Forward pass başına metin")
+    parser.add_argument("--restart", action="store_true", help="Kontrol noktasını yok sayıp baştan başla")
+    args = parser.parse_args()
+
+    output_path = args.output or f"{os.path.splitext(args.input)[0]}.predictions.csv"
+    checkpoint_path = f"{output_path}.checkpoint.json"
+    model_path = os.path.abspath(args.model_path)
+    signature = input_signature(args.input)
+    labels = label_names(model_path)
+
+    checkpoint = None if args.restart else load_checkpoint(checkpoint_path, signature)
+    if checkpoint is None:
+        checkpoint = {"input": signature, "rows_done": 0, "output_bytes": 0, "completed": False}
+        output = open(output_path, "wb")
+        output.write(encode_rows([["id", "category", "confidence"] + [f"prob_{label}" for label in labels]]))
+        output.flush()
+        checkpoint["output_bytes"] = output.tell()
+        save_checkpoint(checkpoint_path, checkpoint)
+    else:
+        if checkpoint["completed"]:
+            print(f"Bu girdi zaten tamamlandı: {output_path}")
+            return
+        # Drop anything written after the last checkpoint (e.g. a chunk cut off by a kill)
+        output = open(output_path, "r+b")
+        output.truncate(checkpoint["output_bytes"])
+        output.seek(0, os.SEEK_END)
+        print(f"Kaldığı yerden devam ediliyor: {checkpoint['rows_done']} satır tamamlanmış")
+
+    workers = max(1, args.workers)
+    threads = args.threads_per_worker or max(1, multiprocessing.cpu_count() // workers)
+    # Bounded number of chunks in flight keeps memory flat regardless of input size
+    max_in_flight = workers * 2
+    slots = threading.BoundedSemaphore(max_in_flight)
+    finished = {}
+    finished_lock = threading.Condition()
+
+    def on_done(future):
+        # A worker that dies (OOM, segfault) fails its futures with BrokenProcessPool instead of
+        # leaving them pending forever, so the writer below always wakes up
+        if future.cancelled():
+            return
+        with finished_lock:
+            error = future.exception()
+            if error is not None:
+                finished["error"] = error
+            else:
+                chunk_index, results = future.result()
+                finished[chunk_index] = results
+            finished_lock.notify()
+
+    context = multiprocessing.get_context("spawn")
+    start = time.perf_counter()
+    rows_at_start = checkpoint["rows_done"]
+    next_to_write = 0
+    last_report = start
+
+    def write_ready(block):
+        # Write finished chunks strictly in input order, then move the checkpoint
+        nonlocal next_to_write, last_report
+        with finished_lock:
+            while block and next_to_write not in finished and "error" not in finished:
+                finished_lock.wait()
+            if "error" in finished:
+                raise finished["error"]
+            ready = []
+            while next_to_write in finished:
+                ready.append(finished.pop(next_to_write))
+                next_to_write += 1
+        for results in ready:
+            output.write(encode_rows(results))
+            output.flush()
+            os.fsync(output.fileno())
+            checkpoint["rows_done"] += len(results)
+            checkpoint["output_bytes"] = output.tell()
+            save_checkpoint(checkpoint_path, checkpoint)
+            slots.release()
+        now = time.perf_counter()
+        if ready and now - last_report >= 5:
+            last_report = now
+            rate = (checkpoint["rows_done"] - rows_at_start) / (now - start)
+            print(f"{checkpoint['rows_done']} satır, {rate:.1f} satır/sn")
+        return len(ready)
+
+    submitted = 0
+    pool = ProcessPoolExecutor(workers, mp_context=context, initializer=init_worker,
+                               initargs=(model_path, args.backend, threads, args.batch_size))
+    try:
+        for chunk in read_chunks(args.input, args.text_column, args.id_column, args.chunk_rows,
+                                 checkpoint["rows_done"]):
+            while not slots.acquire(timeout=0.1):
+                write_ready(block=False)
+            pool.submit(classify_chunk, submitted, chunk).add_done_callback(on_done)
+            submitted += 1
+            write_ready(block=False)
+        while next_to_write < submitted:
+            write_ready(block=True)
+    except BrokenProcessPool as e:
+        # Chunks written so far are in the checkpoint; running the same command again resumes from there
+        pool.shutdown(wait=False, cancel_futures=True)
+        output.close()
+        print(f"Bir worker süreci beklenmedik şekilde sonlandı ({e}); {checkpoint['rows_done']} satır kaydedildi, "
+              f"aynı komutla kaldığı yerden devam edilebilir: {checkpoint_path}")
+        raise SystemExit(1)
+    except BaseException:
+        pool.shutdown(wait=False, cancel_futures=True)
+        output.close()
+        raise
+    pool.shutdown()
+
+    output.close()
+    checkpoint["completed"] = True
+    save_checkpoint(checkpoint_path, checkpoint)
+    elapsed = time.perf_counter() - start
+    processed = checkpoint["rows_done"] - rows_at_start
+    print(f"\nTamamlandı: {processed} satır {elapsed:.1f} sn içinde ({processed / elapsed:.1f} satır/sn, "
+          f"{workers} worker x {threads} iş parçacığı)")
+    print(f"Sonuçlar: {output_path}")
+    print(f"Kontrol noktası: {checkpoint_path} ({datetime.now().isoformat()})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+from compare_backends import APP_DIR, load_heldout, percentile
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Kaskad: belirsizlik aralığına göre transformer'a yükseltme oranı ve doğruluk")
+    parser.add_argument("--model-path", default="model", help="Transformer ve fast_classifier.npz klasörü")
+    parser.add_argument("--classifier-path", help="Hızlı sınıflandırıcı (varsayılan: <model>/fast_classifier.npz)")
+    parser.add_argument("--data", required=True, help="Validasyon CSV dosyası")
+    parser.add_argument("--text-column", default="Content")
+    parser.add_argument("--label-column", default="Label")
+    parser.add_argument("--limit", type=int, default=0)
+    parser.add_argument("--bands", default="0.5:0.5,0.4:0.6,0.3:0.7,0.2:0.8,0.1:0.9,0.05:0.95,0:1",
+                        help="low:high çiftleri; aralık içindeki metinler transformer'a gider")
+    parser.add_argument("--latency-samples", type=int, default=200)
+    parser.add_argument("--min-lexicon-precision", type=float, default=0.98,
+                        help="CASCADE_LEXICON önerilmeden önce sözlük aşamasının ulaşması gereken kesinlik")
+    parser.add_argument("--output", default="reports/cascade.json")
+    args = parser.parse_args()
+
+    sys.path.insert(0, APP_DIR)
+    os.environ["RESULT_CACHE_ENABLED"] = "0"
+    os.environ["WARMUP_ENABLED"] = "0"
+    os.environ["CASCADE_ENABLED"] = "0"
+    import numpy as np
+    from cascade import FAST_CLASSIFIER_FILE, FastClassifier, hate_class_index
+    from model_handler import ModelHandler
+
+    texts, labels = load_heldout(args.data, args.limit, args.text_column, args.label_column)
+    print(f"{len(texts)} örnek yüklendi: {args.data}")
+    handler = ModelHandler(model_path=os.path.abspath(args.model_path))
+    classes = handler.get_categories()
+    classifier = FastClassifier(args.classifier_path or os.path.join(args.model_path, FAST_CLASSIFIER_FILE))
+    hate_index = hate_class_index(classes)
+    labels = np.asarray([classes.index(label) for label in labels])
+
+    # Every stage is scored once for every text; each band is then only a different routing of these scores
+    transformer = np.argmax(handler.predict_proba(texts), axis=1)
+    banned = [handler.sensitive_words.find_banned(text) for text in texts]
+    fast_probabilities = np.stack([classifier.predict_proba(text, hits) for text, hits in zip(texts, banned)])
+    fast = np.argmax(fast_probabilities, axis=1)
+    hate_probability = fast_probabilities[:, hate_index]
+    # The lexicon stage decides on whole-word banned-list hits; any-match (category terms, substrings) for comparison
+    lexicon_hit = np.asarray([bool(hits) for hits in banned])
+    any_match = np.asarray([bool(handler.sensitive_words.find_all(text)) for text in texts])
+    is_hate = labels == hate_index
+
+    def precision(hit):
+        return round(float(is_hate[hit].mean()), 4) if hit.any() else None
+
+    lexicon_precision = precision(lexicon_hit)
+
+    # Per-text cost of each stage at batch size 1, as a single request pays it
+    sample = texts[:args.latency_samples]
+    handler.predict_proba(sample[:1])
+    stage_ms = {"transformer": [], "fast": [], "lexicon": []}
+    for text in sample:
+        start = time.perf_counter()
+        hits = handler.sensitive_words.find_banned(text)
+        lexicon_end = time.perf_counter()
+        classifier.predict_proba(text, hits)
+        fast_end = time.perf_counter()
+        handler.predict_proba([text])
+        stage_ms["lexicon"].append((lexicon_end - start) * 1000)
+        stage_ms["fast"].append((fast_end - lexicon_end) * 1000)
+        stage_ms["transformer"].append((time.perf_counter() - fast_end) * 1000)
+    latency = {stage: round(percentile(values, 50), 4) for stage, values in stage_ms.items()}
+
+    transformer_accuracy = float((transformer == labels).mean())
+    report = {
+        "timestamp": datetime.now().isoformat(),
+        "model_path": os.path.abspath(args.model_path),
+        "data": os.path.abspath(args.data),
+        "samples": len(texts),
+        "transformer_accuracy": round(transformer_accuracy, 4),
+        "fast_accuracy": round(float((fast == labels).mean()), 4),
+        "lexicon_hit_rate": round(float(lexicon_hit.mean()), 4),
+        "lexicon_precision": lexicon_precision,
+        "lexicon_recall": round(float(lexicon_hit[is_hate].mean()), 4) if is_hate.any() else None,
+        "any_match_hit_rate": round(float(any_match.mean()), 4),
+        "any_match_precision": precision(any_match),
+        "classifier_lexicon_features": classifier.lexicon_features,
+        "lexicon_recommended": lexicon_precision is not None and lexicon_precision >= args.min_lexicon_precision,
+        "stage_latency_p50_ms": latency,
+        "bands": []
+    }
+    print(f"\nTransformer doğruluğu: {transformer_accuracy:.4f}, hızlı sınıflandırıcı: {report['fast_accuracy']:.4f}, "
+          f"sözlük eşleşmesi: {report['lexicon_hit_rate']:.2%}")
+    print(f"Sözlük aşaması kesinliği: {lexicon_precision} (tüm eşleşmeler: {report['any_match_precision']}); "
+          f"CASCADE_LEXICON {'önerilir' if report['lexicon_recommended'] else 'kapalı kalmalı'} "
+          f"(eşik {args.min_lexicon_precision})")
+    print(f"{'sözlük':>7} {'aralık':>11} {'yükseltme':>10} {'doğruluk':>9} {'uyum':>7} {'ort. ms':>8}")
+    for use_lexicon in (True, False):
+        for band in args.bands.split(","):
+            low, high = (float(value) for value in band.split(":"))
+            by_lexicon = lexicon_hit if use_lexicon else np.zeros(len(texts), dtype=bool)
+            escalated = ~by_lexicon & (hate_probability >= low) & (hate_probability <= high)
+            predictions = np.where(escalated, transformer, fast)
+            predictions = np.where(by_lexicon, hate_index, predictions)
+            accuracy = float((predictions == labels).mean())
+            # Expected cost per request: first stage always, transformer only when escalated
+            mean_ms = (latency["lexicon"] if use_lexicon else 0.0) + latency["fast"] * float((~by_lexicon).mean()) \
+                + latency["transformer"] * float(escalated.mean())
+            row = {
+                "lexicon": use_lexicon,
+                "low": low,
+                "high": high,
+                "decided_by": {
+                    "lexicon": round(float(by_lexicon.mean()), 4),
+                    "fast": round(float((~by_lexicon & ~escalated).mean()), 4),
+                    "transformer": round(float(escalated.mean()), 4)
+                },
+                "accuracy": round(accuracy, 4),
+                "accuracy_delta": round(accuracy - transformer_accuracy, 4),
+                "transformer_agreement": round(float((predictions == transformer).mean()), 4),
+                "expected_latency_ms": round(mean_ms, 4)
+            }
+            report["bands"].append(row)
+            print(f"{'açık' if use_lexicon else 'kapalı':>7} {low:>5.2f}-{high:<5.2f} {escalated.mean():>10.2%} "
+                  f"{accuracy:>9.4f} {row['transformer_agreement']:>7.2%} {mean_ms:>8.3f}")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\nRapor kaydedildi: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import queue as queue_module
+import resource
+import sys
+import time
+from datetime import datetime
+
+APP_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'app'))
+
+
+def read_rss_mb():
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def wait_for_child(process, queue, timeout=0.0, poll_seconds=1.0):
+    """Spawn edilen ölçüm sürecinin sonucunu döndürür; süreç sonuç vermeden ölürse veya süre dolarsa None.
+
+    A child that crashes (failed model load, OOM kill) never puts a result, so a plain
+    queue.get() would wait forever. The caller reads process.exitcode after a None.
+    """
+    deadline = time.monotonic() + timeout if timeout else None
+    result = None
+    while True:
+        try:
+            result = queue.get(timeout=poll_seconds)
+            break
+        except queue_module.Empty:
+            pass
+        if not process.is_alive():
+            # The result may have been flushed just before the child exited
+            try:
+                result = queue.get(timeout=poll_seconds)
+            except queue_module.Empty:
+                pass
+            break
+        if deadline is not None and time.monotonic() > deadline:
+            process.terminate()
+            break
+    process.join()
+    return result
+
+
+def load_heldout(path, limit, text_column, label_column):
+    texts, labels = [], []
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            texts.append(row[text_column])
+            labels.append(str(row[label_column]))
+            if limit and len(texts) >= limit:
+                break
+    return texts, labels
+
+
+def run_backend(backend, model_path, texts, batch_size, single_samples, threads, queue):
+    # Her backend ayrı süreçte ölçülür ki RSS değerleri birbirini etkilemesin
+    sys.path.insert(0, APP_DIR)
+    if threads:
+        os.environ["INFERENCE_THREADS"] = str(threads)
+    os.environ["MODEL_BATCH_SIZE"] = str(batch_size)
+    os.environ["RESULT_CACHE_ENABLED"] = "0"
+    import numpy as np
+    from model_handler import ModelHandler
+
+    rss_before = read_rss_mb()
+    start = time.perf_counter()
+    handler = ModelHandler(model_path=model_path, backend=backend)
+    load_seconds = time.perf_counter() - start
+    rss_loaded = read_rss_mb()
+
+    handler.predict_proba(texts[:batch_size])  # warmup
+
+    batch_latencies = []
+    predictions = []
+    for offset in range(0, len(texts), batch_size):
+        chunk = texts[offset:offset + batch_size]
+        start = time.perf_counter()
+        probabilities = handler.predict_proba(chunk)
+        batch_latencies.append((time.perf_counter() - start) * 1000)
+        predictions.extend(handler.label_for(int(index)) for index in np.argmax(probabilities, axis=1))
+
+    single_latencies = []
+    for text in texts[:single_samples]:
+        start = time.perf_counter()
+        handler.predict_proba([text])
+        single_latencies.append((time.perf_counter() - start) * 1000)
+
+    queue.put({
+        "backend": backend,
+        "predictions": predictions,
+        "load_seconds": round(load_seconds, 3),
+        "rss_before_load_mb": round(rss_before, 1),
+        "rss_after_load_mb": round(rss_loaded, 1),
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "batch_latency_ms": {
+            "p50": round(percentile(batch_latencies, 50), 2),
+            "p95": round(percentile(batch_latencies, 95), 2)
+        },
+        "single_latency_ms": {
+            "p50": round(percentile(single_latencies, 50), 2),
+            "p95": round(percentile(single_latencies, 95), 2)
+        },
+        "throughput_texts_per_s": round(len(texts) / (sum(batch_latencies) / 1000), 1) if batch_latencies else 0.0
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Çıkarım backend'lerinin doğruluk, gecikme ve bellek karşılaştırması")
+    parser.add_argument("--model-path", default="model")
+    parser.add_argument("--data", required=True, help="Ayrılmış (held-out) CSV dosyası")
+    parser.add_argument("--text-column", default="Content")
+    parser.add_argument("--label-column", default="Label")
+    parser.add_argument("--backends", default="torch,torch-int8,onnx")
+    parser.add_argument("--limit", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--single-samples", type=int, default=200)
+    parser.add_argument("--threads", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=1800, help="Backend başına en fazla süre (sn); 0: sınırsız")
+    parser.add_argument("--output", default="reports/backend_comparison.json")
+    args = parser.parse_args()
+
+    texts, labels = load_heldout(args.data, args.limit, args.text_column, args.label_column)
+    print(f"{len(texts)} örnek yüklendi: {args.data}")
+
+    context = multiprocessing.get_context("spawn")
+    runs, failed = [], []
+    for backend in args.backends.split(","):
+        print(f"\n{backend} ölçülüyor...")
+        queue = context.Queue()
+        process = context.Process(
+            target=run_backend,
+            args=(backend, os.path.abspath(args.model_path), texts, args.batch_size,
+                  args.single_samples, args.threads, queue)
+        )
+        process.start()
+        result = wait_for_child(process, queue, args.timeout)
+        if result is None:
+            print(f"{backend} başarısız oldu (çıkış kodu {process.exitcode}), sonraki backend'e geçiliyor")
+            failed.append({"backend": backend, "exitcode": process.exitcode})
+            continue
+        runs.append(result)
+    if not runs:
+        raise SystemExit(f"Hiçbir backend ölçülemedi: {failed}")
+
+    # İlk başarılı backend referans alınır (varsayılan: fp32 torch)
+    predictions_by_backend = [run.pop("predictions") for run in runs]
+    reference = runs[0]
+    reference_predictions = predictions_by_backend[0]
+    reference_accuracy = sum(p == l for p, l in zip(reference_predictions, labels)) / len(labels)
+    report = {
+        "timestamp": datetime.now().isoformat(),
+        "model_path": os.path.abspath(args.model_path),
+        "data": os.path.abspath(args.data),
+        "samples": len(texts),
+        "batch_size": args.batch_size,
+        "reference_backend": reference["backend"],
+        "backends": [],
+        "failed_backends": failed
+    }
+    print(f"\n{'backend':>12} {'doğruluk':>9} {'fark':>8} {'uyum':>7} {'yük (MB)':>9} {'tekil p50':>10} "
+          f"{'batch p50':>10} {'metin/sn':>9}")
+    for run, predictions in zip(runs, predictions_by_backend):
+        accuracy = sum(p == l for p, l in zip(predictions, labels)) / len(labels)
+        agreement = sum(p == r for p, r in zip(predictions, reference_predictions)) / len(labels)
+        run.update({
+            "accuracy": round(accuracy, 4),
+            "accuracy_delta": round(accuracy - reference_accuracy, 4),
+            "label_agreement": round(agreement, 4)
+        })
+        report["backends"].append(run)
+        print(f"{run['backend']:>12} {accuracy:>9.4f} {run['accuracy_delta']:>+8.4f} {agreement:>7.2%} "
+              f"{run['rss_after_load_mb'] - run['rss_before_load_mb']:>9.1f} {run['single_latency_ms']['p50']:>10.2f} "
+              f"{run['batch_latency_ms']['p50']:>10.2f} {run['throughput_texts_per_s']:>9.1f}")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\nRapor kaydedildi: {args.output}")
+    if failed:
+        raise SystemExit(f"Başarısız backend'ler: {', '.join(run['backend'] for run in failed)}")
+
+
+if __name__ == "__main__":
+    main()
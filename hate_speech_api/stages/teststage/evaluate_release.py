@@ -0,0 +1,256 @@
+import argparse
+import json
+import multiprocessing
+import os
+import resource
+import sys
+import time
+from datetime import datetime
+
+from compare_backends import APP_DIR, load_heldout, percentile, read_rss_mb, wait_for_child
+
+# Aday, referansa göre bu sınırları aşarsa sürüm reddedilir (--thresholds ile JSON'dan değiştirilebilir)
+DEFAULT_THRESHOLDS = {
+    "max_accuracy_drop": 0.01,
+    "max_recall_drop": 0.02,
+    "max_precision_drop": 0.02,
+    "max_latency_ratio": 1.15,
+    "max_memory_ratio": 1.15
+}
+
+
+def classification_metrics(labels, predictions, classes):
+    index = {label: i for i, label in enumerate(classes)}
+    matrix = [[0] * len(classes) for _ in classes]
+    for label, predicted in zip(labels, predictions):
+        matrix[index[label]][index[predicted]] += 1
+    per_class = {}
+    for i, label in enumerate(classes):
+        true_positive = matrix[i][i]
+        predicted_total = sum(row[i] for row in matrix)
+        support = sum(matrix[i])
+        precision = true_positive / predicted_total if predicted_total else 0.0
+        recall = true_positive / support if support else 0.0
+        f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+        per_class[label] = {
+            "precision": round(precision, 4), "recall": round(recall, 4), "f1": round(f1, 4), "support": support
+        }
+    correct = sum(matrix[i][i] for i in range(len(classes)))
+    return {
+        "accuracy": round(correct / len(labels), 4) if labels else 0.0,
+        "per_class": per_class,
+        # Satırlar gerçek, sütunlar tahmin edilen sınıf
+        "confusion_matrix": {"labels": classes, "matrix": matrix}
+    }
+
+
+def evaluate_model(model_path, backend, texts, threads, batch_sizes, seq_lengths, repeats, queue):
+    # Her model ayrı süreçte değerlendirilir: tepe bellek yalnızca o modele ait olur
+    sys.path.insert(0, APP_DIR)
+    if threads:
+        os.environ["INFERENCE_THREADS"] = str(threads)
+    os.environ["MODEL_BATCH_SIZE"] = str(max(batch_sizes))
+    os.environ["RESULT_CACHE_ENABLED"] = "0"
+    os.environ["WARMUP_ENABLED"] = "0"
+    import numpy as np
+    from model_handler import ModelHandler
+
+    rss_before = read_rss_mb()
+    start = time.perf_counter()
+    handler = ModelHandler(model_path=model_path, backend=backend)
+    load_seconds = time.perf_counter() - start
+    rss_loaded = read_rss_mb()
+
+    start = time.perf_counter()
+    probabilities = handler.predict_proba(texts)
+    eval_seconds = time.perf_counter() - start
+    predictions = [handler.label_for(int(i)) for i in np.argmax(probabilities, axis=1)]
+
+    # Sabit uzunluk: her hücrede yalnızca batch boyutu ve dizi uzunluğu değişir
+    latency = []
+    sample = [text for text in texts if text][:max(batch_sizes)] or ["merhaba dünya"]
+    for seq_length in seq_lengths:
+        for batch_size in batch_sizes:
+            batch = [" ".join([sample[i % len(sample)]] * 64) for i in range(batch_size)]
+            inputs = handler.tokenizer(
+                batch, return_tensors=handler.backend.tensor_type, padding="max_length",
+                truncation=True, max_length=seq_length
+            )
+            handler._predict(inputs)
+            timings = []
+            for _ in range(repeats):
+                start = time.perf_counter()
+                handler._predict(inputs)
+                timings.append((time.perf_counter() - start) * 1000)
+            latency.append({
+                "batch_size": batch_size,
+                "seq_length": seq_length,
+                "p50_ms": round(percentile(timings, 50), 3),
+                "p95_ms": round(percentile(timings, 95), 3),
+                "per_text_ms": round(percentile(timings, 50) / batch_size, 3)
+            })
+
+    queue.put({
+        "model_path": model_path,
+        "backend": backend,
+        "model_version": handler.model_version,
+        "classes": handler.get_categories(),
+        "predictions": predictions,
+        "load_seconds": round(load_seconds, 3),
+        "eval_seconds": round(eval_seconds, 3),
+        "throughput_texts_per_s": round(len(texts) / eval_seconds, 1) if eval_seconds else 0.0,
+        "rss_before_load_mb": round(rss_before, 1),
+        "rss_after_load_mb": round(rss_loaded, 1),
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "latency": latency
+    })
+
+
+def run_model(model_path, args, texts, labels):
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    process = context.Process(
+        target=evaluate_model,
+        args=(os.path.abspath(model_path), args.backend, texts, args.threads, args.batch_sizes,
+              args.seq_lengths, args.repeats, queue)
+    )
+    process.start()
+    result = wait_for_child(process, queue, args.timeout)
+    if result is None:
+        # A release gate that cannot evaluate the candidate must fail, not hang
+        print(f"Değerlendirme süreci sonuç vermeden bitti (çıkış kodu {process.exitcode}): {model_path}")
+        raise SystemExit(1)
+    predictions = result.pop("predictions")
+    unknown = set(labels) - set(result["classes"])
+    if unknown:
+        raise SystemExit(f"Veri setindeki etiketler modelde yok: {sorted(unknown)} (model: {result['classes']})")
+    result.update(classification_metrics(labels, predictions, result["classes"]))
+    return result
+
+
+def find_regressions(candidate, baseline, thresholds):
+    regressions = []
+
+    def check(metric, candidate_value, baseline_value, limit, kind):
+        if kind == "drop":
+            failed = baseline_value - candidate_value > limit
+        else:
+            failed = baseline_value > 0 and candidate_value / baseline_value > limit
+        if failed:
+            regressions.append({
+                "metric": metric, "candidate": candidate_value, "baseline": baseline_value, "limit": limit
+            })
+
+    check("accuracy", candidate["accuracy"], baseline["accuracy"], thresholds["max_accuracy_drop"], "drop")
+    for label, scores in baseline["per_class"].items():
+        if label not in candidate["per_class"]:
+            regressions.append({"metric": f"class:{label}", "candidate": None, "baseline": scores, "limit": None})
+            continue
+        check(f"recall[{label}]", candidate["per_class"][label]["recall"], scores["recall"],
+              thresholds["max_recall_drop"], "drop")
+        check(f"precision[{label}]", candidate["per_class"][label]["precision"], scores["precision"],
+              thresholds["max_precision_drop"], "drop")
+    baseline_latency = {(cell["batch_size"], cell["seq_length"]): cell for cell in baseline["latency"]}
+    for cell in candidate["latency"]:
+        reference = baseline_latency.get((cell["batch_size"], cell["seq_length"]))
+        if reference:
+            check(f"latency_p50_ms[b={cell['batch_size']},L={cell['seq_length']}]", cell["p50_ms"],
+                  reference["p50_ms"], thresholds["max_latency_ratio"], "ratio")
+    check("peak_rss_mb", candidate["peak_rss_mb"], baseline["peak_rss_mb"], thresholds["max_memory_ratio"], "ratio")
+    return regressions
+
+
+def load_baseline(path, args, texts, labels):
+    # Önceki bir raporun "candidate" bölümü veya değerlendirilecek bir model klasörü
+    if os.path.isfile(path):
+        with open(path, encoding="utf-8") as f:
+            report = json.load(f)
+        if report.get("data_digest") != args.data_digest:
+            print("Uyarı: referans rapor farklı bir veri setiyle üretilmiş, doğruluk karşılaştırması güvenilir değil")
+        return report["candidate"]
+    print(f"Referans model değerlendiriliyor: {path}")
+    return run_model(path, args, texts, labels)
+
+
+def print_summary(name, result):
+    print(f"\n[{name}] {result['model_path']}")
+    print(f"  doğruluk: {result['accuracy']:.4f}, tepe bellek: {result['peak_rss_mb']} MB, "
+          f"{result['throughput_texts_per_s']} metin/sn")
+    for label, scores in result["per_class"].items():
+        print(f"  {label:>24}: precision {scores['precision']:.4f}, recall {scores['recall']:.4f}, "
+              f"destek {scores['support']}")
+    print(f"  karışıklık matrisi (satır: gerçek): {result['confusion_matrix']['matrix']}")
+    for cell in result["latency"]:
+        print(f"  batch {cell['batch_size']:>3} x {cell['seq_length']:>3} token: p50 {cell['p50_ms']:.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Yeni modeli ayrılmış veri seti üzerinde değerlendirir, gerilemede sürümü durdurur")
+    parser.add_argument("--candidate", default="best_model", help="Değerlendirilecek model klasörü")
+    parser.add_argument("--baseline", help="Mevcut model klasörü (ör. model) veya önceki bir rapor JSON'u")
+    parser.add_argument("--data", required=True, help="Ayrılmış (held-out) CSV dosyası")
+    parser.add_argument("--text-column", default="Content")
+    parser.add_argument("--label-column", default="Label")
+    parser.add_argument("--limit", type=int, default=0, help="0: tüm satırlar")
+    parser.add_argument("--backend", default="torch")
+    parser.add_argument("--threads", type=int, default=0)
+    parser.add_argument("--batch-sizes", default="1,8,32")
+    parser.add_argument("--seq-lengths", default="16,64,128")
+    parser.add_argument("--repeats", type=int, default=20, help="Her gecikme hücresi için ölçüm sayısı")
+    parser.add_argument("--thresholds", help="Eşikleri değiştiren JSON dosyası")
+    parser.add_argument("--timeout", type=float, default=3600, help="Model başına en fazla süre (sn); 0: sınırsız")
+    parser.add_argument("--output", default="reports/release_evaluation.json")
+    args = parser.parse_args()
+    args.batch_sizes = [int(value) for value in args.batch_sizes.split(",")]
+    args.seq_lengths = [int(value) for value in args.seq_lengths.split(",")]
+
+    thresholds = dict(DEFAULT_THRESHOLDS)
+    if args.thresholds:
+        with open(args.thresholds, encoding="utf-8") as f:
+            overrides = json.load(f)
+        unknown = set(overrides) - set(DEFAULT_THRESHOLDS)
+        if unknown:
+            raise SystemExit(f"Bilinmeyen eşik(ler): {sorted(unknown)}")
+        thresholds.update(overrides)
+
+    texts, labels = load_heldout(args.data, args.limit, args.text_column, args.label_column)
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'trainstage'))
+    from pretokenize import file_digest
+    args.data_digest = file_digest(args.data)
+    print(f"{len(texts)} örnek yüklendi: {args.data}")
+
+    print(f"Aday model değerlendiriliyor: {args.candidate}")
+    candidate = run_model(args.candidate, args, texts, labels)
+    print_summary("aday", candidate)
+
+    report = {
+        "timestamp": datetime.now().isoformat(),
+        "data": os.path.abspath(args.data),
+        "data_digest": args.data_digest,
+        "samples": len(texts),
+        "thresholds": thresholds,
+        "candidate": candidate
+    }
+    if args.baseline:
+        baseline = load_baseline(args.baseline, args, texts, labels)
+        print_summary("referans", baseline)
+        regressions = find_regressions(candidate, baseline, thresholds)
+        report.update({"baseline": baseline, "regressions": regressions, "passed": not regressions})
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\nRapor kaydedildi: {args.output}")
+
+    if args.baseline:
+        if report["regressions"]:
+            print("\nGERİLEME - sürüm reddedildi:")
+            for regression in report["regressions"]:
+                print(f"  {regression['metric']}: {regression['candidate']} (referans {regression['baseline']}, "
+                      f"sınır {regression['limit']})")
+            sys.exit(1)
+        print("\nReferansa göre gerileme yok, sürüm kabul edildi")
+
+
+if __name__ == "__main__":
+    main()
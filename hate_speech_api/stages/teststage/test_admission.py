@@ -0,0 +1,46 @@
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'app')))
+
+from admission import PRIORITY_BULK, PRIORITY_INTERACTIVE, AdmissionController, Rejected  # noqa: E402
+
+
+def hold(controller, priority, seconds):
+    # A request that held its slot for `seconds`, without sleeping in the test
+    controller.release(priority, controller.acquire(priority) - seconds)
+
+
+def test_slow_bulk_does_not_lock_out_interactive_on_idle_controller():
+    controller = AdmissionController(max_concurrent=2, queue_size=4, bulk_queue_size=2)
+    hold(controller, PRIORITY_BULK, 1.5)
+    for _ in range(100):
+        controller.release(PRIORITY_INTERACTIVE, controller.acquire(PRIORITY_INTERACTIVE, time.monotonic() + 1.0))
+    assert controller.stats()["service_ms"][PRIORITY_BULK] == pytest.approx(1500, abs=50)
+
+
+def test_free_slot_is_given_even_when_estimate_exceeds_deadline():
+    controller = AdmissionController(max_concurrent=1, queue_size=4, bulk_queue_size=2)
+    hold(controller, PRIORITY_INTERACTIVE, 1.5)
+    admitted_at = controller.acquire(PRIORITY_INTERACTIVE, time.monotonic() + 0.5)
+    controller.release(PRIORITY_INTERACTIVE, admitted_at)
+
+
+def test_expired_request_is_rejected_on_fast_path():
+    controller = AdmissionController(max_concurrent=2, queue_size=4, bulk_queue_size=2)
+    with pytest.raises(Rejected) as rejected:
+        controller.acquire(PRIORITY_INTERACTIVE, time.monotonic() - 0.01)
+    assert (rejected.value.status, rejected.value.reason) == (503, "expired")
+
+
+def test_queued_request_that_cannot_finish_is_rejected():
+    controller = AdmissionController(max_concurrent=1, queue_size=4, bulk_queue_size=2)
+    hold(controller, PRIORITY_INTERACTIVE, 1.0)
+    admitted_at = controller.acquire(PRIORITY_BULK)
+    with pytest.raises(Rejected) as rejected:
+        controller.acquire(PRIORITY_INTERACTIVE, time.monotonic() + 0.5)
+    assert (rejected.value.status, rejected.value.reason) == (503, "deadline")
+    controller.release(PRIORITY_BULK, admitted_at)
@@ -3,8 +3,12 @@ from transformers import AutoTokenizer, AutoModelForSequenceClassification
 import pickle
 import os
 import json
+import sys
 from datetime import datetime
-import re
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'app')))
+
+from text_features import extract_features, text_metrics
 
 def load_model():
     # Load model and tokenizer
@@ -52,37 +56,11 @@ def analyze_text(text, model, tokenizer, label_encoder):
     }
 
 def calculate_metrics(text):
-    # Calculate word count
-    word_count = len(text.split())
-    
-    # Calculate average word length
-    words = text.split()
-    avg_word_length = sum(len(word) for word in words) / len(words) if words else 0
-    
-    # Calculate punctuation count
-    punctuation_count = sum(1 for char in text if char in '.,!?;:')
-    
-    # Calculate capitalization ratio
-    capital_ratio = sum(1 for char in text if char.isupper()) / len(text) if text else 0
-    
-    # Calculate emoji count
-    emoji_pattern = re.compile("["
-        u"\U0001F600-\U0001F64F"  # emojis
-        u"\U0001F300-\U0001F5FF"  # symbols & pictographs
-        u"\U0001F680-\U0001F6FF"  # transport & map symbols
-        u"\U0001F1E0-\U0001F1FF"  # flags (iOS)
-        u"\U00002702-\U000027B0"
-        u"\U000024C2-\U0001F251"
-        "]+", flags=re.UNICODE)
-    emoji_count = len(emoji_pattern.findall(text))
-    
-    return {
-        "word_count": word_count,
-        "average_word_length": round(avg_word_length, 2),
-        "punctuation_count": punctuation_count,
-        "capitalization_ratio": round(capital_ratio, 2),
-        "emoji_count": emoji_count
-    }
+    # Serving ile aynı özellik çıkarıcıyı kullan
+    features = extract_features(text)
+    metrics = text_metrics(features)
+    metrics["emoji_count"] = features["emoji_count"]
+    return metrics
 
 def print_analysis_result(result):
     print("\n=== Hate Speech Analysis Result ===")
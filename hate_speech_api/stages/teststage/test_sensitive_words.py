@@ -0,0 +1,31 @@
+import os
+import sys
+
+import pytest
+
+APP_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'app'))
+sys.path.insert(0, APP_DIR)
+
+from sensitive_words import SensitiveWordMatcher, casefold_tr  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def matcher():
+    return SensitiveWordMatcher.from_sources({}, os.path.join(APP_DIR, "resources", "banned_words.csv"))
+
+
+def test_dotted_and_dotless_i_stay_distinct():
+    assert casefold_tr("İSTANBUL") == "istanbul"
+    assert casefold_tr("ISIK") == "ısık"
+    assert casefold_tr("sık") != casefold_tr("sik")
+
+
+# Sıradan Türkçe kelimeler, yalnızca i/ı farkıyla yasaklı kelimelere benzeyenler
+@pytest.mark.parametrize("text", ["sık sık gelir", "sıktır bu otobüsler", "SIK SIK", "Sıkıştım"])
+def test_dotless_words_do_not_match(matcher, text):
+    assert matcher.find_banned(text) == []
+
+
+@pytest.mark.parametrize("text", ["siktir git", "SİKTİR", "ANANI", "NIGGER", "you IDIOT"])
+def test_listed_spellings_match(matcher, text):
+    assert matcher.find_banned(text)
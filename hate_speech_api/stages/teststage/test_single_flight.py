@@ -0,0 +1,85 @@
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'app')))
+
+from batching import BatcherUnavailable, MicroBatcher  # noqa: E402
+from model_handler import ModelHandler  # noqa: E402
+from single_flight import SingleFlight  # noqa: E402
+
+FORWARD_SECONDS = 0.4
+
+
+class SlowHandler:
+    """Her forward pass'i FORWARD_SECONDS süren, yalnızca birleştirme ve batch arayüzü olan model."""
+
+    coalesced = ModelHandler.coalesced
+
+    def __init__(self):
+        self.single_flight = SingleFlight()
+
+    def analyze_batch(self, texts, levels):
+        time.sleep(FORWARD_SECONDS)
+        return [{"text": text} for text in texts]
+
+
+@pytest.fixture
+def batcher():
+    batcher = MicroBatcher(SlowHandler(), max_batch_size=8, max_wait_ms=0)
+    yield batcher
+    batcher.close()
+
+
+def start_leader(batcher, deadline):
+    # The leader runs in the background; the follower joins its call a moment later
+    outcome = {}
+
+    def run():
+        try:
+            outcome["result"] = batcher.analyze_text("aynı metin", deadline=deadline)
+        except BatcherUnavailable as e:
+            outcome["error"] = e
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    time.sleep(0.05)
+    return thread, outcome
+
+
+def test_follower_without_deadline_does_not_take_leaders_timeout(batcher):
+    thread, leader = start_leader(batcher, deadline=time.monotonic() + 0.1)
+    assert batcher.analyze_text("aynı metin") == {"text": "aynı metin"}
+    thread.join()
+    assert "error" in leader
+
+
+def test_follower_waits_only_until_its_own_deadline(batcher):
+    thread, leader = start_leader(batcher, deadline=None)
+    start = time.monotonic()
+    with pytest.raises(BatcherUnavailable):
+        batcher.analyze_text("aynı metin", deadline=start + 0.1)
+    assert time.monotonic() - start < 0.25
+    thread.join()
+    assert leader["result"] == {"text": "aynı metin"}
+
+
+def test_other_leader_errors_reach_followers():
+    single_flight = SingleFlight()
+    started = threading.Event()
+
+    def failing():
+        started.set()
+        time.sleep(0.1)
+        raise ValueError("bozuk")
+
+    thread = threading.Thread(target=lambda: pytest.raises(ValueError, single_flight.do, "k", failing))
+    thread.start()
+    started.wait()
+    with pytest.raises(ValueError):
+        single_flight.do("k", lambda: "çalışmamalı", retry=lambda e: isinstance(e, BatcherUnavailable))
+    thread.join()
+    assert single_flight.coalesced == 1
@@ -0,0 +1,60 @@
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'app')))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_text_features import FRAGMENTS, fused_metrics, legacy_metrics, make_corpus  # noqa: E402
+from text_features import extract_features, extract_features_batch  # noqa: E402
+
+# Tekil ve toplu çıkarıcı, eski ModelHandler hesaplarıyla birebir aynı sonucu vermeli
+CASES = {
+    "bos": "",
+    "yalnizca_bosluk": " \t\n",
+    "yalnizca_emoji": "😀😀🎉",
+    "emoji_ve_bosluk": "😀 🎉  ✂️",
+    "tamami_buyuk": "BU TAMAMEN BÜYÜK HARF",
+    "turkce_buyuk_kucuk": "İSTANBUL ılık Işık iğne ĞÜŞÖÇ",
+    "noktalama_dizisi": "...!!!???;;::,,",
+    "noktalama_ve_kelime": "Ne?! Gerçekten... hayır;olmaz:tamam,",
+    "ascii": "I want to kill you",
+    "kontrol_karakterleri": "\x1cx\x1fy",
+    "yalniz_vekil": "\ud800 lone surrogate",
+}
+
+
+@pytest.mark.parametrize("text", CASES.values(), ids=CASES.keys())
+def test_single_matches_legacy(text):
+    assert fused_metrics(extract_features(text)) == legacy_metrics(text)
+
+
+@pytest.mark.parametrize("text", CASES.values(), ids=CASES.keys())
+def test_batch_matches_legacy(text):
+    # Surrounded by other texts, so word and emoji runs must not leak across text boundaries
+    batch = ["😀 ÖN", text, "🎉SON!"]
+    assert fused_metrics(extract_features_batch(batch)[1]) == legacy_metrics(text)
+
+
+def test_batch_of_empty_texts():
+    assert [fused_metrics(features) for features in extract_features_batch(["", "", ""])] == \
+        [legacy_metrics("")] * 3
+
+
+def test_empty_batch():
+    assert extract_features_batch([]) == []
+
+
+def test_batch_matches_single_on_mixed_corpus():
+    corpus = make_corpus(500, random.Random(42))
+    for start in range(0, len(corpus), 32):
+        chunk = corpus[start:start + 32]
+        assert extract_features_batch(chunk) == [extract_features(text) for text in chunk]
+
+
+def test_fragments_match_legacy_in_one_batch():
+    batched = extract_features_batch(FRAGMENTS)
+    for text, features in zip(FRAGMENTS, batched):
+        assert fused_metrics(features) == legacy_metrics(text), text
@@ -0,0 +1,273 @@
+import argparse
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+import torch
+import torch.nn.functional as F
+from torch.optim import AdamW
+from torch.utils.data import DataLoader
+from tqdm import tqdm
+from transformers import AutoConfig, AutoModelForSequenceClassification, AutoTokenizer
+
+from pretokenize import DynamicPaddingCollator, LengthGroupedSampler, TokenizedDataset, build_cache, file_digest
+from train_model import evaluate
+
+
+class DistillationDataset(TokenizedDataset):
+    """Token önbelleği + öğretmenin bu satır için ürettiği logit'ler."""
+
+    def __init__(self, cache, indices, teacher_logits):
+        super().__init__(cache, indices)
+        self.teacher_logits = teacher_logits
+
+    def __getitem__(self, idx):
+        ids, label = super().__getitem__(idx)
+        return ids, label, self.teacher_logits[self.indices[idx]]
+
+
+class DistillationCollator(DynamicPaddingCollator):
+    def __call__(self, items):
+        batch = super().__call__([(ids, label) for ids, label, _ in items])
+        batch["teacher_logits"] = torch.from_numpy(np.stack([logits for _, _, logits in items]))
+        return batch
+
+
+def student_config(teacher_path, num_labels, layers, hidden_size, heads):
+    # Same architecture family and vocabulary as the teacher, so the token cache and tokenizer are shared
+    config = AutoConfig.from_pretrained(teacher_path, num_labels=num_labels)
+    config.num_hidden_layers = layers
+    config.hidden_size = hidden_size
+    config.num_attention_heads = heads
+    # DistilBERT names the feed-forward size hidden_dim, BERT intermediate_size
+    setattr(config, "hidden_dim" if hasattr(config, "hidden_dim") else "intermediate_size", hidden_size * 4)
+    return config
+
+
+def teacher_logits_for(cache, teacher, teacher_path, pad_token_id, batch_size, device):
+    """Öğretmenin tüm veri seti üzerindeki logit'lerini bir kez hesaplayıp önbellek klasörüne yazar."""
+    weights = [name for name in ("model.safetensors", "pytorch_model.bin")
+               if os.path.exists(os.path.join(teacher_path, name))]
+    digest = file_digest(os.path.join(teacher_path, weights[0]))[:16] if weights else "unknown"
+    path = os.path.join(cache.path, f"teacher_logits_{digest}.npy")
+    if os.path.exists(path):
+        print(f"Öğretmen logit'leri önbellekten okunuyor: {path}")
+        return np.load(path)
+
+    dataset = TokenizedDataset(cache)
+    loader = DataLoader(
+        dataset, batch_sampler=LengthGroupedSampler(dataset.lengths, batch_size, shuffle=False),
+        collate_fn=DynamicPaddingCollator(pad_token_id)
+    )
+    logits = np.zeros((len(cache), teacher.config.num_labels), dtype=np.float32)
+    teacher.eval()
+    with torch.inference_mode():
+        for indices, batch in zip(loader.batch_sampler, tqdm(loader, desc="Öğretmen logit'leri")):
+            outputs = teacher(input_ids=batch["input_ids"].to(device), attention_mask=batch["attention_mask"].to(device))
+            logits[indices] = outputs.logits.float().cpu().numpy()
+    tmp_path = f"{path}.tmp-{os.getpid()}.npy"
+    np.save(tmp_path, logits)
+    os.replace(tmp_path, path)
+    return logits
+
+
+def distillation_loss(student_logits, teacher_logits, labels, temperature, alpha):
+    # Soft targets (Hinton et al.): KL at temperature T, scaled by T^2, mixed with hard-label CE
+    soft = F.kl_div(
+        F.log_softmax(student_logits / temperature, dim=-1),
+        F.softmax(teacher_logits / temperature, dim=-1),
+        reduction="batchmean"
+    ) * temperature ** 2
+    hard = F.cross_entropy(student_logits, labels)
+    return alpha * soft + (1 - alpha) * hard
+
+
+def predict_labels(model, loader, device):
+    model.eval()
+    predictions = []
+    with torch.inference_mode():
+        for batch in loader:
+            outputs = model(input_ids=batch["input_ids"].to(device), attention_mask=batch["attention_mask"].to(device))
+            predictions.append(torch.argmax(outputs.logits, dim=1).cpu())
+    return torch.cat(predictions)
+
+
+def measure_latency(model, tokenizer, texts, batch_size, repeats, device):
+    # Median forward time for a fixed batch of real texts, after one warmup pass
+    batch = (texts * batch_size)[:batch_size]
+    inputs = tokenizer(batch, return_tensors="pt", padding=True, truncation=True, max_length=128).to(device)
+    model.eval()
+    timings = []
+    with torch.inference_mode():
+        model(**inputs)
+        for _ in range(repeats):
+            start = time.perf_counter()
+            model(**inputs)
+            timings.append((time.perf_counter() - start) * 1000)
+    return float(np.median(timings))
+
+
+def parameter_count(model):
+    return sum(parameter.numel() for parameter in model.parameters())
+
+
+def distill(teacher_path="model", dataset_path="dataset/HateSpeechDatasetMedium.csv", cache_dir="dataset/token_cache",
+            output_dir="fast_model", layers=2, hidden_size=256, heads=4, num_epochs=3, batch_size=64,
+            learning_rate=3e-4, temperature=2.0, alpha=0.7, latency_repeats=30, seed=42):
+    torch.manual_seed(seed)
+    device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+    print(f"Öğretmen model yükleniyor: {teacher_path}")
+    tokenizer = AutoTokenizer.from_pretrained(teacher_path)
+    teacher = AutoModelForSequenceClassification.from_pretrained(teacher_path).to(device)
+
+    cache = build_cache(dataset_path, tokenizer, cache_dir, max_length=128)
+    with open(os.path.join(teacher_path, "label_map.json"), encoding="utf-8") as f:
+        teacher_classes = json.load(f)["classes"]
+    if [str(label) for label in cache.classes] != teacher_classes:
+        raise SystemExit(f"Veri seti sınıfları öğretmenle uyuşmuyor: {cache.classes} != {teacher_classes}")
+
+    logits = teacher_logits_for(cache, teacher, teacher_path, tokenizer.pad_token_id, batch_size, device)
+
+    # Train/val split identical to train_model.py, so validation rows were never seen by either model
+    train_indices, val_indices = cache.split(0.2, seed=seed)
+    train_dataset = DistillationDataset(cache, train_indices, logits)
+    val_dataset = TokenizedDataset(cache, val_indices)
+    train_loader = DataLoader(
+        train_dataset, batch_sampler=LengthGroupedSampler(train_dataset.lengths, batch_size, seed=seed),
+        collate_fn=DistillationCollator(tokenizer.pad_token_id)
+    )
+    val_loader = DataLoader(
+        val_dataset, batch_sampler=LengthGroupedSampler(val_dataset.lengths, batch_size, shuffle=False),
+        collate_fn=DynamicPaddingCollator(tokenizer.pad_token_id)
+    )
+
+    config = student_config(teacher_path, len(teacher_classes), layers, hidden_size, heads)
+    student = AutoModelForSequenceClassification.from_config(config).to(device)
+    print(f"Öğrenci: {layers} katman, {hidden_size} gizli boyut, {parameter_count(student) / 1e6:.1f}M parametre "
+          f"(öğretmen {parameter_count(teacher) / 1e6:.1f}M)")
+
+    optimizer = AdamW(student.parameters(), lr=learning_rate)
+    best_agreement = -1.0
+    teacher_val = torch.from_numpy(logits[val_dataset.indices]).argmax(dim=1)
+    history = []
+    for epoch in range(num_epochs):
+        student.train()
+        start = time.perf_counter()
+        running_loss = torch.zeros((), device=device)
+        for batch in tqdm(train_loader, desc=f"Epoch {epoch + 1}/{num_epochs}"):
+            outputs = student(input_ids=batch["input_ids"].to(device), attention_mask=batch["attention_mask"].to(device))
+            loss = distillation_loss(
+                outputs.logits, batch["teacher_logits"].to(device), batch["labels"].to(device), temperature, alpha
+            )
+            optimizer.zero_grad(set_to_none=True)
+            loss.backward()
+            torch.nn.utils.clip_grad_norm_(student.parameters(), 1.0)
+            optimizer.step()
+            running_loss += loss.detach()
+        train_seconds = time.perf_counter() - start
+
+        # Validation rows come in length order; teacher predictions are reordered the same way
+        order = list(val_loader.batch_sampler)
+        student_predictions = predict_labels(student, val_loader, device)
+        teacher_predictions = teacher_val[np.concatenate(order)]
+        agreement = (student_predictions == teacher_predictions).float().mean().item()
+        _, val_accuracy = evaluate(student, val_loader, device)
+        print(f"Epoch {epoch + 1}: doğruluk {val_accuracy:.4f}, öğretmenle uyum {agreement:.4f}")
+        history.append({
+            "epoch": epoch + 1,
+            "train_loss": round(running_loss.item() / len(train_loader), 4),
+            "train_seconds": round(train_seconds, 1),
+            "val_accuracy": round(val_accuracy, 4),
+            "teacher_agreement": round(agreement, 4)
+        })
+        # The student is selected on agreement: its job is to reproduce the teacher
+        if agreement > best_agreement:
+            best_agreement = agreement
+            student.save_pretrained(output_dir)
+            tokenizer.save_pretrained(output_dir)
+
+    for name in ("label_map.json", "label_encoder.pkl"):
+        if os.path.exists(os.path.join(teacher_path, name)):
+            shutil.copy(os.path.join(teacher_path, name), os.path.join(output_dir, name))
+
+    # Final numbers come from the saved student, as ModelHandler would load it
+    student = AutoModelForSequenceClassification.from_pretrained(output_dir).to(device)
+    _, teacher_accuracy = evaluate(teacher, val_loader, device)
+    _, student_accuracy = evaluate(student, val_loader, device)
+    sample_texts = [text for text in _read_texts(dataset_path, val_dataset.indices[:64])] or ["merhaba dünya"]
+    latency = {}
+    for size in (1, 32):
+        teacher_ms = measure_latency(teacher, tokenizer, sample_texts, size, latency_repeats, device)
+        student_ms = measure_latency(student, tokenizer, sample_texts, size, latency_repeats, device)
+        latency[f"batch_{size}"] = {
+            "teacher_ms": round(teacher_ms, 3), "student_ms": round(student_ms, 3),
+            "speedup": round(teacher_ms / student_ms, 2)
+        }
+
+    report = {
+        "teacher": os.path.abspath(teacher_path),
+        "dataset": os.path.abspath(dataset_path),
+        "student": {"layers": layers, "hidden_size": hidden_size, "heads": heads,
+                    "parameters": parameter_count(student)},
+        "teacher_parameters": parameter_count(teacher),
+        "temperature": temperature,
+        "alpha": alpha,
+        "teacher_val_accuracy": round(teacher_accuracy, 4),
+        "student_val_accuracy": round(student_accuracy, 4),
+        "teacher_agreement": round(best_agreement, 4),
+        "latency": latency,
+        "torch_threads": torch.get_num_threads(),
+        "epochs": history
+    }
+    with open(os.path.join(output_dir, "distillation_report.json"), "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    print(f"\nÖğretmen doğruluğu : {teacher_accuracy:.4f}")
+    print(f"Öğrenci doğruluğu  : {student_accuracy:.4f}")
+    print(f"Öğretmenle uyum    : {best_agreement:.2%}")
+    for name, values in latency.items():
+        print(f"{name:>9}: öğretmen {values['teacher_ms']:.2f} ms, öğrenci {values['student_ms']:.2f} ms "
+              f"({values['speedup']:.1f}x)")
+    print(f"Öğrenci model kaydedildi: {output_dir} (FAST_MODEL_PATH ile sunulabilir)")
+    return report
+
+
+def _read_texts(dataset_path, rows, text_column="Content"):
+    import pandas as pd
+
+    wanted = set(int(row) for row in rows)
+    texts = []
+    offset = 0
+    for chunk in pd.read_csv(dataset_path, usecols=[text_column], chunksize=50000):
+        for row, text in enumerate(chunk[text_column].fillna("").astype(str), start=offset):
+            if row in wanted:
+                texts.append(text)
+        offset += len(chunk)
+        if len(texts) == len(wanted):
+            break
+    return texts
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mevcut modelden küçük bir öğrenci modele bilgi damıtma")
+    parser.add_argument("--teacher", default="model", help="Öğretmen model klasörü")
+    parser.add_argument("--dataset", default="dataset/HateSpeechDatasetMedium.csv")
+    parser.add_argument("--cache-dir", default="dataset/token_cache")
+    parser.add_argument("--output-dir", default="fast_model")
+    parser.add_argument("--layers", type=int, default=2)
+    parser.add_argument("--hidden-size", type=int, default=256)
+    parser.add_argument("--heads", type=int, default=4)
+    parser.add_argument("--epochs", type=int, default=3)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--lr", type=float, default=3e-4)
+    parser.add_argument("--temperature", type=float, default=2.0)
+    parser.add_argument("--alpha", type=float, default=0.7, help="Yumuşak etiket kaybının ağırlığı")
+    args = parser.parse_args()
+
+    distill(
+        teacher_path=args.teacher, dataset_path=args.dataset, cache_dir=args.cache_dir, output_dir=args.output_dir,
+        layers=args.layers, hidden_size=args.hidden_size, heads=args.heads, num_epochs=args.epochs,
+        batch_size=args.batch_size, learning_rate=args.lr, temperature=args.temperature, alpha=args.alpha
+    )
@@ -0,0 +1,70 @@
+import argparse
+import os
+
+import numpy as np
+import torch
+from transformers import AutoTokenizer, AutoModelForSequenceClassification
+
+
+class LogitsOnly(torch.nn.Module):
+    # Explicit signature so the exporter sees exactly the tokenizer inputs
+    def __init__(self, model):
+        super().__init__()
+        self.model = model
+
+    def forward(self, input_ids, attention_mask, token_type_ids=None):
+        inputs = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if token_type_ids is not None:
+            inputs["token_type_ids"] = token_type_ids
+        return self.model(**inputs).logits
+
+
+def export_onnx(model_path, output_path, opset):
+    print("Model yükleniyor...")
+    tokenizer = AutoTokenizer.from_pretrained(model_path, local_files_only=True)
+    model = AutoModelForSequenceClassification.from_pretrained(model_path, local_files_only=True)
+    model.eval()
+
+    sample = tokenizer(["örnek bir cümle", "daha uzun bir örnek cümle, dinamik eksenler için"],
+                       return_tensors="pt", padding=True)
+    input_names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in sample]
+
+    print(f"ONNX'e aktarılıyor: {output_path}")
+    with torch.no_grad():
+        torch.onnx.export(
+            LogitsOnly(model),
+            tuple(sample[name] for name in input_names),
+            output_path,
+            input_names=input_names,
+            output_names=["logits"],
+            dynamic_axes={
+                **{name: {0: "batch", 1: "sequence"} for name in input_names},
+                "logits": {0: "batch"}
+            },
+            opset_version=opset,
+            do_constant_folding=True
+        )
+
+    # Aynı girdide torch ve ONNX Runtime çıktılarını karşılaştır
+    import onnxruntime
+    session = onnxruntime.InferenceSession(output_path, providers=["CPUExecutionProvider"])
+    with torch.no_grad():
+        expected = model(**{name: sample[name] for name in input_names}).logits.numpy()
+    actual = session.run(None, {name: sample[name].numpy() for name in input_names})[0]
+    print(f"En büyük logit farkı: {float(np.abs(expected - actual).max()):.2e}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Modeli ONNX Runtime backend'i için dışa aktar")
+    parser.add_argument("--model-path", default="model")
+    parser.add_argument("--output", default=None, help="Varsayılan: <model-path>/model.onnx")
+    parser.add_argument("--opset", type=int, default=14)
+    args = parser.parse_args()
+
+    output_path = args.output or os.path.join(args.model_path, "model.onnx")
+    export_onnx(args.model_path, output_path, args.opset)
+    print("Dışa aktarma tamamlandı!")
+
+
+if __name__ == "__main__":
+    main()
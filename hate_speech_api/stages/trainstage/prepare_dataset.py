@@ -1,28 +1,125 @@
-import pandas as pd
+import argparse
+import os
+import time
+
 import numpy as np
+import pandas as pd
+
+
+def parse_class_sizes(value):
+    # "5000" -> every class 5000; "0=5000,1=2000" -> per class
+    if "=" not in value:
+        return int(value), {}
+    sizes = {}
+    for item in value.split(","):
+        label, size = item.split("=", 1)
+        sizes[label.strip()] = int(size)
+    return None, sizes
+
+
+def reservoir_sample(path, label_column, default_size, class_sizes, seed, chunk_rows):
+    """Birinci geçiş: her sınıf için en küçük rastgele anahtara sahip k satırın numarasını tutar.
+
+    Giving every row a uniform random key and keeping the k smallest keys per class is
+    a reservoir sample without replacement. Only (key, row number) pairs are kept, so
+    memory depends on the sample size, not on the input. The random stream is consumed
+    row by row, so the result does not depend on chunk_rows.
+    """
+    rng = np.random.default_rng(seed)
+    reservoirs = {}
+    class_counts = {}
+    row_offset = 0
+    for chunk in pd.read_csv(path, usecols=[label_column], chunksize=chunk_rows, dtype={label_column: str}):
+        labels = chunk[label_column].to_numpy()
+        keys = rng.random(len(labels))
+        rows = np.arange(row_offset, row_offset + len(labels), dtype=np.int64)
+        row_offset += len(labels)
+        for label in np.unique(labels):
+            size = class_sizes.get(label, default_size)
+            mask = labels == label
+            class_counts[label] = class_counts.get(label, 0) + int(mask.sum())
+            if not size:
+                continue
+            old_keys, old_rows = reservoirs.get(label, (np.empty(0), np.empty(0, dtype=np.int64)))
+            merged_keys = np.concatenate([old_keys, keys[mask]])
+            merged_rows = np.concatenate([old_rows, rows[mask]])
+            if len(merged_keys) > size:
+                keep = np.argpartition(merged_keys, size - 1)[:size]
+                merged_keys, merged_rows = merged_keys[keep], merged_rows[keep]
+            reservoirs[label] = (merged_keys, merged_rows)
+    return reservoirs, class_counts
+
+
+def split_rows(reservoirs, val_fraction):
+    # Stratified: each class sends the same share of its sample to validation
+    train_rows, val_rows = [], []
+    for keys, rows in reservoirs.values():
+        ordered = rows[np.argsort(keys, kind="stable")]
+        val_size = int(round(len(ordered) * val_fraction))
+        val_rows.append(ordered[:val_size])
+        train_rows.append(ordered[val_size:])
+    train = np.sort(np.concatenate(train_rows)) if train_rows else np.empty(0, dtype=np.int64)
+    val = np.sort(np.concatenate(val_rows)) if val_rows else np.empty(0, dtype=np.int64)
+    return train, val
+
+
+def write_selected(path, outputs, chunk_rows):
+    """İkinci geçiş: seçilen satırları girdideki sırayla, parça parça çıktı dosyalarına yazar."""
+    written = {output_path: 0 for output_path, _ in outputs}
+    row_offset = 0
+    for chunk in pd.read_csv(path, chunksize=chunk_rows):
+        rows = np.arange(row_offset, row_offset + len(chunk), dtype=np.int64)
+        row_offset += len(chunk)
+        for output_path, selected in outputs:
+            # Selected row numbers are sorted; only the slice inside this chunk is tested
+            lo, hi = np.searchsorted(selected, [rows[0], rows[-1] + 1])
+            mask = np.isin(rows, selected[lo:hi], assume_unique=True)
+            if mask.any():
+                chunk[mask].to_csv(output_path, mode="a", header=written[output_path] == 0, index=False)
+                written[output_path] += int(mask.sum())
+    return written
+
 
-# Orijinal veri setini oku
-print("Veri seti okunuyor...")
-df = pd.read_csv("dataset/HateSpeechDatasetBalanced.csv")
+def main():
+    parser = argparse.ArgumentParser(description="Büyük veri setinden sınıf dengeli, akışlı örneklem çıkarır")
+    parser.add_argument("--input", default="dataset/HateSpeechDatasetBalanced.csv")
+    parser.add_argument("--output", default="dataset/HateSpeechDatasetMedium.csv")
+    parser.add_argument("--val-output", help="Validasyon çıktısı (varsayılan: <output>_val.csv)")
+    parser.add_argument("--label-column", default="Label")
+    parser.add_argument("--per-class", default="5000", help="Sınıf başına örnek: 5000 veya 0=5000,1=2000")
+    parser.add_argument("--val-fraction", type=float, default=0.0, help="Ayrı validasyon dosyasına giden oran")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--chunk-rows", type=int, default=100000)
+    args = parser.parse_args()
 
-# Veri setinin boyutunu göster
-print(f"Orijinal veri seti boyutu: {len(df)} satır")
+    start = time.perf_counter()
+    default_size, class_sizes = parse_class_sizes(args.per_class)
+    print(f"Veri seti taranıyor: {args.input}")
+    reservoirs, class_counts = reservoir_sample(
+        args.input, args.label_column, default_size, class_sizes, args.seed, args.chunk_rows
+    )
+    print(f"Orijinal veri seti boyutu: {sum(class_counts.values())} satır")
+    for label, count in sorted(class_counts.items()):
+        sampled = len(reservoirs[label][1]) if label in reservoirs else 0
+        requested = class_sizes.get(label, default_size) or 0
+        note = " (sınıfta yeterli satır yok, tamamı alındı)" if sampled < requested else ""
+        print(f"  {args.label_column}={label}: {count} satır -> {sampled} örnek{note}")
 
-# Her sınıftan 5000'er örnek al (toplam 10,000 örnek)
-sample_size = 5000
-print(f"\nHer sınıftan {sample_size} örnek alınıyor...")
+    train_rows, val_rows = split_rows(reservoirs, args.val_fraction)
+    outputs = [(args.output, train_rows)]
+    if args.val_fraction > 0:
+        val_output = args.val_output or f"{os.path.splitext(args.output)[0]}_val.csv"
+        outputs.append((val_output, val_rows))
+    for output_path, _ in outputs:
+        os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+        if os.path.exists(output_path):
+            os.remove(output_path)
 
-# Sınıflara göre örnekleme yap
-df_sampled = pd.DataFrame()
-for label in df['Label'].unique():
-    temp_df = df[df['Label'] == label].sample(n=sample_size, random_state=42)
-    df_sampled = pd.concat([df_sampled, temp_df])
+    written = write_selected(args.input, outputs, args.chunk_rows)
+    for output_path, count in written.items():
+        print(f"Kaydedildi: {output_path} ({count} satır)")
+    print(f"Süre: {time.perf_counter() - start:.1f} sn")
 
-# Veriyi karıştır
-df_sampled = df_sampled.sample(frac=1, random_state=42).reset_index(drop=True)
 
-# Yeni veri setini kaydet
-output_file = "dataset/HateSpeechDatasetMedium.csv"
-df_sampled.to_csv(output_file, index=False)
-print(f"\nOrta boyutlu veri seti kaydedildi: {output_file}")
-print(f"Yeni veri seti boyutu: {len(df_sampled)} satır") 
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+import pandas as pd
+import torch
+
+CACHE_FORMAT_VERSION = 1
+
+
+def file_digest(path, block_size=1024 * 1024):
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def tokenizer_digest(tokenizer):
+    # The serialized fast tokenizer covers vocabulary, normalization and special tokens
+    digest = hashlib.sha1(tokenizer.__class__.__name__.encode("utf-8"))
+    backend = getattr(tokenizer, "backend_tokenizer", None)
+    if backend is not None:
+        # Truncation/padding state changes after each call and is not part of the vocabulary
+        state = json.loads(backend.to_str())
+        state.pop("truncation", None)
+        state.pop("padding", None)
+        digest.update(json.dumps(state, sort_keys=True).encode("utf-8"))
+    else:
+        digest.update(json.dumps(tokenizer.get_vocab(), sort_keys=True).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def cache_key(dataset_path, tokenizer, max_length, text_column, label_column):
+    parts = [
+        str(CACHE_FORMAT_VERSION), file_digest(dataset_path), tokenizer_digest(tokenizer),
+        str(max_length), text_column, label_column
+    ]
+    return hashlib.sha1("\0".join(parts).encode("utf-8")).hexdigest()[:20]
+
+
+def split_indices(rows, val_fraction, seed=42):
+    # Row-level train/val split shared by every training script, so validation rows match across models
+    order = np.random.default_rng(seed).permutation(rows)
+    val_size = int(round(rows * val_fraction))
+    return np.sort(order[val_size:]), np.sort(order[:val_size])
+
+
+class TokenizedCache:
+    """Diskteki token önbelleği: tüm token kimlikleri tek düz dosyada, satır sınırları offsets.npy'de."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+            self.meta = json.load(f)
+        self.classes = self.meta["classes"]
+        self.offsets = np.load(os.path.join(path, "offsets.npy"))
+        self.labels = np.load(os.path.join(path, "labels.npy"))
+        self.lengths = np.diff(self.offsets)
+
+    def __len__(self):
+        return len(self.labels)
+
+    def open_tokens(self):
+        return np.memmap(os.path.join(self.path, "input_ids.bin"), dtype=self.meta["dtype"], mode="r")
+
+    def split(self, val_fraction, seed=42):
+        return split_indices(len(self), val_fraction, seed)
+
+
+def build_cache(dataset_path, tokenizer, cache_dir, max_length=128, text_column="Content", label_column="Label",
+                chunk_rows=50000):
+    """Veri setini bir kez tokenize edip memory-mapped önbelleğe yazar; varsa mevcut önbelleği döndürür."""
+    key = cache_key(dataset_path, tokenizer, max_length, text_column, label_column)
+    path = os.path.join(cache_dir, key)
+    if os.path.exists(os.path.join(path, "meta.json")):
+        print(f"Token önbelleği kullanılıyor: {path}")
+        return TokenizedCache(path)
+
+    print(f"Token önbelleği oluşturuluyor: {path}")
+    start = time.perf_counter()
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    os.makedirs(tmp_path, exist_ok=True)
+    dtype = np.uint16 if len(tokenizer) <= np.iinfo(np.uint16).max else np.uint32
+
+    offsets = [0]
+    raw_labels = []
+    with open(os.path.join(tmp_path, "input_ids.bin"), "wb") as tokens_file:
+        for chunk in pd.read_csv(dataset_path, usecols=[text_column, label_column], chunksize=chunk_rows):
+            texts = chunk[text_column].fillna("").astype(str).tolist()
+            encoded = tokenizer(texts, truncation=True, max_length=max_length, return_attention_mask=False,
+                                return_token_type_ids=False)["input_ids"]
+            lengths = np.fromiter((len(ids) for ids in encoded), dtype=np.int64, count=len(encoded))
+            flat = np.fromiter((token for ids in encoded for token in ids), dtype=dtype, count=int(lengths.sum()))
+            flat.tofile(tokens_file)
+            offsets.extend((offsets[-1] + np.cumsum(lengths)).tolist())
+            raw_labels.extend(chunk[label_column].tolist())
+
+    # Same class order as sklearn's LabelEncoder (sorted unique values)
+    classes = sorted(set(raw_labels))
+    class_index = {label: index for index, label in enumerate(classes)}
+    np.save(os.path.join(tmp_path, "offsets.npy"), np.asarray(offsets, dtype=np.int64))
+    np.save(os.path.join(tmp_path, "labels.npy"), np.asarray([class_index[label] for label in raw_labels], dtype=np.int64))
+    with open(os.path.join(tmp_path, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump({
+            "dataset": os.path.abspath(dataset_path),
+            "tokenizer": getattr(tokenizer, "name_or_path", ""),
+            "max_length": max_length,
+            "rows": len(raw_labels),
+            "tokens": offsets[-1],
+            "dtype": np.dtype(dtype).name,
+            "classes": [label.item() if hasattr(label, "item") else label for label in classes],
+            "build_seconds": round(time.perf_counter() - start, 1)
+        }, f, ensure_ascii=False, indent=2)
+
+    # Publish atomically so an interrupted build is never picked up as a valid cache
+    try:
+        os.rename(tmp_path, path)
+    except OSError:
+        # Another process finished the same cache first
+        shutil.rmtree(tmp_path, ignore_errors=True)
+    print(f"{len(raw_labels)} satır, {offsets[-1]} token ({time.perf_counter() - start:.1f} sn)")
+    return TokenizedCache(path)
+
+
+class TokenizedDataset(torch.utils.data.Dataset):
+    def __init__(self, cache, indices=None):
+        self.cache = cache
+        self.indices = np.arange(len(cache)) if indices is None else np.asarray(indices)
+        self.lengths = cache.lengths[self.indices]
+        self._tokens = None
+
+    def __getstate__(self):
+        # DataLoader workers reopen the memmap instead of pickling its contents
+        state = dict(self.__dict__)
+        state["_tokens"] = None
+        return state
+
+    def __getitem__(self, idx):
+        if self._tokens is None:
+            self._tokens = self.cache.open_tokens()
+        row = self.indices[idx]
+        start, end = self.cache.offsets[row], self.cache.offsets[row + 1]
+        return self._tokens[start:end], self.cache.labels[row]
+
+    def __len__(self):
+        return len(self.indices)
+
+
+class DynamicPaddingCollator:
+    """Batch'i yalnızca kendi içindeki en uzun diziye kadar doldurur."""
+
+    def __init__(self, pad_token_id):
+        self.pad_token_id = pad_token_id
+
+    def __call__(self, items):
+        max_length = max(len(ids) for ids, _ in items)
+        input_ids = np.full((len(items), max_length), self.pad_token_id, dtype=np.int64)
+        attention_mask = np.zeros((len(items), max_length), dtype=np.int64)
+        for row, (ids, _) in enumerate(items):
+            input_ids[row, :len(ids)] = ids
+            attention_mask[row, :len(ids)] = 1
+        return {
+            "input_ids": torch.from_numpy(input_ids),
+            "attention_mask": torch.from_numpy(attention_mask),
+            "labels": torch.tensor([label for _, label in items], dtype=torch.long)
+        }
+
+
+class LengthGroupedSampler(torch.utils.data.Sampler):
+    """Benzer uzunluktaki örnekleri aynı batch'e koyar, batch sırasını karıştırır.
+
+    Indices are shuffled, cut into mega-batches of `batch_size * mega_batch_factor`,
+    sorted by length inside each mega-batch and split into batches. Batches still
+    differ from epoch to epoch while padding stays close to zero.
+    """
+
+    def __init__(self, lengths, batch_size, shuffle=True, seed=42, mega_batch_factor=50):
+        self.lengths = np.asarray(lengths)
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.seed = seed
+        self.mega_batch_factor = mega_batch_factor
+        self.epoch = 0
+
+    def __iter__(self):
+        if not self.shuffle:
+            # Evaluation: fully length-sorted batches, deterministic
+            order = np.argsort(self.lengths, kind="stable")
+            batches = [order[i:i + self.batch_size] for i in range(0, len(order), self.batch_size)]
+        else:
+            rng = np.random.default_rng(self.seed + self.epoch)
+            self.epoch += 1
+            order = rng.permutation(len(self.lengths))
+            mega_size = self.batch_size * self.mega_batch_factor
+            batches = []
+            for start in range(0, len(order), mega_size):
+                mega = order[start:start + mega_size]
+                mega = mega[np.argsort(-self.lengths[mega], kind="stable")]
+                batches.extend(mega[i:i + self.batch_size] for i in range(0, len(mega), self.batch_size))
+            rng.shuffle(batches)
+        for batch in batches:
+            yield batch.tolist()
+
+    def __len__(self):
+        return (len(self.lengths) + self.batch_size - 1) // self.batch_size
+
+
+def padding_stats(lengths, batch_size, max_length):
+    # Share of token slots spent on padding: global padding vs length-grouped batches
+    sampler = LengthGroupedSampler(lengths, batch_size)
+    grouped_slots = sum(len(batch) * int(lengths[batch].max()) for batch in map(np.asarray, sampler))
+    global_slots = len(lengths) * min(max_length, int(lengths.max()))
+    real = int(lengths.sum())
+    return {
+        "global_padding_ratio": round(1 - real / global_slots, 4),
+        "grouped_padding_ratio": round(1 - real / grouped_slots, 4)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Eğitim verisini bir kez tokenize edip diske önbellekler")
+    parser.add_argument("dataset", help="CSV veri seti (ör. dataset/HateSpeechDatasetBalanced.csv)")
+    parser.add_argument("--tokenizer", default="distilbert-base-uncased")
+    parser.add_argument("--cache-dir", default="dataset/token_cache")
+    parser.add_argument("--max-length", type=int, default=128)
+    parser.add_argument("--text-column", default="Content")
+    parser.add_argument("--label-column", default="Label")
+    parser.add_argument("--batch-size", type=int, default=32)
+    args = parser.parse_args()
+
+    from transformers import AutoTokenizer
+
+    tokenizer = AutoTokenizer.from_pretrained(args.tokenizer)
+    cache = build_cache(args.dataset, tokenizer, args.cache_dir, args.max_length, args.text_column, args.label_column)
+    stats = padding_stats(cache.lengths, args.batch_size, args.max_length)
+    print(f"Satır: {len(cache)}, sınıflar: {cache.classes}, ortalama uzunluk: {cache.lengths.mean():.1f} token")
+    print(f"Dolgu oranı: global {stats['global_padding_ratio']:.1%} -> gruplu {stats['grouped_padding_ratio']:.1%}")
+
+
+if __name__ == "__main__":
+    main()
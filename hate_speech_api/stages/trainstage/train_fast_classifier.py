@@ -0,0 +1,165 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.linear_model import SGDClassifier
+
+from pretokenize import split_indices
+
+APP_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'app'))
+sys.path.insert(0, APP_DIR)
+from cascade import FAST_CLASSIFIER_FILE, hate_class_index  # noqa: E402
+from ngram_features import DEFAULT_N_FEATURES, FEATURE_VERSION, hash_features  # noqa: E402
+from sensitive_words import SensitiveWordMatcher  # noqa: E402
+
+DEFAULT_BANNED_WORDS = os.path.join(APP_DIR, "resources", "banned_words.csv")
+
+
+def featurize(texts, n_features, lexicon=None):
+    # One CSR matrix per chunk; rows are already L2-normalized by hash_features.
+    # With a lexicon, banned-word hits become features, exactly as Cascade.decide passes them at serving time
+    indptr = [0]
+    indices, values = [], []
+    for text in texts:
+        banned = lexicon.find_banned(text) if lexicon is not None else ()
+        row_indices, row_values = hash_features(text, n_features, banned)
+        indices.append(row_indices)
+        values.append(row_values)
+        indptr.append(indptr[-1] + len(row_indices))
+    return sparse.csr_matrix(
+        (np.concatenate(values) if values else [], np.concatenate(indices) if indices else [], indptr),
+        shape=(len(texts), n_features), dtype=np.float32
+    )
+
+
+def read_chunks(path, text_column, label_column, chunk_rows):
+    row_offset = 0
+    for chunk in pd.read_csv(path, usecols=[text_column, label_column], chunksize=chunk_rows,
+                             dtype={label_column: str}):
+        rows = np.arange(row_offset, row_offset + len(chunk))
+        row_offset += len(chunk)
+        yield rows, chunk[text_column].fillna("").astype(str).tolist(), chunk[label_column].to_numpy()
+
+
+def train_fast_classifier(dataset_path="dataset/HateSpeechDatasetMedium.csv", output_dir="best_model",
+                          text_column="Content", label_column="Label", n_features=DEFAULT_N_FEATURES,
+                          num_epochs=5, alpha=1e-6, chunk_rows=50000, seed=42, banned_words_path=DEFAULT_BANNED_WORDS):
+    """Hash'lenmiş n-gram'lar üzerinde lojistik regresyon; veri parça parça okunur, bellek sabit kalır."""
+    start = time.perf_counter()
+    # Serving must use the same list (BANNED_WORDS_PATH); None trains on n-grams only
+    lexicon = SensitiveWordMatcher.from_sources({}, banned_words_path) if banned_words_path else None
+    label_counts = {}
+    for chunk in pd.read_csv(dataset_path, usecols=[label_column], chunksize=chunk_rows, dtype={label_column: str}):
+        for label, count in chunk[label_column].value_counts().items():
+            label_counts[label] = label_counts.get(label, 0) + int(count)
+    rows = sum(label_counts.values())
+
+    # Class order must match the transformer's label map in the same model directory
+    label_map_path = os.path.join(output_dir, "label_map.json")
+    if os.path.exists(label_map_path):
+        with open(label_map_path, encoding="utf-8") as f:
+            classes = json.load(f)["classes"]
+        unknown = set(label_counts) - set(classes)
+        if unknown:
+            raise SystemExit(f"Veri setindeki etiketler modelde yok: {sorted(unknown)} (model: {classes})")
+    else:
+        classes = sorted(label_counts)
+
+    # Same split as train_model.py (TokenizedCache.split), so the cascade report's validation rows are unseen
+    _, val_rows = split_indices(rows, 0.2, seed)
+    is_val = np.zeros(rows, dtype=bool)
+    is_val[val_rows] = True
+    print(f"{rows} satır, sınıflar: {classes}, validasyon: {len(val_rows)}")
+
+    classifier = SGDClassifier(loss="log_loss", alpha=alpha, random_state=seed)
+    class_array = np.asarray(classes)
+    history = []
+    for epoch in range(num_epochs):
+        epoch_start = time.perf_counter()
+        rng = np.random.default_rng(seed + epoch)
+        for chunk_rows_index, texts, labels in read_chunks(dataset_path, text_column, label_column, chunk_rows):
+            train_mask = ~is_val[chunk_rows_index]
+            if not train_mask.any():
+                continue
+            order = rng.permutation(np.flatnonzero(train_mask))
+            features = featurize([texts[i] for i in order], n_features, lexicon)
+            classifier.partial_fit(features, labels[order], classes=class_array)
+        val_accuracy = evaluate(classifier, dataset_path, text_column, label_column, n_features, is_val, chunk_rows,
+                                lexicon)
+        print(f"Epoch {epoch + 1}/{num_epochs}: validasyon doğruluğu {val_accuracy:.4f} "
+              f"({time.perf_counter() - epoch_start:.1f} sn)")
+        history.append({"epoch": epoch + 1, "val_accuracy": round(val_accuracy, 4)})
+
+    # Serving computes softmax(bias + x @ weights); a binary model's single logit becomes class 1's
+    model_classes = [str(label) for label in classifier.classes_]
+    weights = np.zeros((n_features, len(classes)), dtype=np.float32)
+    bias = np.zeros(len(classes), dtype=np.float32)
+    if len(classes) == 2:
+        positive = classes.index(model_classes[1])
+        weights[:, positive] = classifier.coef_[0]
+        bias[positive] = classifier.intercept_[0]
+    else:
+        for model_index, label in enumerate(model_classes):
+            weights[:, classes.index(label)] = classifier.coef_[model_index]
+            bias[classes.index(label)] = classifier.intercept_[model_index]
+
+    os.makedirs(output_dir, exist_ok=True)
+    output_path = os.path.join(output_dir, FAST_CLASSIFIER_FILE)
+    np.savez_compressed(
+        output_path, weights=weights, bias=bias, classes=np.asarray(classes), n_features=n_features,
+        feature_version=FEATURE_VERSION, lexicon_features=lexicon is not None
+    )
+    report = {
+        "dataset": os.path.abspath(dataset_path),
+        "rows": rows,
+        "classes": classes,
+        "hate_class": classes[hate_class_index(classes)],
+        "n_features": n_features,
+        "feature_version": FEATURE_VERSION,
+        "lexicon_features": os.path.abspath(banned_words_path) if lexicon is not None else None,
+        "alpha": alpha,
+        "val_accuracy": history[-1]["val_accuracy"] if history else None,
+        "train_seconds": round(time.perf_counter() - start, 1),
+        "epochs": history
+    }
+    with open(os.path.join(output_dir, "fast_classifier_report.json"), "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"Hızlı sınıflandırıcı kaydedildi: {output_path} ({os.path.getsize(output_path) / 1e6:.1f} MB)")
+    return report
+
+
+def evaluate(classifier, dataset_path, text_column, label_column, n_features, is_val, chunk_rows, lexicon=None):
+    correct = total = 0
+    for rows, texts, labels in read_chunks(dataset_path, text_column, label_column, chunk_rows):
+        val = np.flatnonzero(is_val[rows])
+        if len(val):
+            predictions = classifier.predict(featurize([texts[i] for i in val], n_features, lexicon))
+            correct += int((predictions == labels[val]).sum())
+            total += len(val)
+    return correct / total if total else 0.0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Kaskadın ilk aşaması için hash'lenmiş n-gram sınıflandırıcısını eğit")
+    parser.add_argument("--dataset", default="dataset/HateSpeechDatasetMedium.csv")
+    parser.add_argument("--output-dir", default="best_model", help="Transformer modelinin klasörü (label_map.json)")
+    parser.add_argument("--text-column", default="Content")
+    parser.add_argument("--label-column", default="Label")
+    parser.add_argument("--n-features", type=int, default=DEFAULT_N_FEATURES)
+    parser.add_argument("--epochs", type=int, default=5)
+    parser.add_argument("--alpha", type=float, default=1e-6, help="L2 düzenlileştirme katsayısı")
+    parser.add_argument("--chunk-rows", type=int, default=50000)
+    parser.add_argument("--banned-words", default=DEFAULT_BANNED_WORDS,
+                        help="Eşleşmeleri özellik olarak eklenen yasaklı kelime listesi; boş: yalnızca n-gram")
+    args = parser.parse_args()
+
+    train_fast_classifier(
+        dataset_path=args.dataset, output_dir=args.output_dir, text_column=args.text_column,
+        label_column=args.label_column, n_features=args.n_features, num_epochs=args.epochs, alpha=args.alpha,
+        chunk_rows=args.chunk_rows, banned_words_path=args.banned_words
+    )
@@ -1,145 +1,292 @@
-import pandas as pd
-import numpy as np
-from sklearn.model_selection import train_test_split
+import argparse
 from transformers import AutoTokenizer, AutoModelForSequenceClassification
 import torch
 from sklearn.preprocessing import LabelEncoder
+import json
 import os
+import sys
+import threading
+import time
 from torch.utils.data import DataLoader
 from torch.optim import AdamW
 from tqdm import tqdm
 
-def load_data(dataset_path):
-    # Veri setini yükle
-    df = pd.read_csv(dataset_path)
-    return df
-
-def prepare_dataset(texts, labels, tokenizer):
-    # Metinleri tokenize et
-    encodings = tokenizer(texts.tolist(), truncation=True, padding=True, max_length=128, return_tensors="pt")
-    
-    # Dataset sınıfı
-    class HateSpeechDataset(torch.utils.data.Dataset):
-        def __init__(self, encodings, labels):
-            self.encodings = encodings
-            self.labels = torch.tensor(labels)
-
-        def __getitem__(self, idx):
-            item = {key: val[idx] for key, val in self.encodings.items()}
-            item['labels'] = self.labels[idx]
-            return item
-
-        def __len__(self):
-            return len(self.labels)
-
-    return HateSpeechDataset(encodings, labels)
-
-def train_model():
-    # Veri setini yükle
-    dataset_path = "dataset/HateSpeechDatasetMedium.csv"  # Orta boyutlu veri setini kullan
-    print("Veri seti yükleniyor...")
-    df = load_data(dataset_path)
-    print(f"Toplam örnek sayısı: {len(df)}")
-    
-    # Etiketleri sayısal değerlere dönüştür
-    label_encoder = LabelEncoder()
-    labels = label_encoder.fit_transform(df['Label'])
-    
-    # Veriyi eğitim ve test setlerine ayır
-    train_texts, val_texts, train_labels, val_labels = train_test_split(
-        df['Content'], labels, test_size=0.2, random_state=42
-    )
-    print(f"Eğitim seti boyutu: {len(train_texts)}")
-    print(f"Validasyon seti boyutu: {len(val_texts)}")
-    
+from pretokenize import DynamicPaddingCollator, LengthGroupedSampler, TokenizedDataset, build_cache
+
+
+class CheckpointWriter:
+    """En iyi modeli arka planda diske yazar, eğitim yazmanın bitmesini beklemez."""
+
+    def __init__(self, model, tokenizer, output_dir):
+        self.model = model
+        self.tokenizer = tokenizer
+        self.output_dir = output_dir
+        self._thread = None
+
+    def save(self):
+        # Only one write at a time; the snapshot is taken now, the write happens later
+        self.wait()
+        state_dict = {name: tensor.detach().clone() for name, tensor in self.model.state_dict().items()}
+        self._thread = threading.Thread(target=self._write, args=(state_dict,), name="checkpoint-writer")
+        self._thread.start()
+
+    def _write(self, state_dict):
+        self.model.save_pretrained(self.output_dir, state_dict=state_dict)
+        self.tokenizer.save_pretrained(self.output_dir)
+
+    def wait(self):
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+def evaluate(model, val_loader, device):
+    # Validasyon her iki modda da fp32: sunulacak modelin doğruluğu ölçülür
+    model.eval()
+    val_loss = 0
+    correct = 0
+    total = 0
+    with torch.no_grad():
+        for batch in val_loader:
+            input_ids = batch['input_ids'].to(device)
+            attention_mask = batch['attention_mask'].to(device)
+            labels = batch['labels'].to(device)
+
+            outputs = model(input_ids=input_ids, attention_mask=attention_mask, labels=labels)
+            val_loss += outputs.loss.item()
+
+            predictions = torch.argmax(outputs.logits, dim=1)
+            correct += (predictions == labels).sum().item()
+            total += labels.size(0)
+    return val_loss / len(val_loader), correct / total
+
+
+def train_epoch_baseline(model, train_loader, optimizer, device, description):
+    model.train()
+    total_loss = 0
+    samples = 0
+    progress_bar = tqdm(train_loader, desc=description)
+
+    for batch in progress_bar:
+        optimizer.zero_grad()
+
+        input_ids = batch['input_ids'].to(device)
+        attention_mask = batch['attention_mask'].to(device)
+        labels = batch['labels'].to(device)
+
+        outputs = model(input_ids=input_ids, attention_mask=attention_mask, labels=labels)
+        loss = outputs.loss
+
+        loss.backward()
+        torch.nn.utils.clip_grad_norm_(model.parameters(), 1.0)  # Gradient clipping ekledik
+        optimizer.step()
+
+        total_loss += loss.item()
+        samples += labels.size(0)
+        progress_bar.set_postfix({'loss': total_loss / len(train_loader)})
+    return total_loss / len(train_loader), samples
+
+
+def train_epoch_throughput(model, forward, train_loader, optimizer, device, description, bf16, grad_accum_steps,
+                           log_every=50):
+    # No per-step loss.item() (a sync point); loss stays a tensor and is read every log_every steps
+    model.train()
+    running_loss = torch.zeros((), device=device)
+    samples = 0
+    steps = len(train_loader)
+    progress_bar = tqdm(train_loader, desc=description)
+    optimizer.zero_grad(set_to_none=True)
+
+    for step, batch in enumerate(progress_bar, start=1):
+        input_ids = batch['input_ids'].to(device)
+        attention_mask = batch['attention_mask'].to(device)
+        labels = batch['labels'].to(device)
+
+        with torch.autocast(device_type=device.type, dtype=torch.bfloat16, enabled=bf16):
+            outputs = forward(input_ids=input_ids, attention_mask=attention_mask, labels=labels)
+            loss = outputs.loss / grad_accum_steps
+        loss.backward()
+        running_loss += loss.detach()
+        samples += labels.size(0)
+
+        if step % grad_accum_steps == 0 or step == steps:
+            torch.nn.utils.clip_grad_norm_(model.parameters(), 1.0)
+            optimizer.step()
+            optimizer.zero_grad(set_to_none=True)
+        if step % log_every == 0:
+            progress_bar.set_postfix({'loss': running_loss.item() * grad_accum_steps / step})
+    return running_loss.item() * grad_accum_steps / steps, samples
+
+
+def train_model(dataset_path="dataset/HateSpeechDatasetMedium.csv", cache_dir="dataset/token_cache",
+                output_dir="best_model", num_epochs=5, batch_size=32, throughput=False, bf16=True,
+                grad_accum_steps=1, num_workers=0, compile_model=False, seed=42,
+                model_name="distilbert-base-uncased"):
+    torch.manual_seed(seed)
+
     # Model ve tokenizer'ı yükle
     print("\nModel yükleniyor...")
-    model_name = "distilbert-base-uncased"  # Daha küçük model
     tokenizer = AutoTokenizer.from_pretrained(model_name)
+
+    # Veri seti bir kez tokenize edilir, sonraki çalıştırmalar diskteki önbelleği kullanır
+    print("Veri seti hazırlanıyor...")
+    cache = build_cache(dataset_path, tokenizer, cache_dir, max_length=128)
+    print(f"Toplam örnek sayısı: {len(cache)}")
+
+    # Etiketler önbellekte LabelEncoder sırasıyla saklanır
+    label_encoder = LabelEncoder()
+    label_encoder.fit(cache.classes)
     model = AutoModelForSequenceClassification.from_pretrained(
         model_name, num_labels=len(label_encoder.classes_)
     )
-    
-    # Dataset'leri hazırla
-    print("Veri setleri hazırlanıyor...")
-    train_dataset = prepare_dataset(train_texts, train_labels, tokenizer)
-    val_dataset = prepare_dataset(val_texts, val_labels, tokenizer)
-    
+
+    # Veriyi eğitim ve test setlerine ayır
+    train_indices, val_indices = cache.split(0.2, seed=seed)
+    train_dataset = TokenizedDataset(cache, train_indices)
+    val_dataset = TokenizedDataset(cache, val_indices)
+    print(f"Eğitim seti boyutu: {len(train_dataset)}")
+    print(f"Validasyon seti boyutu: {len(val_dataset)}")
+
     # Eğitim parametrelerini ayarla
     device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
     print(f"Kullanılan cihaz: {device}")
     model.to(device)
-    
+
     optimizer = AdamW(model.parameters(), lr=5e-5)  # Learning rate'i artırdık
-    num_epochs = 5  # Epoch sayısını artırdık
-    batch_size = 32  # Batch size'ı azalttık
-    
-    # DataLoader'ları oluştur
-    train_loader = DataLoader(train_dataset, batch_size=batch_size, shuffle=True)
-    val_loader = DataLoader(val_dataset, batch_size=batch_size)
-    
+
+    # DataLoader'ları oluştur: benzer uzunluktaki örnekler aynı batch'te, dolgu batch içinde
+    collator = DynamicPaddingCollator(tokenizer.pad_token_id)
+    loader_options = {"collate_fn": collator, "num_workers": num_workers, "persistent_workers": num_workers > 0}
+    train_loader = DataLoader(
+        train_dataset, batch_sampler=LengthGroupedSampler(train_dataset.lengths, batch_size, seed=seed),
+        **loader_options
+    )
+    val_loader = DataLoader(
+        val_dataset, batch_sampler=LengthGroupedSampler(val_dataset.lengths, batch_size, shuffle=False),
+        **loader_options
+    )
+
+    # Throughput modu: bf16 autocast, gradyan biriktirme, isteğe bağlı torch.compile, arka planda kayıt
+    forward = model
+    if throughput and compile_model:
+        print("Model torch.compile ile derleniyor...")
+        forward = torch.compile(model)
+    writer = CheckpointWriter(model, tokenizer, output_dir) if throughput else None
+    mode = "throughput" if throughput else "baseline"
+
     # Eğitim döngüsü
-    print("\nEğitim başlıyor...")
+    print(f"\nEğitim başlıyor ({mode})...")
     best_val_accuracy = 0.0
-    
+    history = []
+
     for epoch in range(num_epochs):
-        model.train()
-        total_loss = 0
-        progress_bar = tqdm(train_loader, desc=f'Epoch {epoch + 1}/{num_epochs}')
-        
-        for batch in progress_bar:
-            optimizer.zero_grad()
-            
-            input_ids = batch['input_ids'].to(device)
-            attention_mask = batch['attention_mask'].to(device)
-            labels = batch['labels'].to(device)
-            
-            outputs = model(input_ids=input_ids, attention_mask=attention_mask, labels=labels)
-            loss = outputs.loss
-            
-            loss.backward()
-            torch.nn.utils.clip_grad_norm_(model.parameters(), 1.0)  # Gradient clipping ekledik
-            optimizer.step()
-            
-            total_loss += loss.item()
-            progress_bar.set_postfix({'loss': total_loss / len(train_loader)})
-        
+        description = f'Epoch {epoch + 1}/{num_epochs}'
+        start = time.perf_counter()
+        if throughput:
+            train_loss, samples = train_epoch_throughput(
+                model, forward, train_loader, optimizer, device, description, bf16, grad_accum_steps
+            )
+        else:
+            train_loss, samples = train_epoch_baseline(model, train_loader, optimizer, device, description)
+        train_seconds = time.perf_counter() - start
+
         # Validasyon
-        model.eval()
-        val_loss = 0
-        correct = 0
-        total = 0
-        
         print("\nValidasyon yapılıyor...")
-        with torch.no_grad():
-            for batch in val_loader:
-                input_ids = batch['input_ids'].to(device)
-                attention_mask = batch['attention_mask'].to(device)
-                labels = batch['labels'].to(device)
-                
-                outputs = model(input_ids=input_ids, attention_mask=attention_mask, labels=labels)
-                val_loss += outputs.loss.item()
-                
-                predictions = torch.argmax(outputs.logits, dim=1)
-                correct += (predictions == labels).sum().item()
-                total += labels.size(0)
-        
-        val_accuracy = correct / total
-        print(f'Epoch {epoch + 1}: Validation Loss = {val_loss / len(val_loader):.4f}, Accuracy = {val_accuracy:.4f}')
-        
+        val_loss, val_accuracy = evaluate(model, val_loader, device)
+        samples_per_second = samples / train_seconds
+        print(f'Epoch {epoch + 1}: Validation Loss = {val_loss:.4f}, Accuracy = {val_accuracy:.4f}, '
+              f'{samples_per_second:.1f} örnek/sn')
+        history.append({
+            "epoch": epoch + 1,
+            "train_loss": round(train_loss, 4),
+            "train_seconds": round(train_seconds, 1),
+            "samples_per_second": round(samples_per_second, 1),
+            "val_loss": round(val_loss, 4),
+            "val_accuracy": round(val_accuracy, 4)
+        })
+
         # En iyi modeli kaydet
         if val_accuracy > best_val_accuracy:
             best_val_accuracy = val_accuracy
             print(f"Yeni en iyi model bulundu! Doğruluk: {val_accuracy:.4f}")
-            model.save_pretrained("best_model")
-            tokenizer.save_pretrained("best_model")
-    
+            if writer is not None:
+                writer.save()
+            else:
+                model.save_pretrained(output_dir)
+                tokenizer.save_pretrained(output_dir)
+
+    if writer is not None:
+        writer.wait()
+
     # Label encoder'ı kaydet
     import pickle
-    with open(os.path.join("best_model", "label_encoder.pkl"), "wb") as f:
+    with open(os.path.join(output_dir, "label_encoder.pkl"), "wb") as f:
         pickle.dump(label_encoder, f)
-    
+
+    # Servis tarafı için scikit-learn gerektirmeyen JSON etiket haritası
+    with open(os.path.join(output_dir, "label_map.json"), "w", encoding="utf-8") as f:
+        json.dump({"classes": [str(label) for label in label_encoder.classes_]}, f, ensure_ascii=False, indent=2)
+
+    report = {
+        "mode": mode,
+        "dataset": os.path.abspath(dataset_path),
+        "batch_size": batch_size,
+        "grad_accum_steps": grad_accum_steps if throughput else 1,
+        "bf16": bool(throughput and bf16),
+        "compile": bool(throughput and compile_model),
+        "num_workers": num_workers,
+        "torch_threads": torch.get_num_threads(),
+        "best_val_accuracy": round(best_val_accuracy, 4),
+        "epochs": history
+    }
+    with open(os.path.join(output_dir, "training_report.json"), "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
     print("Eğitim tamamlandı!")
+    return report
 
 if __name__ == "__main__":
-    train_model() 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Nefret söylemi sınıflandırıcısını eğit")
+    parser.add_argument("--dataset", default="dataset/HateSpeechDatasetMedium.csv",
+                        help="Eğitim CSV'si (tam veri için dataset/HateSpeechDatasetBalanced.csv)")
+    parser.add_argument("--cache-dir", default="dataset/token_cache")
+    parser.add_argument("--output-dir", default="best_model")
+    parser.add_argument("--model-name", default="distilbert-base-uncased", help="Başlangıç modeli (ad veya klasör)")
+    parser.add_argument("--epochs", type=int, default=5)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--throughput", action="store_true", help="CPU throughput modu")
+    parser.add_argument("--no-bf16", action="store_true", help="Throughput modunda bf16 autocast'i kapat")
+    parser.add_argument("--grad-accum-steps", type=int, default=1)
+    parser.add_argument("--workers", type=int, default=0, help="DataLoader worker süreçleri")
+    parser.add_argument("--compile", action="store_true", help="torch.compile kullan (throughput modu)")
+    parser.add_argument("--compare-baseline", action="store_true",
+                        help="Önce temel döngüyü, sonra throughput modunu çalıştırıp karşılaştır")
+    parser.add_argument("--accuracy-tolerance", type=float, default=0.01)
+    args = parser.parse_args()
+
+    options = {
+        "dataset_path": args.dataset, "cache_dir": args.cache_dir, "num_epochs": args.epochs,
+        "batch_size": args.batch_size, "num_workers": args.workers, "model_name": args.model_name
+    }
+    throughput_options = {
+        "throughput": True, "bf16": not args.no_bf16, "grad_accum_steps": args.grad_accum_steps,
+        "compile_model": args.compile
+    }
+    if not args.compare_baseline:
+        train_model(output_dir=args.output_dir, **options, **(throughput_options if args.throughput else {}))
+        sys.exit(0)
+
+    baseline = train_model(output_dir=f"{args.output_dir}_baseline", **options)
+    fast = train_model(output_dir=args.output_dir, **options, **throughput_options)
+    baseline_speed = sum(e["samples_per_second"] for e in baseline["epochs"]) / len(baseline["epochs"])
+    fast_speed = sum(e["samples_per_second"] for e in fast["epochs"]) / len(fast["epochs"])
+    accuracy_delta = fast["best_val_accuracy"] - baseline["best_val_accuracy"]
+    print(f"\nTemel döngü   : {baseline_speed:.1f} örnek/sn, doğruluk {baseline['best_val_accuracy']:.4f}")
+    print(f"Throughput    : {fast_speed:.1f} örnek/sn, doğruluk {fast['best_val_accuracy']:.4f}")
+    print(f"Hızlanma      : {fast_speed / baseline_speed:.2f}x, doğruluk farkı {accuracy_delta:+.4f}")
+    with open(os.path.join(args.output_dir, "baseline_comparison.json"), "w", encoding="utf-8") as f:
+        json.dump({"baseline": baseline, "throughput": fast, "speedup": round(fast_speed / baseline_speed, 2),
+                   "accuracy_delta": round(accuracy_delta, 4)}, f, ensure_ascii=False, indent=2)
+    if accuracy_delta < -args.accuracy_tolerance:
+        print(f"Doğruluk temel döngünün {args.accuracy_tolerance} altına düştü")
+        sys.exit(1)